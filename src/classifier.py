@@ -0,0 +1,268 @@
+# src/classifier.py
+"""
+이미지 분류 파이프라인 (docs/ml_idea.md 2~5: 사람 포착, 나체, 성별, 나이)
+
+images 테이블의 이미지를 프로세스 풀에서 디코딩/전처리하고,
+준비된 만큼 배치로 묶어 모델 한 번 실행으로 모든 헤드의 결과를 얻은 뒤
+classifications 테이블에 일괄 기록한다.
+"""
+import os
+import time
+import logging
+import tempfile
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from PIL import Image
+
+from storage import Storage
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# 모델 인터페이스
+# ============================================================================
+
+class ImageModel(ABC):
+    """
+    분류 모델 인터페이스
+
+    predict() 한 번에 모든 헤드의 확률을 반환해야 함 (백본을 한 번만 실행)
+    """
+    name: str = "model"
+    version: str = "0"
+    input_size: Tuple[int, int] = (224, 224)
+    heads: Dict[str, List[str]] = {}      # 헤드 이름 → 라벨 목록
+
+    @property
+    def model_version(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Args:
+            batch: (N × H × W × 3) float32, 0~1
+
+        Returns:
+            {헤드: (N × 라벨 수) 확률}
+        """
+
+
+class DummyModel(ImageModel):
+    """
+    가중치 없이 처리량을 재기 위한 모델
+
+    고정 난수 투영으로 만든 특징에 헤드별 선형층 + softmax (결과는 의미 없음)
+    """
+    name = "dummy"
+    version = "1"
+    heads = {
+        "person": ["person", "no_person"],
+        "nudity": ["safe", "nude"],
+        "gender": ["male", "female"],
+        "age": ["under_20", "20s", "30s", "40_plus"],
+    }
+
+    def __init__(self, input_size: Tuple[int, int] = (224, 224), features: int = 256, seed: int = 0):
+        self.input_size = input_size
+        rng = np.random.default_rng(seed)
+        # 8×8 평균 풀링 후 투영
+        pooled = (input_size[0] // 8) * (input_size[1] // 8) * 3
+        self._backbone = rng.standard_normal((pooled, features), dtype=np.float32) / np.sqrt(pooled)
+        self._heads = {
+            head: rng.standard_normal((features, len(labels)), dtype=np.float32)
+            for head, labels in self.heads.items()
+        }
+
+    def predict(self, batch: np.ndarray) -> Dict[str, np.ndarray]:
+        n, h, w, c = batch.shape
+        pooled = batch.reshape(n, h // 8, 8, w // 8, 8, c).mean(axis=(2, 4)).reshape(n, -1)
+        features = np.tanh((pooled - 0.5) @ self._backbone)
+        results = {}
+        for head, weights in self._heads.items():
+            logits = features @ weights
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            results[head] = probs / probs.sum(axis=1, keepdims=True)
+        return results
+
+
+# ============================================================================
+# 전처리 (프로세스 풀)
+# ============================================================================
+
+def preprocess(image_id: int, path: str, size: Tuple[int, int]) -> Tuple[int, Optional[np.ndarray]]:
+    """이미지를 size로 디코딩 (JPEG은 draft로 축소 디코딩) → float32 0~1"""
+    try:
+        with Image.open(path) as img:
+            img.draft("RGB", size)
+            img = img.convert("RGB").resize(size, Image.Resampling.BILINEAR)
+        return image_id, np.asarray(img, dtype=np.float32) / 255.0
+    except (OSError, ValueError) as e:
+        logger.warning(f"전처리 실패: {path}, {e}")
+        return image_id, None
+
+
+# ============================================================================
+# 파이프라인
+# ============================================================================
+
+@dataclass
+class ClassifierConfig:
+    min_batch: int = 8          # 이보다 적게 준비됐으면 max_wait까지 더 기다림
+    max_batch: int = 64
+    max_wait: float = 0.05      # 배치를 채우려고 기다리는 최대 시간(초)
+    in_flight: int = 256        # 동시에 디코딩 중인 최대 이미지 수
+    workers: Optional[int] = None
+
+
+class ClassifierPipeline:
+    """
+    이미지 분류 실행기
+
+    - 같은 model_version 결과가 이미 있는 이미지는 건너뜀
+    - 배치 크기는 디코딩이 끝나 대기 중인 이미지 수에 맞춰 min_batch~max_batch에서 조절
+    - 결과는 Storage 쓰기 스레드로 넘겨 executemany로 기록 (헤드별 최고 확률 라벨 1행)
+    """
+
+    def __init__(self, model: ImageModel, storage: Storage, config: Optional[ClassifierConfig] = None):
+        self.model = model
+        self.storage = storage
+        self.config = config or ClassifierConfig()
+        self.stats: Dict[str, float] = {"images": 0, "skipped": 0, "failed": 0, "batches": 0, "infer_s": 0.0}
+
+    def pending_images(self) -> List[Tuple[int, str]]:
+        """아직 이 모델 버전으로 분류하지 않은 (image_id, image_path)"""
+        self.storage.flush()
+        done: Set[int] = {
+            image_id for (image_id,) in self.storage.query(
+                "SELECT DISTINCT image_id FROM classifications WHERE source = 'ml' AND model_version = ?",
+                (self.model.model_version,)
+            )
+        }
+        images = self.storage.query("SELECT id, image_path FROM images ORDER BY id")
+        self.stats["skipped"] = sum(1 for image_id, _ in images if image_id in done)
+        return [(image_id, path) for image_id, path in images if image_id not in done]
+
+    def _batches(self, pool: ProcessPoolExecutor, images: List[Tuple[int, str]]) -> Iterator[List[Tuple[int, np.ndarray]]]:
+        """디코딩이 끝난 이미지를 준비된 만큼 묶어서 내보냄"""
+        cfg = self.config
+        size = self.model.input_size
+        todo = iter(images)
+        running: Set[Future] = set()
+        ready: List[Tuple[int, np.ndarray]] = []
+
+        def refill() -> None:
+            for image_id, path in todo:
+                running.add(pool.submit(preprocess, image_id, path, size))
+                if len(running) >= cfg.in_flight:
+                    return
+
+        def collect(done: Set[Future]) -> None:
+            running.difference_update(done)
+            for future in done:
+                image_id, array = future.result()
+                if array is None:
+                    self.stats["failed"] += 1
+                else:
+                    ready.append((image_id, array))
+
+        refill()
+        while running or ready:
+            collect({future for future in running if future.done()})
+            refill()
+
+            if running and len(ready) < cfg.min_batch:
+                # 준비된 게 없으면 하나 끝날 때까지, 조금이라도 있으면 max_wait까지만 기다림
+                done, _ = wait(running, timeout=cfg.max_wait if ready else None, return_when=FIRST_COMPLETED)
+                if done:
+                    collect(done)
+                    refill()
+                    continue
+
+            batch, ready[:] = ready[:cfg.max_batch], ready[cfg.max_batch:]
+            yield batch
+
+    def _write(self, image_ids: List[int], outputs: Dict[str, np.ndarray]) -> None:
+        now = datetime.now().isoformat()
+        rows = []
+        for head, probs in outputs.items():
+            labels = self.model.heads[head]
+            best = probs.argmax(axis=1)
+            for image_id, index, prob in zip(image_ids, best, probs[np.arange(len(best)), best]):
+                rows.append((image_id, f"{head}:{labels[index]}", float(prob), now, self.model.model_version))
+        self.storage.execute_many(
+            "INSERT INTO classifications (image_id, source, category, confidence, classified_at, model_version) "
+            "VALUES (?, 'ml', ?, ?, ?, ?)",
+            rows
+        )
+
+    def run(self, images: Optional[List[Tuple[int, str]]] = None) -> Dict[str, float]:
+        """
+        분류 실행
+
+        Args:
+            images: (image_id, image_path) 목록 (None이면 pending_images())
+
+        Returns:
+            {'images', 'skipped', 'failed', 'batches', 'infer_s', 'elapsed_s', 'images_per_s'}
+        """
+        images = self.pending_images() if images is None else images
+        started = time.perf_counter()
+        logger.info(f"분류 시작: {len(images)}장 ({self.model.model_version}, 건너뜀 {self.stats['skipped']:.0f}장)")
+
+        with ProcessPoolExecutor(max_workers=self.config.workers) as pool:
+            for batch in self._batches(pool, images):
+                image_ids = [image_id for image_id, _ in batch]
+                t0 = time.perf_counter()
+                outputs = self.model.predict(np.stack([array for _, array in batch]))
+                self.stats["infer_s"] += time.perf_counter() - t0
+                self._write(image_ids, outputs)
+                self.stats["images"] += len(batch)
+                self.stats["batches"] += 1
+
+        self.storage.flush()
+        elapsed = time.perf_counter() - started
+        self.stats["elapsed_s"] = round(elapsed, 3)
+        self.stats["images_per_s"] = round(self.stats["images"] / elapsed, 1) if elapsed else 0.0
+        logger.info(f"분류 완료: {self.stats}")
+        return self.stats
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+
+def benchmark(n_images: int = 500, workers: Optional[int] = None) -> Dict[str, float]:
+    """가짜 JPEG n_images장 + DummyModel로 CPU 처리량 측정 (임시 폴더 사용)"""
+    with tempfile.TemporaryDirectory(prefix="classifier_") as tmp:
+        rng = np.random.default_rng(0)
+        storage = Storage(os.path.join(tmp, "bench.db"))
+        storage.add_captures([("bench", "2000-01-01", tmp)])
+
+        paths = []
+        for i in range(n_images):
+            path = os.path.join(tmp, f"img_{i}.jpg")
+            pixels = rng.integers(0, 255, (60, 80, 3), dtype=np.uint8)
+            Image.fromarray(pixels).resize((1200, 900)).save(path, quality=85)
+            paths.append(path)
+        storage.add_images([("bench", "2000-01-01", path, None) for path in paths])
+
+        pipeline = ClassifierPipeline(DummyModel(), storage, ClassifierConfig(workers=workers))
+        stats = pipeline.run()
+        # 같은 버전으로 다시 실행하면 모두 건너뜀
+        rerun = ClassifierPipeline(DummyModel(), storage).pending_images()
+        storage.close()
+
+    assert not rerun, len(rerun)
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(benchmark())
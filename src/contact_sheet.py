@@ -0,0 +1,277 @@
+# src/contact_sheet.py
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from PIL import Image
+
+from derived_cache import DerivedCache, Transform, file_digest
+from image_store import ImageStore
+from storage import Storage
+
+logger = logging.getLogger(__name__)
+
+_IMAGE_NUMBER = re.compile(r"img_(\d+)\.jpg$")
+
+# 날짜 섹션 없이 사용자 폴더 바로 아래 저장된 이미지의 날짜 키 (exporter.plan_archives와 같은 이름)
+UNDATED = "undated"
+
+
+@dataclass(frozen=True)
+class SheetFlags:
+    """렌더링 옵션 (categories 외에는 캐시 키에 포함됨)"""
+    thumb_size: int = 256                      # 썸네일 한 변 최대 길이(px)
+    max_width: int = 2048                      # 결과 이미지 최대 너비(px)
+    columns: int = 8                           # 최대 열 수 (max_width에 맞춰 줄어듦)
+    padding: int = 4
+    background: str = "#ffffff"
+    quality: int = 85
+    categories: Optional[Tuple[str, ...]] = None  # 주면 해당 분류(classifications.category) 이미지만
+
+
+def _image_order(path: str) -> Tuple[int, str]:
+    match = _IMAGE_NUMBER.search(path)
+    return (int(match.group(1)) if match else 1 << 30, path)
+
+
+# 프로세스 풀 워커별 썸네일 캐시 (캐시 폴더 → DerivedCache)
+_thumb_caches: Dict[Tuple[str, int], DerivedCache] = {}
+
+
+def _load_thumb(
+    path: str,
+    flags: SheetFlags,
+    cache: Optional[Tuple[str, int]],
+    digest: Optional[str] = None
+) -> Image.Image:
+    transform = Transform(size=(flags.thumb_size, flags.thumb_size))
+    if cache:
+        if cache not in _thumb_caches:
+            _thumb_caches[cache] = DerivedCache(*cache)
+        return _thumb_caches[cache].open(path, transform, digest)
+
+    with Image.open(path) as img:
+        img.draft("RGB", transform.size)
+        img = img.convert("RGB")
+    img.thumbnail(transform.size)
+    return img
+
+
+def render_sheet(
+    paths: List[str],
+    out_path: str,
+    flags: SheetFlags,
+    thumb_cache: Optional[Tuple[str, int]] = None,
+    digests: Optional[List[str]] = None
+) -> str:
+    """
+    이미지들을 격자로 붙인 한 장 렌더링 (프로세스 풀에서 실행)
+
+    JPEG은 draft()로 디코딩 단계에서 바로 축소해 원본 크기로 풀지 않음.
+
+    Args:
+        thumb_cache: (캐시 폴더, 용량) - 주면 썸네일을 DerivedCache에서 가져옴
+        digests: paths와 같은 순서의 원본 sha256 (썸네일 캐시 키를 다시 계산하지 않도록)
+    """
+    cell = flags.thumb_size + flags.padding
+    columns = max(1, min(flags.columns, (flags.max_width - flags.padding) // cell, len(paths)))
+    rows = (len(paths) + columns - 1) // columns
+    sheet = Image.new(
+        "RGB", (columns * cell + flags.padding, rows * cell + flags.padding), flags.background
+    )
+
+    for index, path in enumerate(paths):
+        try:
+            img = _load_thumb(path, flags, thumb_cache, digests[index] if digests else None)
+        except (OSError, ValueError) as e:
+            logger.warning(f"이미지 열기 실패 (건너뜀): {path}, {e}")
+            continue
+        row, col = divmod(index, columns)
+        x = flags.padding + col * cell + (flags.thumb_size - img.width) // 2
+        y = flags.padding + row * cell + (flags.thumb_size - img.height) // 2
+        sheet.paste(img, (x, y))
+
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=Path(out_path).parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            sheet.save(f, "JPEG", quality=flags.quality)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return out_path
+
+
+class ContactSheetRenderer:
+    """
+    사용자 × 날짜별 이미지를 한 장으로 모은 컨택트 시트를 필요할 때 렌더링
+
+    - 캐시 키 = 입력 이미지 내용(sha256, 순서대로) + 렌더링 옵션
+      → 같은 입력/옵션이면 파일 존재 확인만 하고 바로 반환
+      → 옵션(분류 필터 등)이 바뀌면 입력이 실제로 바뀐 날짜만 다시 렌더링
+      → 키가 바뀌어 새로 렌더링하면 그 (사용자, 날짜)의 이전 시트는 삭제
+    - digest는 ImageStore 객체 이름을 그대로 쓰고 (하드링크 inode로 찾음),
+      저장소 밖 파일만 직접 읽어 계산 (크기/mtime/inode가 같으면 다시 읽지 않음)
+    - 날짜 폴더 밖 이미지는 UNDATED 한 장으로 묶음
+    - 렌더링은 프로세스 풀에서 날짜별로 병렬 실행
+    """
+
+    def __init__(
+        self,
+        image_root: str = "src/test/image",
+        cache_dir: str = "data/contact_sheets",
+        storage: Optional[Storage] = None,
+        workers: Optional[int] = None,
+        thumb_cache: Optional[DerivedCache] = None,
+        store: Optional[ImageStore] = None
+    ):
+        """
+        Args:
+            image_root: 이미지 루트 (사용자/날짜/img_N.jpg)
+            cache_dir: 렌더링 결과 캐시 폴더
+            storage: 분류 필터(categories)에 쓸 저장소
+            workers: 렌더링 프로세스 수 (None이면 CPU 수)
+            thumb_cache: 썸네일 캐시 (주면 다른 소비자와 썸네일을 공유)
+            store: 이미지 저장소 (주면 이미 계산된 digest를 씀)
+        """
+        self.image_root = Path(image_root)
+        self.cache_dir = Path(cache_dir)
+        self.storage = storage
+        self.workers = workers
+        self.thumb_cache = thumb_cache
+        self.store = store
+        # (경로, 크기, mtime, inode) → digest
+        self._digests: Dict[Tuple[str, int, int, int], str] = {}
+
+    # ------------------------------------------------------------------
+    # 입력
+    # ------------------------------------------------------------------
+
+    def list_dates(self, user: str) -> List[str]:
+        """날짜 폴더 목록 (사용자 폴더 바로 아래 이미지가 있으면 UNDATED 포함)"""
+        user_dir = self.image_root / user
+        if not user_dir.is_dir():
+            return []
+        with os.scandir(user_dir) as it:
+            entries = list(it)
+        dates = sorted(entry.name for entry in entries if entry.is_dir(follow_symlinks=False))
+        if any(entry.is_file() and entry.name.lower().endswith(".jpg") for entry in entries):
+            dates.append(UNDATED)
+        return dates
+
+    def day_inputs(self, user: str, date: str) -> List[os.DirEntry]:
+        """날짜 폴더의 jpg 목록 (img_N 순서, UNDATED는 사용자 폴더 바로 아래)"""
+        day_dir = self.image_root / user if date == UNDATED else self.image_root / user / date
+        try:
+            with os.scandir(day_dir) as it:
+                entries = [e for e in it if e.is_file() and e.name.lower().endswith(".jpg")]
+        except FileNotFoundError:
+            return []
+        return sorted(entries, key=lambda e: _image_order(e.name))
+
+    def _allowed_paths(self, user: str, categories: Tuple[str, ...]) -> Set[str]:
+        """분류 결과가 categories에 속하는 이미지 경로"""
+        if not self.storage:
+            raise ValueError("분류 필터를 쓰려면 storage가 필요합니다")
+        placeholders = ", ".join("?" for _ in categories)
+        rows = self.storage.query(
+            "SELECT i.image_path FROM images i "
+            "JOIN captures c ON c.id = i.capture_id "
+            "JOIN classifications cl ON cl.image_id = i.id "
+            f"WHERE c.fb_uid = ? AND cl.category IN ({placeholders})",
+            # 폴더명은 fbUid_nick_country_gender (get_folder_name)
+            (user.split("_", 1)[0], *categories)
+        )
+        return {os.path.abspath(path) for (path,) in rows}
+
+    def digest(self, entry: os.DirEntry) -> str:
+        """입력 이미지의 sha256 (ImageStore 객체 이름과 같은 값)"""
+        stat = entry.stat()
+        memo = (entry.path, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        if memo not in self._digests:
+            digest = self.store.digest_of(entry.path) if self.store else None
+            self._digests[memo] = digest or file_digest(entry.path)
+        return self._digests[memo]
+
+    @staticmethod
+    def cache_key(digests: List[str], flags: SheetFlags) -> str:
+        digest = hashlib.sha256()
+        for source in digests:
+            digest.update(f"{source}\n".encode())
+        # 분류 필터는 걸러진 입력 목록에 이미 반영됨 → 결과가 같은 날짜는 다시 렌더링하지 않도록 키에서 제외
+        render_flags = {k: v for k, v in asdict(flags).items() if k != "categories"}
+        digest.update(json.dumps(render_flags, sort_keys=True).encode())
+        return digest.hexdigest()[:24]
+
+    # ------------------------------------------------------------------
+    # 렌더링
+    # ------------------------------------------------------------------
+
+    def render(
+        self,
+        user: str,
+        dates: Optional[List[str]] = None,
+        flags: SheetFlags = SheetFlags()
+    ) -> Dict[str, Path]:
+        """
+        사용자의 날짜별 컨택트 시트 경로 반환 (캐시에 없는 날짜만 렌더링)
+
+        Args:
+            user: 사용자 폴더명 (get_folder_name)
+            dates: 날짜 폴더 목록 (None이면 전체)
+            flags: 렌더링 옵션
+
+        Returns:
+            {날짜: 시트 경로} (이미지가 없는 날짜는 제외)
+        """
+        allowed = self._allowed_paths(user, flags.categories) if flags.categories else None
+        results: Dict[str, Path] = {}
+        pending: Dict[str, Tuple[List[str], List[str], Path]] = {}
+
+        for date in dates or self.list_dates(user):
+            entries = self.day_inputs(user, date)
+            if allowed is not None:
+                entries = [e for e in entries if os.path.abspath(e.path) in allowed]
+            if not entries:
+                continue
+
+            digests = [self.digest(e) for e in entries]
+            out_path = self.cache_dir / user / date / f"{self.cache_key(digests, flags)}.jpg"
+            if out_path.exists():
+                results[date] = out_path
+            else:
+                pending[date] = ([e.path for e in entries], digests, out_path)
+
+        # 워커 프로세스에서 각자 연결하도록 설정값만 넘김
+        cache = (str(self.thumb_cache.root), self.thumb_cache.budget_bytes) if self.thumb_cache else None
+
+        if pending:
+            logger.info(f"[{user}] 컨택트 시트 렌더링: {len(pending)}일 (캐시 {len(results)}일)")
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {
+                    date: pool.submit(render_sheet, paths, str(out_path), flags, cache, digests)
+                    for date, (paths, digests, out_path) in pending.items()
+                }
+                for date, future in futures.items():
+                    try:
+                        results[date] = Path(future.result())
+                    except Exception as e:
+                        logger.error(f"[{user}] {date} 렌더링 실패: {e}")
+                        continue
+                    self._remove_stale(results[date])
+
+        return dict(sorted(results.items()))
+
+    @staticmethod
+    def _remove_stale(current: Path) -> None:
+        """같은 (사용자, 날짜) 폴더의 이전 키 시트 삭제"""
+        for old in current.parent.glob("*.jpg"):
+            if old.name != current.name:
+                old.unlink(missing_ok=True)
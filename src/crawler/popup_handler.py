@@ -1,5 +1,7 @@
-from playwright.async_api import Page
-from typing import List
+from playwright.async_api import BrowserContext, Page
+from typing import Any, Dict, List, Optional
+import json
+import re
 
 """
 팝업 처리를 담당하는 모듈
@@ -9,9 +11,186 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# 페이지 내 스캔 (셀렉터마다 왕복하지 않고 evaluate 한 번으로 처리)
+# ============================================================================
+
+# Playwright 전용 :has-text()는 querySelectorAll이 모르므로 CSS + 텍스트 조건으로 분리
+_HAS_TEXT = re.compile(r"""^(?P<css>.*?):has-text\((?P<q>['"])(?P<text>.*)(?P=q)\)$""")
+
+# 공통 함수: 보이는지 여부, 조상까지 따라 올라가며 찾은 실제 z-index
+_HELPERS_JS = """
+const isVisible = el => {
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+};
+const zIndexOf = el => {
+    for (let node = el; node && node.nodeType === 1; node = node.parentElement) {
+        const z = getComputedStyle(node).zIndex;
+        if (z !== 'auto') return parseInt(z, 10) || 0;
+    }
+    return 0;
+};
+const findButtons = specs => {
+    const found = [];
+    for (const spec of specs) {
+        let els;
+        try { els = Array.from(document.querySelectorAll(spec.css)); } catch (e) { continue; }
+        // :has-text처럼 대소문자/공백 차이는 무시 (spec.text는 소문자로 변환돼 있음)
+        const index = els.findIndex(el => (
+            !spec.text || el.textContent.replace(/\\s+/g, ' ').toLowerCase().includes(spec.text)
+        ) && isVisible(el));
+        if (index >= 0) found.push({ selector: spec.selector, index, z: zIndexOf(els[index]), el: els[index] });
+    }
+    // 안정 정렬: z-index가 같으면 패턴 순서 유지
+    return found.sort((a, b) => b.z - a.z);
+};
+"""
+
+SCAN_JS = "(specs) => {" + _HELPERS_JS + """
+    return findButtons(specs).map(({ selector, index, z }) => ({ selector, index, z }));
+}"""
+
+# 최상단 닫기 버튼을 클릭하고, 사라질 때까지(최대 timeoutMs) 프레임 단위로 대기
+SWEEP_JS = "async ({ specs, timeoutMs }) => {" + _HELPERS_JS + """
+    const [top] = findButtons(specs);
+    if (!top) return null;
+    top.el.click();
+    const started = performance.now();
+    while (top.el.isConnected && isVisible(top.el) && performance.now() - started < timeoutMs) {
+        await new Promise(resolve => requestAnimationFrame(resolve));
+    }
+    return { selector: top.selector, z: top.z, closed: !top.el.isConnected || !isVisible(top.el) };
+}"""
+
+# 모든 문서에서 팝업이 뜨는 즉시 닫는 init script (MutationObserver)
+# 클릭 표시는 버튼이 보이는 동안만 유지: 숨겨지면 지워서 같은 모달이 다시 뜨면 다시 닫고,
+# 클릭해도 RETRY_MS 동안 그대로 보이면 한 번 더 클릭
+AUTO_DISMISS_JS = "(specs) => {" + _HELPERS_JS + """
+    const MAX_CLICKS = 50;
+    const RETRY_MS = 1000;
+    const clickedAt = new Map();
+    let clicks = 0;
+    let scheduled = false;
+
+    const sweep = () => {
+        scheduled = false;
+        const now = performance.now();
+        for (const el of clickedAt.keys()) {
+            if (!el.isConnected || !isVisible(el)) clickedAt.delete(el);
+        }
+        for (const { el } of findButtons(specs)) {
+            if (clicks >= MAX_CLICKS) return;
+            const at = clickedAt.get(el);
+            if (at !== undefined && now - at < RETRY_MS) continue;
+            clickedAt.set(el, now);
+            clicks += 1;
+            el.click();
+            // 클릭이 효과가 없어 DOM 변화가 없어도 다시 확인
+            setTimeout(schedule, RETRY_MS);
+            break;
+        }
+    };
+    const schedule = () => {
+        if (scheduled || clicks >= MAX_CLICKS) return;
+        scheduled = true;
+        requestAnimationFrame(sweep);
+    };
+    const start = () => {
+        new MutationObserver(schedule).observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, attributeFilter: ['class', 'style']
+        });
+        schedule();
+    };
+    if (document.documentElement) start();
+    else document.addEventListener('DOMContentLoaded', start, { once: true });
+}"""
+
+
+# 누르면 대화상자의 요청을 수락하는 버튼
+CONFIRM_SELECTORS = frozenset({"button.swal2-confirm"})
+
+
+def build_button_specs(patterns: List[Dict[str, Any]]) -> List[Dict[str, Optional[str]]]:
+    """POPUP_PATTERNS를 페이지 스크립트가 쓰는 {selector, css, text} 목록으로 변환"""
+    specs = []
+    for popup in patterns:
+        for selector in popup["selectors"]:
+            match = _HAS_TEXT.match(selector)
+            if match:
+                text = " ".join(match["text"].split()).lower()
+                specs.append({"selector": selector, "css": match["css"] or "*", "text": text})
+            else:
+                specs.append({"selector": selector, "css": selector, "text": None})
+    return specs
+
+
+async def scan_close_buttons(page: Page, patterns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    보이는 닫기 버튼을 z-index 높은 순으로 반환 (evaluate 1회)
+
+    Returns:
+        [{'selector': 원래 셀렉터, 'index': 일치 요소 중 순번, 'z': z-index}, ...]
+    """
+    return await page.evaluate(SCAN_JS, build_button_specs(patterns))
+
+
+async def sweep_popups(
+    page: Page,
+    patterns: List[Dict[str, Any]],
+    max_attempts: int = 10,
+    timeout_ms: int = 500
+) -> int:
+    """
+    최상단 팝업부터 하나씩 닫음 (팝업 하나당 evaluate 1회)
+
+    고정 대기 대신 클릭한 버튼이 사라지는 즉시 다음 팝업으로 넘어감.
+
+    Returns:
+        닫은 팝업의 개수
+    """
+    specs = build_button_specs(patterns)
+    closed_count = 0
+
+    for _ in range(max_attempts):
+        try:
+            result = await page.evaluate(SWEEP_JS, {"specs": specs, "timeoutMs": timeout_ms})
+        except Exception as e:
+            logger.warning(f"팝업 닫기 실패: {e}")
+            break
+
+        if not result:
+            break
+
+        closed_count += 1
+        logger.info(f"팝업 닫기 성공 ({closed_count}): {result['selector']}")
+
+        if not result["closed"]:
+            logger.debug(f"닫기 후에도 버튼이 남아있음: {result['selector']}")
+
+    return closed_count
+
+
+def build_dismiss_specs(patterns: List[Dict[str, Any]]) -> List[Dict[str, Optional[str]]]:
+    """자동 닫기용 스펙 (확인 버튼은 제외 - 대화상자가 묻는 내용을 자동으로 수락하지 않도록)"""
+    return [spec for spec in build_button_specs(patterns) if spec["selector"] not in CONFIRM_SELECTORS]
+
+
+async def install_popup_auto_dismiss(context: BrowserContext, patterns: List[Dict[str, Any]]) -> None:
+    """
+    컨텍스트의 모든 페이지(이후 열리는 캡처 탭 포함)에 팝업 자동 닫기 스크립트 설치
+
+    닫기/취소 버튼만 누름. 로그인 화면에는 적용되지 않도록 로그인 후에 설치할 것.
+    이미 열려 있는 문서에는 다음 네비게이션부터 적용됨.
+    """
+    script = f"({AUTO_DISMISS_JS})({json.dumps(build_dismiss_specs(patterns), ensure_ascii=False)});"
+    await context.add_init_script(script=script)
+    logger.info("팝업 자동 닫기 스크립트 설치")
+
+
 class PopupHandler:
     """팝업 관련 처리를 담당하는 클래스"""
-    
+
     POPUP_PATTERNS = [
         {
             "type": "sweetalert2",
@@ -39,80 +218,32 @@ class PopupHandler:
         },
     ]
 
-    
+
     def __init__(self, page: Page):
         """
         Args:
             page: Playwright page 객체
         """
         self.page = page
-    
+
     async def get_sorted_close_buttons(self) -> List[str]:
-        found = []
-
-        # 모든 패턴의 버튼들을 직접 조사
-        for popup in self.POPUP_PATTERNS:
-            for btn_selector in popup["selectors"]:
-                btn_element = await self.page.query_selector(btn_selector)
-                if btn_element and await btn_element.is_visible():
-                    # 버튼의 z-index 추출
-                    z = await self.page.evaluate(
-                        '(el) => getComputedStyle(el).zIndex',
-                        btn_element
-                    )
-                    try:
-                        z = int(z)
-                    except:
-                        z = 0
-                    
-                    found.append((z, btn_selector))
-
-        if not found:
-            return []
-
-        # z-index 높은 순으로 정렬
-        found.sort(key=lambda x: x[0], reverse=True)
-
-        # 셀렉터만 추출
-        return [selector for _, selector in found]
-
-
-    async def close_all_popups(self) -> int:
+        """보이는 닫기 버튼 셀렉터를 z-index 높은 순으로 반환"""
+        found = await scan_close_buttons(self.page, self.POPUP_PATTERNS)
+        return [button["selector"] for button in found]
+
+
+    async def close_all_popups(self, max_attempts: int = 10) -> int:
         """
         화면의 모든 팝업을 순차적으로 닫음
-        
+
         Returns:
             닫은 팝업의 개수
         """
-        closed_count = 0
-        
-        while True:
-            # 현재 보이는 닫기 버튼들 조사
-            close_buttons = await self.get_sorted_close_buttons()
-            
-            if not close_buttons:
-                # 더 이상 닫을 팝업이 없음
-                break
-            
-            # 최상단 팝업의 첫 번째 버튼 클릭
-            first_button = close_buttons[0]
-            
-            try:
-                button_element = await self.page.query_selector(first_button)
-                if button_element:
-                    await button_element.click()
-                    closed_count += 1
-                    logger.info(f"팝업 닫기 성공: {first_button}")
-                    
-                    # 팝업이 사라질 시간 대기
-                    await self.page.wait_for_timeout(500)
-                else:
-                    # 버튼을 찾을 수 없으면 무한 루프 방지
-                    break
-                    
-            except Exception as e:
-                logger.warning(f"팝업 닫기 실패: {first_button}, 에러: {e}")
-                break
-        
+        closed_count = await sweep_popups(self.page, self.POPUP_PATTERNS, max_attempts)
+
         logger.info(f"총 {closed_count}개의 팝업을 닫았습니다.")
-        return closed_count
\ No newline at end of file
+        return closed_count
+
+    async def install_auto_dismiss(self) -> None:
+        """이 페이지의 컨텍스트 전체에 팝업 자동 닫기 설치"""
+        await install_popup_auto_dismiss(self.page.context, self.POPUP_PATTERNS)
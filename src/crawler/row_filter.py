@@ -0,0 +1,365 @@
+# src/crawler/row_filter.py
+"""
+테이블 행 필터 엔진
+
+필터 조건을 선언형 규칙 목록으로 적고, compile_filter()로 한 번 컴파일한 뒤
+행 목록 전체에 적용한다. lastLogin 파싱은 형식별 빠른 경로 + 메모이제이션 사용.
+"""
+import re
+import time
+import random
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# 한국 시간대
+KST = timezone(timedelta(hours=9))
+
+
+# ============================================================================
+# 날짜 파서
+# ============================================================================
+
+# 2024. 12. 17. 오후 3:45:30 (오전/오후 또는 AM/PM)
+_KOREAN_SHAPE = re.compile(
+    r"\s*(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\s*(오전|오후|AM|PM)\s*(\d{1,2}):(\d{2}):(\d{2})\s*"
+)
+# 12/17/2025, 1:08:03 PM
+_US_SHAPE = re.compile(
+    r"\s*(\d{1,2})/(\d{1,2})/(\d{4}),\s*(\d{1,2}):(\d{2}):(\d{2})\s*(AM|PM|오전|오후)\s*"
+)
+
+_PM = {"PM", "오후"}
+
+# 빠른 경로에 맞지 않을 때 쓰는 strptime 형식 (오전/오후는 AM/PM으로 바꾼 뒤)
+FALLBACK_FORMATS = [
+    "%Y. %m. %d. %p %I:%M:%S",     # 2024. 12. 17. 오후 3:45:30
+    "%m/%d/%Y, %I:%M:%S %p",       # 12/17/2025, 1:08:03 PM
+]
+
+
+def _to_24h(hour: int, meridiem: str) -> int:
+    return hour % 12 + (12 if meridiem in _PM else 0)
+
+
+def _from_korean(m: re.Match, tz: timezone) -> datetime:
+    year, month, day, meridiem, hour, minute, second = m.groups()
+    return datetime(int(year), int(month), int(day), _to_24h(int(hour), meridiem),
+                    int(minute), int(second), tzinfo=tz)
+
+
+def _from_us(m: re.Match, tz: timezone) -> datetime:
+    month, day, year, hour, minute, second, meridiem = m.groups()
+    return datetime(int(year), int(month), int(day), _to_24h(int(hour), meridiem),
+                    int(minute), int(second), tzinfo=tz)
+
+
+class LoginDateParser:
+    """
+    lastLogin 문자열 파서
+
+    - 알려진 두 형식은 정규식 한 번으로 바로 datetime 생성 (strptime 없음)
+    - 마지막으로 맞았던 형식부터 시도 (한 테이블은 보통 한 형식만 씀)
+    - 같은 문자열은 메모에서 바로 반환
+    """
+
+    def __init__(self, tz: timezone = KST, memo_size: int = 100_000):
+        """
+        Args:
+            tz: 파싱 결과에 붙일 시간대
+            memo_size: 메모할 최대 문자열 수 (넘으면 비우고 다시 채움)
+        """
+        self.tz = tz
+        self.memo_size = memo_size
+        self._memo: Dict[str, Optional[datetime]] = {}
+        self._shapes = [(_KOREAN_SHAPE, _from_korean), (_US_SHAPE, _from_us)]
+
+    def parse(self, raw: Optional[str]) -> Optional[datetime]:
+        """
+        Returns:
+            파싱된 datetime 또는 None (빈 값, 지원하지 않는 형식)
+        """
+        if not raw:
+            return None
+        try:
+            return self._memo[raw]
+        except KeyError:
+            pass
+
+        parsed = self._parse(raw)
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[raw] = parsed
+        return parsed
+
+    def _parse(self, raw: str) -> Optional[datetime]:
+        for index, (shape, build) in enumerate(self._shapes):
+            m = shape.fullmatch(raw)
+            if not m:
+                continue
+            try:
+                parsed = build(m, self.tz)
+            except ValueError:
+                # 형식은 맞지만 날짜가 잘못됨 (13월 등)
+                return None
+            if index:
+                # 맞은 형식을 앞으로
+                self._shapes.insert(0, self._shapes.pop(index))
+            return parsed
+
+        processed = re.sub(r"\s+", " ", raw.replace("오전", "AM").replace("오후", "PM").strip())
+        for fmt in FALLBACK_FORMATS:
+            try:
+                return datetime.strptime(processed, fmt).replace(tzinfo=self.tz)
+            except ValueError:
+                continue
+
+        logger.warning(f"날짜 파싱 실패 (지원하지 않는 형식): {raw}")
+        return None
+
+
+# ============================================================================
+# 규칙
+# ============================================================================
+
+# 기본 규칙: 헤더 행 제외, 필리핀(PH) 제외, 지난 주 월요일 이후 로그인
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"field": "id", "op": "not_in", "value": ["id"], "casefold": True},
+    {"field": "country", "op": "not_in", "value": ["PH"]},
+    {"field": "lastLogin", "op": "since", "value": "last_monday"},
+]
+
+# 남성만 (테이블 표시 값이 확정되지 않아 흔한 표기를 모두 허용)
+MALE_RULE: Dict[str, Any] = {
+    "field": "gender", "op": "in", "value": ["m", "male", "남", "남성", "남자"], "casefold": True,
+}
+
+
+def week_start(now: Optional[datetime] = None, weeks_back: int = 1) -> datetime:
+    """
+    weeks_back주 전 월요일 00:00:00 (KST)
+
+    Args:
+        now: 기준 시각 (None이면 현재)
+        weeks_back: 0이면 이번 주 월요일, 1이면 지난 주 월요일
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(KST)
+    monday = now - timedelta(days=now.weekday(), weeks=weeks_back)
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _resolve_since(value: Any, now: Optional[datetime]) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if value == "this_monday":
+        return week_start(now, 0)
+    if value == "last_monday":
+        return week_start(now, 1)
+    raise ValueError(f"지원하지 않는 기준 시각: {value!r}")
+
+
+# ============================================================================
+# 컴파일
+# ============================================================================
+
+class CompiledFilter:
+    """
+    compile_filter()가 만든 행 필터
+
+    문자열 규칙은 값 집합 검사로, 날짜 규칙은 파싱 + 비교로 미리 바꿔 둔다.
+    날짜 규칙이 있는 필드는 통과한 행에서 datetime으로 교체된다 (get_filtered_data와 동일).
+    """
+
+    def __init__(
+        self,
+        checks: List[Callable[[Dict[str, Any]], bool]],
+        date_checks: List[tuple],
+        parser: LoginDateParser,
+        rules: Sequence[Dict[str, Any]]
+    ):
+        self._checks = checks
+        self._date_checks = date_checks
+        self.parser = parser
+        self.rules = list(rules)
+
+    def __call__(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """행 목록에 한 번에 적용 (통과한 행 목록 반환)"""
+        checks = self._checks
+        date_checks = self._date_checks
+        parse = self.parser.parse
+        kept = []
+
+        for row in rows:
+            if not all(check(row) for check in checks):
+                continue
+
+            parsed_values = []
+            for field, low, high in date_checks:
+                value = row[field]
+                parsed = value if isinstance(value, datetime) else parse(value)
+                if parsed is None or (low and parsed < low) or (high and parsed >= high):
+                    break
+                parsed_values.append((field, parsed))
+            else:
+                for field, parsed in parsed_values:
+                    row[field] = parsed
+                kept.append(row)
+
+        return kept
+
+
+def _string_check(rule: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+    field, op = rule["field"], rule["op"]
+    casefold = rule.get("casefold", False)
+    norm = (lambda v: str(v).strip().casefold()) if casefold else (lambda v: v)
+
+    if op in ("eq", "ne"):
+        expected = norm(rule["value"])
+        if op == "eq":
+            return lambda row: norm(row.get(field, "")) == expected
+        return lambda row: norm(row.get(field, "")) != expected
+
+    values = frozenset(norm(v) for v in rule["value"])
+    if op == "in":
+        return lambda row: norm(row.get(field, "")) in values
+    return lambda row: norm(row.get(field, "")) not in values
+
+
+def compile_filter(
+    rules: Sequence[Dict[str, Any]] = DEFAULT_RULES,
+    now: Optional[datetime] = None,
+    parser: Optional[LoginDateParser] = None
+) -> CompiledFilter:
+    """
+    규칙 목록을 행 필터로 컴파일
+
+    규칙 형식: {"field": 키, "op": 연산, "value": 값, "casefold": 대소문자 무시}
+      - eq / ne / in / not_in: 문자열 비교
+      - since / before: 날짜 비교 (value는 datetime, "last_monday", "this_monday")
+
+    Args:
+        rules: 필터 규칙 (모두 만족하는 행만 남김)
+        now: 상대 기준 시각 계산용 현재 시각 (None이면 컴파일 시점)
+        parser: 날짜 파서 (None이면 새로 생성)
+    """
+    checks = []
+    bounds: Dict[str, List[Optional[datetime]]] = {}
+
+    for rule in rules:
+        op = rule["op"]
+        if op in ("eq", "ne", "in", "not_in"):
+            checks.append(_string_check(rule))
+        elif op in ("since", "before"):
+            low_high = bounds.setdefault(rule["field"], [None, None])
+            moment = _resolve_since(rule["value"], now)
+            if op == "since":
+                low_high[0] = max(filter(None, [low_high[0], moment]))
+            else:
+                low_high[1] = min(filter(None, [low_high[1], moment]))
+        else:
+            raise ValueError(f"지원하지 않는 연산: {op}")
+
+    date_checks = [(field, low, high) for field, (low, high) in bounds.items()]
+    return CompiledFilter(checks, date_checks, parser or LoginDateParser(), rules)
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+
+def synthetic_rows(n: int, seed: int = 0, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """두 날짜 형식, 헤더 행, PH, 잘못된 값이 섞인 가짜 테이블 행 (최근 3주)"""
+    rnd = random.Random(seed)
+    base = (now or datetime.now(KST)) - timedelta(days=21)
+    rows = []
+
+    for i in range(n):
+        moment = base + timedelta(seconds=rnd.randrange(21 * 24 * 3600))
+        meridiem = "오후" if moment.hour >= 12 else "오전"
+        hour = moment.hour % 12 or 12
+        if i % 3:
+            last_login = f"{moment.year}. {moment.month:02d}. {moment.day:02d}. {meridiem} {hour}:{moment:%M:%S}"
+        else:
+            last_login = f"{moment.month}/{moment.day}/{moment.year}, {hour}:{moment:%M:%S} {moment:%p}"
+        if i % 997 == 0:
+            last_login = "-"
+
+        rows.append({
+            "id": "ID" if i % 500 == 0 else str(i),
+            "type": "report",
+            "fbUid": f"uid{i}",
+            "nick": f"nick{i}",
+            "country": "PH" if i % 10 == 0 else rnd.choice(["KR", "US", "JP", "VN"]),
+            "gender": rnd.choice(["M", "F"]),
+            "lastLogin": last_login,
+            "captureLink": None,
+        })
+    return rows
+
+
+def _legacy_filter(rows: List[Dict[str, Any]], start: datetime) -> List[Dict[str, Any]]:
+    """비교용: 기존 get_filtered_data의 행 단위 처리 (replace + re.sub + strptime 반복)"""
+    kept = []
+    for row in rows:
+        if row["id"].lower() == "id":
+            continue
+        processed = re.sub(r"\s+", " ", row["lastLogin"].replace("오전", "AM").replace("오후", "PM").strip())
+        parsed = None
+        for fmt in FALLBACK_FORMATS:
+            try:
+                parsed = datetime.strptime(processed, fmt).replace(tzinfo=KST)
+                break
+            except ValueError:
+                continue
+        if not parsed or row["country"] == "PH" or parsed < start:
+            continue
+        kept.append(row)
+    return kept
+
+
+def benchmark(n: int = 100_000) -> Dict[str, float]:
+    """
+    n개의 가짜 행으로 기존 방식과 컴파일된 필터를 비교
+
+    Returns:
+        {'rows', 'legacy_s', 'compiled_cold_s', 'compiled_warm_s', 'kept'}
+    """
+    now = datetime.now(KST)
+    start = week_start(now)
+
+    rows = synthetic_rows(n, now=now)
+    t0 = time.perf_counter()
+    legacy = _legacy_filter(rows, start)
+    legacy_s = time.perf_counter() - t0
+
+    row_filter = compile_filter(now=now)
+    rows = synthetic_rows(n, now=now)
+    t0 = time.perf_counter()
+    kept = row_filter(rows)
+    cold_s = time.perf_counter() - t0
+
+    # 같은 문자열이 다시 들어오는 경우 (메모 적중)
+    rows = synthetic_rows(n, now=now)
+    t0 = time.perf_counter()
+    row_filter(rows)
+    warm_s = time.perf_counter() - t0
+
+    assert len(kept) == len(legacy), (len(kept), len(legacy))
+    return {
+        "rows": n,
+        "legacy_s": round(legacy_s, 4),
+        "compiled_cold_s": round(cold_s, 4),
+        "compiled_warm_s": round(warm_s, 4),
+        "kept": len(kept),
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR)
+    result = benchmark()
+    print(f"{result['rows']:,}행 → {result['kept']:,}행 통과")
+    print(f"기존 방식:        {result['legacy_s']:.3f}초")
+    print(f"컴파일 (cold):    {result['compiled_cold_s']:.3f}초")
+    print(f"컴파일 (warm):    {result['compiled_warm_s']:.3f}초")
@@ -1,17 +1,16 @@
 # 필터 적용 + 목록(URL) 추출
-from datetime import datetime, timedelta, timezone
 from playwright.async_api import Page
-import re
-from datetime import datetime, timezone, timedelta
+
+from .row_filter import DEFAULT_RULES, MALE_RULE, compile_filter
 
 class Tubular:
     def __init__(self, page:Page):
         self.page = page
 
-    async def filtered(self):
+    async def _rows_from_dom(self):
         await self.page.wait_for_selector('.police-table-row', state='visible')
 
-        table_data = await self.page.evaluate("""
+        return await self.page.evaluate("""
         () => {
             const rows = Array.from(document.querySelectorAll('.police-table-row'));
             return rows.map(row => ({
@@ -27,46 +26,16 @@ class Tubular:
         }
         """)
 
-        # 한국 시간 기준 (UTC+9)
-        KST = timezone(timedelta(hours=9))
-        now = datetime.now(timezone.utc).astimezone(KST)
-
-        # 이번 주 월요일 (00:00:00)
-        this_week_monday = now - timedelta(days=now.weekday())
-        this_week_monday = this_week_monday.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        # 지난 주 월요일 (00:00:00)
-        start_of_week = this_week_monday - timedelta(days=7)
-
-        # 날짜 파싱 함수
-        def parse_last_login(raw):
-            if not raw:
-                return None
-            raw = raw.replace("오전", "AM").replace("오후", "PM")
-            raw = re.sub(r"\s+", " ", raw)
-            try:
-                return datetime.strptime(raw, "%Y. %m. %d. %p %I:%M:%S").replace(tzinfo=KST)
-            except:
-                return None
-
-        filtered_data = []
-
-        for row in table_data:
-            if row["id"].lower() == "id":
-                continue
-
-            parsed_date = parse_last_login(row["lastLogin"])
-            if not parsed_date:
-                continue
-
-            if row["country"] == "PH":
-                continue
-
-            if parsed_date < start_of_week:
-                continue
-
-            # lastLogin을 datetime 객체로 교체
-            row["lastLogin"] = parsed_date
-            filtered_data.append(row)
-
-        return filtered_data
+    async def filtered(self, interceptor=None, male_only=False):
+        """
+        Args:
+            interceptor: 테이블 API 응답을 가로챈 TableInterceptor (잡은 행이 있으면 DOM을 읽지 않음)
+            male_only: 남성만 남길지 여부
+        """
+        table_data = interceptor.rows() if interceptor else []
+        if not table_data:
+            table_data = await self._rows_from_dom()
+
+        # 헤더 행 / 필리핀(PH) 제외, 지난 주 월요일(KST) 이후 로그인 - lastLogin은 datetime으로 교체됨
+        rules = DEFAULT_RULES + [MALE_RULE] if male_only else DEFAULT_RULES
+        return compile_filter(rules)(table_data)
@@ -0,0 +1,234 @@
+# src/derived_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS derived (
+    key         TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    bytes       INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_derived_last_access ON derived(last_access);
+
+CREATE TABLE IF NOT EXISTS derived_meta (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO derived_meta (name, value) VALUES ('total_bytes', 0);
+
+-- 전체 용량은 트리거로 유지 (SUM을 매번 계산하지 않도록)
+CREATE TRIGGER IF NOT EXISTS derived_insert AFTER INSERT ON derived BEGIN
+    UPDATE derived_meta SET value = value + NEW.bytes WHERE name = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS derived_delete AFTER DELETE ON derived BEGIN
+    UPDATE derived_meta SET value = value - OLD.bytes WHERE name = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS derived_update AFTER UPDATE OF bytes ON derived BEGIN
+    UPDATE derived_meta SET value = value - OLD.bytes + NEW.bytes WHERE name = 'total_bytes';
+END;
+"""
+
+# 조회 시각 갱신 최소 간격(초) - 읽을 때마다 DB에 쓰지 않도록
+TOUCH_INTERVAL = 60.0
+
+
+@dataclass(frozen=True)
+class Transform:
+    """원본에 적용할 변환 (캐시 키에 포함됨)"""
+    size: Optional[Tuple[int, int]] = (256, 256)            # 이 크기 안에 맞춰 축소 (비율 유지)
+    crop: Optional[Tuple[int, int, int, int]] = None       # 원본 좌표 (left, top, right, bottom), 축소 전에 적용
+    format: str = "JPEG"
+    quality: int = 85
+
+    @property
+    def suffix(self) -> str:
+        return {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}.get(self.format.upper(), ".bin")
+
+
+def file_digest(path: str) -> str:
+    """원본 파일 sha256 (ImageStore 객체 이름과 같은 값)"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def apply_transform(source_path: str, transform: Transform) -> Image.Image:
+    """원본을 열어 변환 적용 (자르기가 없으면 JPEG은 draft로 축소 디코딩)"""
+    with Image.open(source_path) as img:
+        if transform.size and not transform.crop:
+            img.draft("RGB", transform.size)
+        img = img.convert("RGB")
+    if transform.crop:
+        img = img.crop(transform.crop)
+    if transform.size:
+        img.thumbnail(transform.size)
+    return img
+
+
+class DerivedCache:
+    """
+    썸네일 등 파생 이미지 디스크 캐시
+
+    - 키: 원본 digest + 변환
+    - 전체 용량(budget_bytes)을 넘으면 오래 안 쓴 것부터 삭제 (LRU)
+    - 색인은 SQLite(WAL), 파일은 임시 파일 → os.replace로 써서
+      여러 프로세스가 동시에 써도 깨진 파일을 읽지 않음
+    """
+
+    def __init__(self, root: str = "data/derived", budget_bytes: int = 2 * 1024 ** 3):
+        """
+        Args:
+            root: 캐시 폴더 (index.db와 파생 파일)
+            budget_bytes: 캐시 전체 최대 용량
+        """
+        self.root = Path(root)
+        self.budget_bytes = budget_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evicted": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # fork된 프로세스는 부모 연결을 쓰면 안 되므로 프로세스마다 새로 연결
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.root / "index.db", timeout=30, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def key(source_digest: str, transform: Transform) -> str:
+        spec = json.dumps(asdict(transform), sort_keys=True)
+        return hashlib.sha256(f"{source_digest}\0{spec}".encode()).hexdigest()
+
+    def _path_for(self, key: str, transform: Transform) -> Path:
+        return self.root / key[:2] / f"{key}{transform.suffix}"
+
+    def get(self, source_path: str, transform: Transform = Transform(), source_digest: Optional[str] = None) -> Path:
+        """
+        파생 이미지 경로 반환 (없으면 만들어서 캐시)
+
+        Args:
+            source_path: 원본 이미지 경로
+            transform: 변환
+            source_digest: 원본 sha256 (알고 있으면 전달, 없으면 파일을 읽어 계산)
+        """
+        key = self.key(source_digest or file_digest(source_path), transform)
+        path = self._path_for(key, transform)
+
+        row = self.conn.execute("SELECT last_access FROM derived WHERE key = ?", (key,)).fetchone()
+        if row and path.exists():
+            self.stats["hits"] += 1
+            now = time.time()
+            if now - row[0] > TOUCH_INTERVAL:
+                self.conn.execute("UPDATE derived SET last_access = ? WHERE key = ?", (now, key))
+            return path
+
+        self.stats["misses"] += 1
+        self._store(key, path, apply_transform(source_path, transform), transform)
+        return path
+
+    def open(self, source_path: str, transform: Transform = Transform(), source_digest: Optional[str] = None) -> Image.Image:
+        """파생 이미지를 열어서 반환 (다른 프로세스가 방금 삭제했으면 다시 생성)"""
+        for _ in range(2):
+            path = self.get(source_path, transform, source_digest)
+            try:
+                with Image.open(path) as img:
+                    img.load()
+                    return img
+            except FileNotFoundError:
+                continue
+        return apply_transform(source_path, transform)
+
+    # ------------------------------------------------------------------
+    # 저장 / 삭제
+    # ------------------------------------------------------------------
+
+    def _store(self, key: str, path: Path, img: Image.Image, transform: Transform) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, transform.format, quality=transform.quality)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        size = path.stat().st_size
+        self.conn.execute(
+            "INSERT INTO derived (key, path, bytes, last_access) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET bytes = excluded.bytes, last_access = excluded.last_access",
+            (key, str(path.relative_to(self.root)), size, time.time())
+        )
+        if self.total_bytes() > self.budget_bytes:
+            self.evict()
+
+    def total_bytes(self) -> int:
+        return self.conn.execute("SELECT value FROM derived_meta WHERE name = 'total_bytes'").fetchone()[0]
+
+    def evict(self, target_ratio: float = 0.9) -> int:
+        """
+        예산의 target_ratio 이하가 될 때까지 오래 안 쓴 항목 삭제
+
+        BEGIN IMMEDIATE로 쓰기 잠금을 잡아 여러 프로세스가 동시에 지우지 않도록 함.
+
+        Returns:
+            삭제한 항목 수
+        """
+        target = int(self.budget_bytes * target_ratio)
+        removed = []
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            total = self.total_bytes()
+            for key, rel_path, size in conn.execute(
+                "SELECT key, path, bytes FROM derived ORDER BY last_access"
+            ):
+                if total <= target:
+                    break
+                removed.append((key, rel_path))
+                total -= size
+            conn.executemany("DELETE FROM derived WHERE key = ?", [(key,) for key, _ in removed])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        # 파일 삭제는 잠금 밖에서 (이미 연 파일은 닫힐 때까지 읽을 수 있음)
+        for _, rel_path in removed:
+            try:
+                os.unlink(self.root / rel_path)
+            except FileNotFoundError:
+                pass
+
+        self.stats["evicted"] += len(removed)
+        if removed:
+            logger.info(f"파생 이미지 캐시 정리: {len(removed)}개 삭제")
+        return len(removed)
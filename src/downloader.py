@@ -1,15 +1,37 @@
 # src/downloader.py
 import os
 import re
+import time
+import asyncio
+import hashlib
 import logging
+import tempfile
 import aiohttp
+from contextlib import asynccontextmanager, nullcontext
 from datetime import datetime
+from urllib.parse import urlsplit
 from playwright.async_api import Page
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
 from pathlib import Path
 
+from image_store import ImageStore
+from journal import RunJournal
+from retry import RetryPolicy
+from http_client import create_http_session
+from user_state import UserStateStore
+from storage import Storage
+from report import RunAggregates
+from metrics import RunMetrics, SIZE_BUCKETS
+
+if TYPE_CHECKING:
+    from pipeline import PipelineConfig
+
 logger = logging.getLogger(__name__)
 
+# 동시 다운로드 설정
+MAX_CONCURRENT_DOWNLOADS = 8      # 동시에 진행할 최대 다운로드 수
+CHUNK_SIZE = 64 * 1024            # 스트리밍 다운로드 청크 크기
+
 
 # ============================================================================
 # 유틸리티 함수
@@ -28,63 +50,365 @@ def parse_date_folder(date_id: str) -> str:
         return date_id
 
 
+@asynccontextmanager
+async def session_scope(session: Optional[aiohttp.ClientSession] = None) -> AsyncIterator[aiohttp.ClientSession]:
+    """공유 세션이 있으면 그대로 쓰고, 없으면 이번 호출 동안만 쓸 세션 생성"""
+    if session is not None:
+        yield session
+        return
+
+    own_session = await create_http_session()
+    try:
+        yield own_session
+    finally:
+        await own_session.close()
+
+
 # ============================================================================
 # 이미지 다운로드
 # ============================================================================
 
-async def download_image(session: aiohttp.ClientSession, src: str, file_path: str) -> bool:
+class AtomicFileWriter:
+    """
+    임시 파일에 청크 단위로 쓰고 성공 시 원자적으로 교체하는 비동기 파일 쓰기 도구
+
+    모든 디스크 I/O는 스레드에서 실행되어 이벤트 루프를 막지 않음.
+    commit() 전에 블록을 빠져나가면 임시 파일은 삭제됨.
+    """
+
+    def __init__(self, file_path: str):
+        self.path = Path(file_path)
+        self._file = None
+        self._tmp_path: Optional[str] = None
+        self._committed = False
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 같은 폴더에 만들어야 os.replace가 원자적으로 동작함
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".part"
+        )
+        self._file = os.fdopen(fd, "wb")
+
+    def _finalize(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def _discard(self) -> None:
+        if self._file and not self._file.closed:
+            self._file.close()
+        if self._tmp_path:
+            try:
+                os.unlink(self._tmp_path)
+            except FileNotFoundError:
+                pass
+
+    async def __aenter__(self) -> "AtomicFileWriter":
+        await asyncio.to_thread(self._open)
+        return self
+
+    async def write(self, chunk: bytes) -> None:
+        await asyncio.to_thread(self._file.write, chunk)
+
+    async def commit(self) -> None:
+        await asyncio.to_thread(self._finalize)
+        self._committed = True
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._committed:
+            # 취소(CancelledError) 중에도 정리되도록 동기 호출
+            self._discard()
+
+
+async def _fetch_image(
+    session: aiohttp.ClientSession,
+    src: str,
+    file_path: str,
+    store: Optional[ImageStore] = None,
+    metrics: Optional[RunMetrics] = None
+) -> Tuple[bool, int, Optional[str], int]:
+    """
+    이미지 한 번 요청 (청크 스트리밍 + 원자적 저장)
+    
+    Returns:
+        (성공 여부, HTTP 상태 코드, Retry-After 헤더, 받은 바이트 수)
+    """
+    headers = store.conditional_headers(src) if store else {}
+
+    started = time.perf_counter()
+    async with session.get(src, headers=headers) as res:
+        if metrics:
+            # 응답 헤더까지 걸린 시간 (네트워크/서버)
+            metrics.observe("download_ttfb_seconds", time.perf_counter() - started)
+
+        if res.status == 304 and store and (entry := store.lookup(src)):
+            await asyncio.to_thread(store.link, entry["digest"], file_path)
+            store.stats['not_modified'] += 1
+            logger.debug(f"변경 없음 (304): {file_path}")
+            return True, res.status, None, 0
+
+        if res.status != 200:
+            return False, res.status, res.headers.get("Retry-After"), 0
+        
+        hasher = hashlib.sha256()
+        received = 0
+        async with AtomicFileWriter(file_path) as writer:
+            async for chunk in res.content.iter_chunked(CHUNK_SIZE):
+                hasher.update(chunk)
+                received += len(chunk)
+                await writer.write(chunk)
+            committed = time.perf_counter()
+            await writer.commit()
+            if metrics:
+                # fsync + rename (디스크)
+                metrics.observe("download_commit_seconds", time.perf_counter() - committed)
+
+        if store:
+            digest = hasher.hexdigest()
+            if await asyncio.to_thread(store.adopt, file_path, digest):
+                store.stats['deduplicated'] += 1
+            store.remember(src, digest, res.headers.get("ETag"), res.headers.get("Last-Modified"))
+            store.stats['downloaded'] += 1
+        
+        logger.debug(f"저장 완료: {file_path}")
+        return True, res.status, None, received
+
+
+async def download_image(
+    session: aiohttp.ClientSession,
+    src: str,
+    file_path: str,
+    store: Optional[ImageStore] = None,
+    retry: Optional[RetryPolicy] = None,
+    metrics: Optional[RunMetrics] = None
+) -> bool:
     """
     이미지 다운로드
     
+    본문을 메모리에 모두 올리지 않고 임시 파일에 나눠 쓴 뒤,
+    완료되면 file_path로 교체한다. 실패 시 부분 파일은 남지 않음.
+    store가 있으면 조건부 요청을 보내고, 304면 저장소의 기존 객체를 링크한다.
+    retry가 있으면 재시도 가능한 실패(5xx, 429, 연결 오류 등)를 백오프하며 다시 시도하고,
+    호스트 서킷이 열려 있으면 닫힐 때까지 기다린다.
+    metrics가 있으면 전체 소요 시간(재시도 포함)을 결과별로, 받은 바이트와 시도별 상태를 기록한다.
+    
     Returns:
         성공 여부
     """
+    max_attempts = retry.max_attempts if retry else 1
+    host = urlsplit(src).hostname or ""
+    received = 0
+    # 결과 라벨: ok / HTTP 상태 코드 / error(연결 오류, 타임아웃)
+    timing = metrics.time("download_seconds", status="error") if metrics else nullcontext({})
+
     try:
-        async with session.get(src) as res:
-            if res.status != 200:
-                logger.warning(f"다운로드 실패 (HTTP {res.status}): {src}")
-                return False
-            
-            content = await res.read()
-            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(file_path, "wb") as f:
-                f.write(content)
-            
-            logger.debug(f"저장 완료: {file_path}")
+        with timing as labels:
+            for attempt in range(1, max_attempts + 1):
+                if retry:
+                    await retry.breaker.wait(host)
+                    retry.stats['attempts'] += 1
+
+                retry_after = None
+                try:
+                    ok, status, retry_after, received = await _fetch_image(session, src, file_path, store, metrics)
+                    reason = f"HTTP {status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # 네트워크 오류는 재시도 대상
+                    ok, status, reason = False, 0, f"{type(e).__name__}: {e}"
+                except Exception as e:
+                    logger.error(f"이미지 다운로드 에러: {src}, {e}")
+                    if retry:
+                        retry.record('fatal', attempt)
+                    return False
+
+                labels["status"] = "ok" if ok else str(status or "error")
+                if metrics:
+                    metrics.inc("download_attempts_total", status=labels["status"])
+
+                if retry:
+                    # 서버가 응답했으면(5xx 제외) 호스트는 살아있는 것으로 봄
+                    if status == 0 or status >= 500:
+                        retry.breaker.record_failure(host)
+                    else:
+                        retry.breaker.record_success(host)
+
+                if ok:
+                    if retry:
+                        retry.record('ok', attempt)
+                    return True
+
+                if status != 0 and not RetryPolicy.is_retryable(status):
+                    logger.warning(f"다운로드 실패 ({reason}): {src}")
+                    if retry:
+                        retry.record('fatal', attempt)
+                    return False
+
+                if attempt == max_attempts:
+                    logger.warning(f"다운로드 실패 ({reason}, {attempt}회 시도): {src}")
+                    if retry:
+                        retry.record('exhausted', attempt)
+                    return False
+
+                delay = retry.backoff(attempt, retry_after)
+                logger.info(f"재시도 {attempt}/{max_attempts - 1} - {delay:.1f}초 후 ({reason}): {src}")
+                await asyncio.sleep(delay)
+
+            return False
+    finally:
+        if metrics and received:
+            metrics.inc("download_bytes_total", received)
+            metrics.observe("download_bytes", received, buckets=SIZE_BUCKETS)
+
+
+async def download_images(
+    session: aiohttp.ClientSession,
+    jobs: List[Tuple[str, str]],
+    concurrency: int = MAX_CONCURRENT_DOWNLOADS,
+    store: Optional[ImageStore] = None,
+    journal: Optional[RunJournal] = None,
+    retry: Optional[RetryPolicy] = None,
+    metrics: Optional[RunMetrics] = None
+) -> List[bool]:
+    """
+    여러 이미지를 동시에 다운로드
+    
+    Args:
+        session: aiohttp 세션
+        jobs: (src, file_path) 목록
+        concurrency: 동시에 진행할 최대 다운로드 수
+        store: 콘텐츠 주소 저장소 (None이면 파일로만 저장)
+        journal: 실행 기록 (이미 저장된 이미지는 건너뛰고, 새로 저장한 이미지를 기록)
+        retry: 재시도 정책 (None이면 한 번만 시도)
+        metrics: 실행 계측 (다운로드 히스토그램)
+    
+    Returns:
+        jobs와 같은 순서의 성공 여부 리스트 (완료 순서와 무관)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _download(src: str, file_path: str) -> bool:
+        if journal and journal.is_image_done(file_path) and os.path.exists(file_path):
             return True
-            
-    except Exception as e:
-        logger.error(f"이미지 다운로드 에러: {src}, {e}")
-        return False
+        async with semaphore:
+            return await download_image(session, src, file_path, store, retry, metrics)
+
+    results = await asyncio.gather(*(_download(src, path) for src, path in jobs))
+
+    if journal:
+        journal.mark_images(job for job, ok in zip(jobs, results) if ok)
+
+    return results
+
+
+# ============================================================================
+# 이미지 URL 추출
+# ============================================================================
+
+# 날짜 섹션별 src와 전체 src를 한 번의 evaluate로 수집
+# (JS 객체는 숫자형 키를 재정렬하므로 섹션은 [id, srcs] 배열로 반환)
+EXTRACT_IMAGE_SOURCES_JS = """
+() => {
+    const srcOf = img => img.getAttribute('src') || null;
+    const sections = Array.from(document.querySelectorAll('.date-photo-data'))
+        .map(section => [
+            section.getAttribute('id') || '',
+            Array.from(section.querySelectorAll('img')).map(srcOf)
+        ]);
+    const flat = Array.from(document.querySelectorAll('img')).map(srcOf);
+    return { sections, flat };
+}
+"""
+
+
+async def extract_image_sources(page: Page) -> Dict[str, Any]:
+    """
+    캡처 페이지의 이미지 URL을 한 번에 추출
+    
+    src가 없는 이미지는 None으로 남겨 파일 번호(img_N)가 DOM 순서와 일치하도록 함.
+    
+    Returns:
+        {'sections': {date_id: [src, ...]}, 'flat': [src, ...]}
+    """
+    raw = await page.evaluate(EXTRACT_IMAGE_SOURCES_JS)
 
+    sections: Dict[str, List[Optional[str]]] = {}
+    for date_id, srcs in raw["sections"]:
+        if not date_id:
+            continue
+        sections.setdefault(date_id, []).extend(srcs)
 
-async def save_all_images_flat(page: Page, folder_name: str, base_dir: str = "src/test/image") -> int:
+    return {"sections": sections, "flat": raw["flat"]}
+
+
+def plan_flat_jobs(srcs: List[Optional[str]], save_dir: Path) -> List[Tuple[str, str]]:
+    """전체 이미지 목록 → (src, file_path) 목록 (파일 번호는 DOM 순서 기준)"""
+    return [
+        (src, str(save_dir / f"img_{i+1}.jpg"))
+        for i, src in enumerate(srcs) if src
+    ]
+
+
+def plan_section_jobs(
+    sections: Dict[str, List[Optional[str]]],
+    user_dir: Path
+) -> Dict[str, List[Tuple[str, str]]]:
+    """날짜 섹션 → {date_id: [(src, file_path), ...]} (이미지 없는 섹션 제외)"""
+    return {
+        date_id: plan_flat_jobs(srcs, user_dir / parse_date_folder(date_id))
+        for date_id, srcs in sections.items() if srcs
+    }
+
+
+# ============================================================================
+# 이미지 저장
+# ============================================================================
+
+# 열려 있는 캡처 페이지 하나를 저장 (실행 전체는 process_all_captures → CapturePipeline)
+
+async def save_all_images_flat(
+    page: Page,
+    folder_name: str,
+    base_dir: str = "src/test/image",
+    concurrency: int = MAX_CONCURRENT_DOWNLOADS,
+    sources: Optional[Dict[str, Any]] = None,
+    store: Optional[ImageStore] = None,
+    journal: Optional[RunJournal] = None,
+    retry: Optional[RetryPolicy] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    metrics: Optional[RunMetrics] = None
+) -> int:
     """
     페이지의 모든 이미지를 한 폴더에 저장
     
+    Args:
+        sources: extract_image_sources 결과 (None이면 직접 추출)
+        store: 콘텐츠 주소 저장소 (None이면 파일로만 저장)
+        journal: 실행 기록 (None이면 기록하지 않음)
+        retry: 재시도 정책 (None이면 한 번만 시도)
+        session: 공유 HTTP 세션 (None이면 호출 동안만 쓸 세션 생성)
+        metrics: 실행 계측 (다운로드 히스토그램)
+    
     Returns:
         저장된 이미지 개수
     """
+    if sources is None:
+        sources = await extract_image_sources(page)
+
     save_dir = Path(base_dir) / folder_name
     save_dir.mkdir(parents=True, exist_ok=True)
 
-    imgs = page.locator("img")
-    count = await imgs.count()
+    srcs = sources["flat"]
+    count = len(srcs)
     logger.info(f"전체 이미지: {count}장")
 
-    saved_count = 0
-    async with aiohttp.ClientSession() as session:
-        for i in range(count):
-            src = await imgs.nth(i).get_attribute("src")
-            if not src:
-                continue
+    jobs = plan_flat_jobs(srcs, save_dir)
 
-            file_path = save_dir / f"img_{i+1}.jpg"
-            
-            if await download_image(session, src, str(file_path)):
-                saved_count += 1
+    async with session_scope(session) as session:
+        results = await download_images(session, jobs, concurrency, store, journal, retry, metrics)
 
+    saved_count = sum(results)
     logger.info(f"저장 완료: {saved_count}/{count}장")
     return saved_count
 
@@ -92,65 +416,107 @@ async def save_all_images_flat(page: Page, folder_name: str, base_dir: str = "sr
 async def save_images_by_date_section(
     page: Page, 
     folder_name: str, 
-    base_dir: str = "src/test/image"
+    base_dir: str = "src/test/image",
+    concurrency: int = MAX_CONCURRENT_DOWNLOADS,
+    sources: Optional[Dict[str, Any]] = None,
+    store: Optional[ImageStore] = None,
+    journal: Optional[RunJournal] = None,
+    retry: Optional[RetryPolicy] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    metrics: Optional[RunMetrics] = None
 ) -> int:
     """
     날짜 섹션별로 이미지 저장
     
+    Args:
+        sources: extract_image_sources 결과 (None이면 직접 추출)
+        store: 콘텐츠 주소 저장소 (None이면 파일로만 저장)
+        journal: 실행 기록 (None이면 기록하지 않음)
+        retry: 재시도 정책 (None이면 한 번만 시도)
+        session: 공유 HTTP 세션 (None이면 호출 동안만 쓸 세션 생성)
+        metrics: 실행 계측 (다운로드 히스토그램)
+    
     Returns:
         저장된 이미지 개수
     """
-    sections = page.locator(".date-photo-data")
-    section_count = await sections.count()
-    
-    logger.info(f"날짜 섹션: {section_count}개")
+    if sources is None:
+        sources = await extract_image_sources(page)
+
+    sections = sources["sections"]
+    logger.info(f"날짜 섹션: {len(sections)}개")
     
-    if section_count == 0:
+    if not sections:
         return 0
 
-    total_saved = 0
-    async with aiohttp.ClientSession() as session:
-        for i in range(section_count):
-            section = sections.nth(i)
-            date_id = await section.get_attribute("id")
-            
-            if not date_id:
-                continue
-            
-            date_folder = parse_date_folder(date_id)
-            
-            # 이미지 찾기
-            imgs = section.locator("img")
-            img_count = await imgs.count()
-            
-            if img_count == 0:
-                logger.debug(f"{date_folder}: 이미지 없음, 스킵")
-                continue
-            
-            logger.info(f"{date_folder}: {img_count}장")
-            
-            save_dir = Path(base_dir) / folder_name / date_folder
-            save_dir.mkdir(parents=True, exist_ok=True)
-
-            # 다운로드
-            for n in range(img_count):
-                src = await imgs.nth(n).get_attribute("src")
-                if not src:
-                    continue
-
-                file_path = save_dir / f"img_{n+1}.jpg"
-                
-                if await download_image(session, src, str(file_path)):
-                    total_saved += 1
-
-    return total_saved
+    jobs: List[Tuple[str, str]] = []
+    for date_id, date_jobs in plan_section_jobs(sections, Path(base_dir) / folder_name).items():
+        logger.info(f"{parse_date_folder(date_id)}: {len(sections[date_id])}장")
+        jobs.extend(date_jobs)
+
+    # 섹션 구분 없이 한 번에 동시 다운로드
+    async with session_scope(session) as session:
+        results = await download_images(session, jobs, concurrency, store, journal, retry, metrics)
+
+    return sum(results)
 
 
 # ============================================================================
 # 캡처 페이지 처리
 # ============================================================================
 
-async def process_user_capture(page: Page, row: Dict, base_dir: str = "src/test/image") -> bool:
+def get_folder_name(row: Dict) -> str:
+    """행 데이터로 사용자 저장 폴더명 생성"""
+    return sanitize_folder_name(f"{row['fbUid']}_{row['nick']}_{row['country']}_{row['gender']}")
+
+
+async def save_capture_page(
+    capture_page: Page,
+    row: Dict,
+    base_dir: str = "src/test/image",
+    concurrency: int = MAX_CONCURRENT_DOWNLOADS,
+    store: Optional[ImageStore] = None,
+    journal: Optional[RunJournal] = None,
+    retry: Optional[RetryPolicy] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    metrics: Optional[RunMetrics] = None
+) -> int:
+    """
+    열려 있는 캡처 페이지의 이미지 저장
+    
+    Returns:
+        저장된 이미지 개수
+    """
+    folder_name = get_folder_name(row)
+
+    # 이미지 URL을 한 번에 추출
+    sources = await extract_image_sources(capture_page)
+
+    if not sources["sections"]:
+        # 날짜 정보 없음 - 전체 저장
+        logger.info("날짜 정보 없음 → 전체 이미지 저장")
+        return await save_all_images_flat(
+            capture_page, folder_name, base_dir, concurrency, sources,
+            store=store, journal=journal, retry=retry, session=session, metrics=metrics
+        )
+
+    # 날짜별 저장
+    return await save_images_by_date_section(
+        capture_page, folder_name, base_dir, concurrency, sources,
+        store=store, journal=journal, retry=retry, session=session, metrics=metrics
+    )
+
+
+async def process_user_capture(
+    page: Page,
+    row: Dict,
+    base_dir: str = "src/test/image",
+    concurrency: int = MAX_CONCURRENT_DOWNLOADS,
+    store: Optional[ImageStore] = None,
+    journal: Optional[RunJournal] = None,
+    retry: Optional[RetryPolicy] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    metrics: Optional[RunMetrics] = None
+) -> bool:
     """
     사용자 캡처 페이지 처리 및 이미지 저장
     
@@ -158,17 +524,19 @@ async def process_user_capture(page: Page, row: Dict, base_dir: str = "src/test/
         page: 현재 페이지 (목록 페이지)
         row: filtered_data의 한 행
         base_dir: 이미지 저장 기본 경로
+        concurrency: 페이지 내 동시 다운로드 수
+        store: 콘텐츠 주소 저장소 (None이면 파일로만 저장)
+        journal: 실행 기록 (None이면 기록하지 않음)
+        retry: 재시도 정책 (None이면 한 번만 시도)
+        session: 공유 HTTP 세션 (None이면 호출 동안만 쓸 세션 생성)
+        metrics: 실행 계측 (다운로드 히스토그램)
     
     Returns:
         처리 성공 여부
     """
     fb_uid = row["fbUid"]
     nick = row["nick"]
-    country = row["country"]
-    gender = row["gender"]
 
-    folder_name = sanitize_folder_name(f"{fb_uid}_{nick}_{country}_{gender}")
-    
     logger.info(f"=== [{fb_uid}] {nick} 캡처 시작 ===")
 
     try:
@@ -179,17 +547,10 @@ async def process_user_capture(page: Page, row: Dict, base_dir: str = "src/test/
         new_page = await popup.value
         await new_page.wait_for_load_state("networkidle")
 
-        # 날짜 섹션 확인
-        sections = new_page.locator(".date-photo-data")
-        section_count = await sections.count()
-
-        if section_count == 0:
-            # 날짜 정보 없음 - 전체 저장
-            logger.info("날짜 정보 없음 → 전체 이미지 저장")
-            saved = await save_all_images_flat(new_page, folder_name, base_dir)
-        else:
-            # 날짜별 저장
-            saved = await save_images_by_date_section(new_page, folder_name, base_dir)
+        saved = await save_capture_page(
+            new_page, row, base_dir, concurrency,
+            store=store, journal=journal, retry=retry, session=session, metrics=metrics
+        )
 
         await new_page.close()
         
@@ -205,40 +566,84 @@ async def process_all_captures(
     page: Page, 
     filtered_data: list, 
     batch_size: int = 3,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    recycle_after: int = 20,
+    base_dir: str = "src/test/image",
+    store: Optional[ImageStore] = None,
+    journal: Optional[RunJournal] = None,
+    retry: Optional[RetryPolicy] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    concurrency: int = MAX_CONCURRENT_DOWNLOADS,
+    config: Optional["PipelineConfig"] = None,
+    user_state: Optional[UserStateStore] = None,
+    storage: Optional[Storage] = None,
+    aggregates: Optional[RunAggregates] = None,
+    metrics: Optional[RunMetrics] = None
 ) -> Dict[str, int]:
     """
     모든 사용자 캡처 처리
     
+    CapturePipeline으로 실행한다: batch_size개의 탭이 캡처 페이지를 여는 동안
+    concurrency개의 다운로더가 앞서 수집된 이미지를 받는다.
+    captureLink가 없는 행은 목록 페이지에서 팝업을 여는 기존 방식으로 (한 번에 하나씩) 처리.
+    
     Args:
-        page: Page 객체
+        page: Page 객체 (목록 페이지)
         filtered_data: 처리할 데이터 리스트
-        batch_size: 한 번에 처리할 개수 (기본값: 10)
+        batch_size: 동시에 처리할 탭 개수 (기본값: 3)
         limit: 처리할 최대 개수 (None이면 전체 처리, 테스트용)
+        recycle_after: 탭 하나가 처리할 최대 사용자 수 (이후 새 탭으로 교체)
+        base_dir: 이미지 저장 기본 경로
+        store: 콘텐츠 주소 저장소 (None이면 파일로만 저장)
+        journal: 실행 기록 (이미 완료된 사용자는 건너뜀)
+        retry: 이미지 다운로드 재시도 정책 (None이면 한 번만 시도)
+        session: 실행 전체에서 공유할 HTTP 세션 (create_http_session으로 생성)
+        concurrency: 동시 이미지 다운로드 수
+        config: 파이프라인 세부 설정 (주면 batch_size/recycle_after/base_dir/concurrency 대신 사용)
+        user_state: 사용자별 마지막 캡처 상태 (주면 lastLogin이 바뀐 사용자와 새 날짜 섹션만 처리)
+        storage: SQLite 저장소 (주면 captures/images 행 기록)
+        aggregates: 리포트용 누적 집계 (report.RunAggregates)
+        metrics: 실행 계측 (캡처/다운로드 히스토그램)
     
     Returns:
-        {'success': 성공 수, 'failed': 실패 수}
+        {'success': 성공 수, 'failed': 실패 수, 이미지/큐 집계, 재시도 정책이 있으면 'download_*' 집계 포함}
     """
-    stats = {'success': 0, 'failed': 0}
-    
+    # 순환 import 방지 (pipeline이 이 모듈의 함수들을 사용)
+    from pipeline import CapturePipeline, PipelineConfig
+
+    # 증분 실행: 마지막 캡처 이후 다시 로그인한 사용자만 (limit보다 먼저 적용)
+    if user_state:
+        filtered_data = user_state.delta(filtered_data)
+
     # limit 적용
     data_to_process = filtered_data[:limit] if limit else filtered_data
-    total = len(data_to_process)
-    
-    logger.info(f"총 {total}건을 {batch_size}개씩 배치 처리 시작" + 
+
+    # 이전 실행에서 이미 완료된 사용자 제외
+    if journal:
+        pending = [row for row in data_to_process if not journal.is_user_done(row["fbUid"])]
+        if len(pending) < len(data_to_process):
+            logger.info(f"이미 완료된 {len(data_to_process) - len(pending)}명 건너뜀")
+        data_to_process = pending
+
+    config = config or PipelineConfig(
+        harvesters=batch_size,
+        downloaders=concurrency,
+        recycle_after=recycle_after,
+        base_dir=base_dir,
+    )
+
+    logger.info(f"총 {len(data_to_process)}건을 탭 {config.harvesters}개, 다운로더 {config.downloaders}개로 처리 시작" + 
                 (f" (전체 {len(filtered_data)}건 중 {limit}건만 처리)" if limit else ""))
-    
-    for idx, row in enumerate(data_to_process, 1):
-        logger.info(f"진행: {idx}/{total}")
-        
-        if await process_user_capture(page, row):
-            stats['success'] += 1
-        else:
-            stats['failed'] += 1
-        
-        # 배치 단위로 완료될 때마다 로그
-        if idx % batch_size == 0:
-            logger.info(f"배치 완료: {idx}/{total} - 성공: {stats['success']}, 실패: {stats['failed']}")
-    
+
+    pipeline = CapturePipeline(
+        page, config, store=store, journal=journal, retry=retry, session=session,
+        user_state=user_state, storage=storage, aggregates=aggregates,
+        metrics=metrics
+    )
+    stats = await pipeline.run(data_to_process)
+
+    if retry:
+        stats.update(retry.summary())
+
     logger.info(f"전체 완료 - 성공: {stats['success']}, 실패: {stats['failed']}")
-    return stats
\ No newline at end of file
+    return stats
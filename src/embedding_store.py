@@ -0,0 +1,355 @@
+# src/embedding_store.py
+"""
+프로필 임베딩 저장소 + 최근접 검색
+
+vectors.f32 (float32 행렬, 이어쓰기) / ids.tsv (행 번호 → fb_uid, image_id) / meta.json (차원, 행 수)
+검색은 memmap을 블록 단위로 읽어 행렬곱으로 처리하므로 전체를 메모리에 올리지 않는다.
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 행렬곱할 저장 행 수
+BLOCK_ROWS = 65536
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _merge_topk(
+    best_idx: np.ndarray,
+    best_score: np.ndarray,
+    idx: np.ndarray,
+    score: np.ndarray,
+    k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(쿼리 수 × k) 현재 상위 k와 새 후보를 합쳐 다시 상위 k"""
+    all_idx = np.concatenate([best_idx, idx], axis=1)
+    all_score = np.concatenate([best_score, score], axis=1)
+    if all_score.shape[1] > k:
+        part = np.argpartition(-all_score, k - 1, axis=1)[:, :k]
+        all_idx = np.take_along_axis(all_idx, part, axis=1)
+        all_score = np.take_along_axis(all_score, part, axis=1)
+    return all_idx, all_score
+
+
+class EmbeddingStore:
+    """
+    fb_uid / image_id로 찾는 임베딩 저장소
+
+    - 벡터는 L2 정규화해서 저장 → 코사인 유사도 = 내적
+    - meta.json의 행 수가 기준 (쓰다 중단되어 남은 꼬리 바이트는 무시하고 덮어씀)
+    - build_ivf()로 거친 분할(IVF) 색인을 만들면 nprobe개 분할만 검색
+    """
+
+    def __init__(self, root: str = "data/embeddings", dim: int = 512):
+        """
+        Args:
+            root: 저장 폴더
+            dim: 임베딩 차원 (기존 저장소가 있으면 그 값을 씀)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.root / "vectors.f32"
+        self.ids_path = self.root / "ids.tsv"
+        self.meta_path = self.root / "meta.json"
+
+        meta = json.loads(self.meta_path.read_text()) if self.meta_path.exists() else {}
+        self.dim = meta.get("dim", dim)
+        self.count = meta.get("count", 0)
+
+        self.ids: List[Tuple[str, str]] = []
+        self._rows_by_uid: Dict[str, List[int]] = defaultdict(list)
+        self._ids_bytes = 0     # ids.tsv에서 count행까지의 바이트 (꼬리 자르기용)
+        if self.ids_path.exists():
+            with open(self.ids_path, "rb") as f:
+                for line in f:
+                    if len(self.ids) >= self.count:
+                        break
+                    fb_uid, image_id = line.decode("utf-8").rstrip("\n").split("\t")
+                    self._rows_by_uid[fb_uid].append(len(self.ids))
+                    self.ids.append((fb_uid, image_id))
+                    self._ids_bytes += len(line)
+
+        self._matrix: Optional[np.memmap] = None
+        self._ivf_centroids: Optional[np.ndarray] = None
+        self._ivf_lists: Optional[List[np.ndarray]] = None
+        self._ivf_count = 0
+        self._load_ivf()
+
+    # ------------------------------------------------------------------
+    # 저장
+    # ------------------------------------------------------------------
+
+    def _save_meta(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"dim": self.dim, "count": self.count}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def add(self, fb_uids: List[str], image_ids: List[str], vectors: np.ndarray) -> None:
+        """
+        임베딩 일괄 추가 (파일 끝에 이어씀)
+
+        Args:
+            fb_uids: 행별 사용자
+            image_ids: 행별 이미지 id (images.id 또는 경로)
+            vectors: (행 수 × dim) 임베딩
+        """
+        vectors = _normalize(vectors)
+        if vectors.shape != (len(fb_uids), self.dim) or len(image_ids) != len(fb_uids):
+            raise ValueError(f"임베딩 모양이 맞지 않음: {vectors.shape}, ids {len(fb_uids)}/{len(image_ids)}")
+
+        # 중단된 쓰기의 꼬리를 잘라내고 이어씀
+        row_bytes = self.dim * 4
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(self.count * row_bytes)
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        lines = "".join(f"{uid}\t{image_id}\n" for uid, image_id in zip(fb_uids, image_ids)).encode("utf-8")
+        with open(self.ids_path, "ab") as f:
+            f.truncate(self._ids_bytes)
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._ids_bytes += len(lines)
+
+        for uid, image_id in zip(fb_uids, image_ids):
+            self._rows_by_uid[uid].append(len(self.ids))
+            self.ids.append((uid, image_id))
+        self.count += len(fb_uids)
+        self._save_meta()
+        self._matrix = None
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """읽기 전용 memmap (count × dim)"""
+        if self._matrix is None:
+            if self.count == 0:
+                return np.empty((0, self.dim), dtype=np.float32)
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+        return self._matrix
+
+    def user_vectors(self, fb_uid: str) -> np.ndarray:
+        rows = self._rows_by_uid.get(fb_uid, [])
+        return np.asarray(self.matrix[rows]) if rows else np.empty((0, self.dim), dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # 전체 검색
+    # ------------------------------------------------------------------
+
+    def _scan(self, queries: np.ndarray, k: int, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """[start, stop) 행을 블록 단위로 훑어 쿼리별 상위 k"""
+        best_idx = np.empty((len(queries), 0), dtype=np.int64)
+        best_score = np.empty((len(queries), 0), dtype=np.float32)
+        matrix = self.matrix
+        for offset in range(start, stop, BLOCK_ROWS):
+            block = np.asarray(matrix[offset:min(offset + BLOCK_ROWS, stop)])
+            scores = queries @ block.T
+            take = min(k, scores.shape[1])
+            part = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_idx, best_score = _merge_topk(
+                best_idx, best_score, part + offset, np.take_along_axis(scores, part, axis=1), k
+            )
+        return best_idx, best_score
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        코사인 유사도 상위 k 검색
+
+        Args:
+            queries: (쿼리 수 × dim)
+            k: 쿼리별 결과 수
+            nprobe: IVF 색인이 있으면 검색할 분할 수 (None이면 전체 검색)
+
+        Returns:
+            (행 번호, 유사도) - 각각 (쿼리 수 × k), 유사도 높은 순
+            (IVF 검색에서 후보가 모자란 쿼리는 뒤쪽이 행 번호 -1, 유사도 -inf)
+        """
+        queries = _normalize(queries)
+        if nprobe and self._ivf_centroids is not None:
+            idx, score = self._search_ivf(queries, k, nprobe)
+        else:
+            idx, score = self._scan(queries, k, 0, self.count)
+
+        order = np.argsort(-score, axis=1)
+        return np.take_along_axis(idx, order, axis=1), np.take_along_axis(score, order, axis=1)
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def _load_ivf(self) -> None:
+        path = self.root / "ivf.npz"
+        if not path.exists():
+            return
+        data = np.load(path)
+        self._ivf_centroids = data["centroids"]
+        assign = data["assign"]
+        self._ivf_count = len(assign)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self._ivf_centroids) + 1))
+        self._ivf_lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._ivf_centroids))]
+
+    def build_ivf(self, nlist: int = 256, iters: int = 10, sample: int = 50_000, seed: int = 0) -> None:
+        """
+        구면 k-means로 nlist개 분할을 만들고 모든 행을 배정 (ivf.npz 저장)
+
+        이후 추가된 행은 다시 만들 때까지 전체 검색 대상으로 처리됨.
+        """
+        if self.count == 0:
+            return
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(self.count, size=min(sample, self.count), replace=False))
+        data = np.asarray(self.matrix[sample_rows])
+        centroids = data[rng.choice(len(data), size=min(nlist, len(data)), replace=False)]
+
+        for _ in range(iters):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = data[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+
+        assign = np.empty(self.count, dtype=np.int32)
+        for offset in range(0, self.count, BLOCK_ROWS):
+            block = np.asarray(self.matrix[offset:offset + BLOCK_ROWS])
+            assign[offset:offset + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        np.savez(self.root / "ivf.npz", centroids=centroids, assign=assign)
+        self._load_ivf()
+        logger.info(f"IVF 색인 생성: {self.count}개 → {len(centroids)}개 분할")
+
+    def _search_ivf(self, queries: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        matrix = self.matrix
+        probes = np.argsort(-(queries @ self._ivf_centroids.T), axis=1)[:, :nprobe]
+        tail_idx, tail_score = self._scan(queries, k, self._ivf_count, self.count)
+
+        results_idx, results_score = [], []
+        for qi, query in enumerate(queries):
+            rows = np.sort(np.concatenate([self._ivf_lists[p] for p in probes[qi]]))
+            if len(rows):
+                scores = np.asarray(matrix[rows]) @ query
+                take = min(k, len(rows))
+                part = np.argpartition(-scores, take - 1)[:take]
+                idx, score = _merge_topk(
+                    tail_idx[qi:qi + 1], tail_score[qi:qi + 1], rows[part][None, :], scores[part][None, :], k
+                )
+            else:
+                idx, score = tail_idx[qi:qi + 1], tail_score[qi:qi + 1]
+            results_idx.append(idx[0])
+            results_score.append(score[0])
+
+        # 후보가 k개보다 적은 쿼리는 행 번호 -1, 유사도 -inf로 채움 (다른 쿼리 결과를 자르지 않도록)
+        width = max((len(r) for r in results_idx), default=0)
+        out_idx = np.full((len(queries), width), -1, dtype=np.int64)
+        out_score = np.full((len(queries), width), -np.inf, dtype=np.float32)
+        for qi, (idx, score) in enumerate(zip(results_idx, results_score)):
+            out_idx[qi, :len(idx)] = idx
+            out_score[qi, :len(score)] = score
+        return out_idx, out_score
+
+    # ------------------------------------------------------------------
+    # 사용자 단위
+    # ------------------------------------------------------------------
+
+    def nearest_users(self, fb_uid: str, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        이 사용자와 가장 가까운 다른 사용자 (사용자 임베딩 각각의 최고 유사도 기준)
+
+        Returns:
+            [(fb_uid, 유사도), ...] 높은 순
+        """
+        queries = self.user_vectors(fb_uid)
+        if not len(queries):
+            return []
+
+        # 자기 자신 행이 상위를 차지하므로 그만큼 더 가져옴
+        idx, score = self.search(queries, k + len(queries), nprobe)
+        best: Dict[str, float] = {}
+        for row, value in zip(idx.ravel(), score.ravel()):
+            if row < 0:
+                continue
+            uid = self.ids[row][0]
+            if uid != fb_uid and value > best.get(uid, -2.0):
+                best[uid] = float(value)
+        return sorted(best.items(), key=lambda item: -item[1])[:k]
+
+
+# ============================================================================
+# 합성 데이터 / 벤치마크
+# ============================================================================
+
+def synthetic_embeddings(
+    n_users: int,
+    per_user: int = 4,
+    dim: int = 512,
+    noise: float = 0.3,
+    seed: int = 0
+) -> Tuple[List[str], List[str], np.ndarray]:
+    """사용자마다 중심 벡터 주변에 흩어진 가짜 임베딩 (같은 사람 매칭 확인용)"""
+    rng = np.random.default_rng(seed)
+    centers = _normalize(rng.standard_normal((n_users, dim), dtype=np.float32))
+    vectors = np.repeat(centers, per_user, axis=0)
+    vectors += noise * rng.standard_normal(vectors.shape, dtype=np.float32) / np.sqrt(dim)
+    uids = [f"u{i}" for i in range(n_users) for _ in range(per_user)]
+    image_ids = [f"u{i}/img_{j}" for i in range(n_users) for j in range(per_user)]
+    return uids, image_ids, vectors
+
+
+def benchmark(n_users: int = 50_000, per_user: int = 4, dim: int = 512, root: Optional[str] = None) -> Dict[str, float]:
+    """
+    합성 임베딩으로 전체 검색 / IVF 검색 시간 측정
+
+    u0과 같은 중심을 쓰는 가짜 계정(dup)을 넣고 가장 가까운 사용자로 찾는지 확인한다.
+    """
+    if root is None:
+        with tempfile.TemporaryDirectory(prefix="embeddings_") as tmp:
+            return benchmark(n_users, per_user, dim, tmp)
+
+    store = EmbeddingStore(root, dim)
+    uids, image_ids, vectors = synthetic_embeddings(n_users, per_user, dim)
+    for start in range(0, len(uids), 100_000):
+        store.add(uids[start:start + 100_000], image_ids[start:start + 100_000], vectors[start:start + 100_000])
+    dup = vectors[:per_user] + 0.01
+    store.add(["dup"] * per_user, [f"dup/img_{j}" for j in range(per_user)], dup)
+
+    t0 = time.perf_counter()
+    exact = store.nearest_users("dup", 5)
+    exact_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    store.build_ivf(nlist=int(np.sqrt(store.count)))
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    approx = store.nearest_users("dup", 5, nprobe=8)
+    ivf_s = time.perf_counter() - t0
+
+    assert exact[0][0] == "u0" and approx[0][0] == "u0", (exact, approx)
+    return {
+        "vectors": store.count,
+        "exact_s": round(exact_s, 4),
+        "ivf_build_s": round(build_s, 2),
+        "ivf_s": round(ivf_s, 4),
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(benchmark())
@@ -0,0 +1,218 @@
+# src/exporter.py
+"""
+캡처 폴더 ZIP 내보내기
+
+    python src/exporter.py --by user                 # 사용자별 zip
+    python src/exporter.py --by week --week 2026-W41 # 주차별 zip (해당 주 날짜 폴더만)
+
+압축 파일 이름에는 내보낸 시각이 붙으므로 (예: 2026-W41_20261012_093000.zip) 이전 내보내기를 덮어쓰지 않는다.
+
+JPEG 등 이미 압축된 파일은 ZIP_STORED로 그대로 넣고, 파일은 청크 단위로 스트리밍.
+서로 독립인 압축 파일은 프로세스 풀에서 동시에 만든다.
+"""
+import os
+import json
+import hashlib
+import zipfile
+import logging
+import argparse
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from weeks import week_key
+
+logger = logging.getLogger(__name__)
+
+# 다시 압축해도 줄지 않는 형식
+STORED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".zip")
+COPY_BUFFER = 1024 * 1024
+
+
+# ============================================================================
+# 대상 수집
+# ============================================================================
+
+def _walk_files(folder: Path) -> List[Path]:
+    files = []
+    stack = [folder]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file() and not entry.name.startswith("."):
+                    files.append(Path(entry.path))
+    return sorted(files)
+
+
+def plan_archives(
+    root: str,
+    by: str = "user",
+    week: Optional[str] = None,
+    users: Optional[List[str]] = None
+) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    압축 파일 이름 → [(원본 경로, zip 안 경로), ...]
+
+    Args:
+        root: 이미지 루트 (사용자/날짜/img_N.jpg)
+        by: 'user' (사용자별) 또는 'week' (ISO 주차별)
+        week: 이 주차(예: 2026-W41)의 날짜 폴더만
+        users: 이 사용자 폴더만
+    """
+    root_path = Path(root)
+    archives: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+
+    with os.scandir(root_path) as it:
+        user_dirs = sorted(entry.name for entry in it if entry.is_dir(follow_symlinks=False))
+
+    for user in user_dirs:
+        if users and user not in users:
+            continue
+        with os.scandir(root_path / user) as it:
+            children = sorted(it, key=lambda e: e.name)
+
+        for child in children:
+            if child.is_dir(follow_symlinks=False):
+                child_week = week_key(child.name)
+                files = _walk_files(Path(child.path))
+            else:
+                # 날짜 섹션 없이 저장된 이미지
+                child_week = None
+                files = [Path(child.path)] if child.is_file() and not child.name.startswith(".") else []
+
+            if week and child_week != week:
+                continue
+            if by == "week":
+                name = child_week or "undated"
+            else:
+                name = user
+
+            for path in files:
+                archives[name].append((str(path), path.relative_to(root_path).as_posix()))
+
+    return dict(archives)
+
+
+# ============================================================================
+# 압축
+# ============================================================================
+
+def build_archive(out_path: str, files: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    zip 한 개 생성 (프로세스 풀에서 실행)
+
+    파일 내용은 COPY_BUFFER 단위로 읽어 쓰며 sha256도 함께 계산해 manifest.json에 넣는다.
+    out_path가 이미 있으면 덮어쓰지 않고 FileExistsError.
+
+    Returns:
+        {'archive', 'files', 'bytes', 'archive_bytes'}
+    """
+    out = Path(out_path)
+    if out.exists():
+        raise FileExistsError(f"이미 있는 압축 파일: {out}")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=out.parent, prefix=f".{out.name}.", suffix=".part")
+    os.close(fd)
+
+    entries = []
+    total = 0
+    try:
+        with zipfile.ZipFile(tmp_path, "w", allowZip64=True) as zf:
+            for src, arcname in files:
+                stat = os.stat(src)
+                info = zipfile.ZipInfo.from_file(src, arcname)
+                info.compress_type = (
+                    zipfile.ZIP_STORED if arcname.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+                )
+                hasher = hashlib.sha256()
+                # from_file이 file_size를 채워두므로 4GB 넘는 항목은 zipfile이 ZIP64 헤더로 씀
+                with open(src, "rb") as fin, zf.open(info, "w") as fout:
+                    while chunk := fin.read(COPY_BUFFER):
+                        hasher.update(chunk)
+                        fout.write(chunk)
+                entries.append({"path": arcname, "bytes": stat.st_size, "sha256": hasher.hexdigest()})
+                total += stat.st_size
+
+            manifest = {"created_at": datetime.now().isoformat(), "files": entries}
+            zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=1),
+                        compress_type=zipfile.ZIP_DEFLATED)
+        os.replace(tmp_path, out)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return {"archive": str(out), "files": len(entries), "bytes": total, "archive_bytes": out.stat().st_size}
+
+
+def export(
+    root: str = "src/test/image",
+    out_dir: str = "exports",
+    by: str = "user",
+    week: Optional[str] = None,
+    users: Optional[List[str]] = None,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    압축 파일들을 병렬로 만들고 전체 manifest(out_dir/manifest_*.json) 저장
+
+    Returns:
+        전체 manifest ({'archives': [...], ...}), 루트 폴더가 없으면 archives가 빈 manifest
+    """
+    manifest = {
+        "created_at": datetime.now().isoformat(),
+        "root": str(Path(root).resolve()),
+        "by": by,
+        "week": week,
+        "archives": [],
+    }
+    if not Path(root).is_dir():
+        logger.error(f"이미지 루트 폴더가 없음: {root}")
+        return manifest
+
+    archives = plan_archives(root, by, week, users)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    logger.info(f"내보내기 시작: 압축 파일 {len(archives)}개, 파일 {sum(len(f) for f in archives.values())}개")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            name: pool.submit(build_archive, str(Path(out_dir) / f"{name}_{stamp}.zip"), files)
+            for name, files in archives.items()
+        }
+        for name, future in futures.items():
+            try:
+                results.append(future.result())
+                logger.info(f"압축 완료: {name}_{stamp}.zip ({results[-1]['files']}개)")
+            except Exception as e:
+                logger.error(f"압축 실패: {name}_{stamp}.zip, {e}")
+
+    manifest["archives"] = results
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    manifest_path = Path(out_dir) / f"manifest_{stamp}.json"
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.info(f"내보내기 완료: {manifest_path}")
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="캡처 폴더를 zip으로 내보내기")
+    parser.add_argument("--root", default="src/test/image", help="이미지 루트 폴더")
+    parser.add_argument("--out", default="exports", help="zip 저장 폴더")
+    parser.add_argument("--by", choices=["user", "week"], default="user", help="압축 단위")
+    parser.add_argument("--week", help="이 ISO 주차만 (예: 2026-W41)")
+    parser.add_argument("--user", action="append", dest="users", help="이 사용자 폴더만 (여러 번 지정 가능)")
+    parser.add_argument("--workers", type=int, help="동시에 만들 압축 파일 수 (기본: CPU 수)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    export(args.root, args.out, args.by, args.week, args.users, args.workers)
+
+
+if __name__ == "__main__":
+    main()
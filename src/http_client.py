@@ -0,0 +1,96 @@
+# src/http_client.py
+import logging
+import aiohttp
+from http.cookies import SimpleCookie
+from typing import Optional
+from urllib.parse import urlsplit
+from playwright.async_api import Page
+from yarl import URL
+
+logger = logging.getLogger(__name__)
+
+# 커넥터 설정
+CONNECTION_LIMIT = 32             # 커넥터 전체 연결 수
+CONNECTION_LIMIT_PER_HOST = 8     # 호스트별 연결 수
+KEEPALIVE_TIMEOUT = 30            # 유휴 연결 유지 시간(초)
+DNS_CACHE_TTL = 300               # DNS 캐시 유지 시간(초)
+
+# 스트리밍 다운로드에 맞춘 타임아웃 (전체 시간 제한 없이 연결/읽기 단위로 제한)
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)
+
+
+def create_connector(
+    limit: int = CONNECTION_LIMIT,
+    limit_per_host: int = CONNECTION_LIMIT_PER_HOST
+) -> aiohttp.TCPConnector:
+    """keep-alive, DNS 캐시, 연결 수 제한이 설정된 커넥터"""
+    return aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+
+
+async def _copy_browser_cookies(page: Page, jar: aiohttp.CookieJar) -> int:
+    """브라우저 컨텍스트의 쿠키를 aiohttp 쿠키 저장소로 복사"""
+    cookies = await page.context.cookies()
+
+    for c in cookies:
+        morsel = SimpleCookie()
+        morsel[c["name"]] = c["value"]
+        morsel[c["name"]]["path"] = c.get("path") or "/"
+        if c.get("secure"):
+            morsel[c["name"]]["secure"] = True
+
+        domain = c.get("domain", "")
+        if domain.startswith("."):
+            # 도메인 쿠키 (하위 도메인 포함)
+            morsel[c["name"]]["domain"] = domain.lstrip(".")
+            jar.update_cookies(morsel)
+        else:
+            # 호스트 전용 쿠키
+            jar.update_cookies(morsel, response_url=URL(f"https://{domain}/"))
+
+    return len(cookies)
+
+
+async def create_http_session(
+    page: Optional[Page] = None,
+    limit: int = CONNECTION_LIMIT,
+    limit_per_host: int = CONNECTION_LIMIT_PER_HOST
+) -> aiohttp.ClientSession:
+    """
+    실행 전체에서 공유할 HTTP 세션 생성
+
+    page를 넘기면 로그인된 브라우저 컨텍스트의 쿠키와 User-Agent/Referer를 복사해
+    인증이 필요한 이미지도 브라우저를 거치지 않고 받을 수 있게 한다.
+
+    Args:
+        page: 로그인된 Playwright 페이지 (None이면 쿠키 없는 세션)
+        limit: 커넥터 전체 연결 수
+        limit_per_host: 호스트별 연결 수
+
+    Returns:
+        aiohttp 세션 (호출한 쪽에서 close 필요)
+    """
+    jar = aiohttp.CookieJar(unsafe=True)
+    headers = {}
+
+    if page is not None:
+        cookie_count = await _copy_browser_cookies(page, jar)
+        headers["User-Agent"] = await page.evaluate("() => navigator.userAgent")
+
+        origin = urlsplit(page.url)
+        if origin.scheme and origin.netloc:
+            headers["Referer"] = f"{origin.scheme}://{origin.netloc}/"
+
+        logger.info(f"HTTP 세션 생성: 브라우저 쿠키 {cookie_count}개 복사")
+
+    return aiohttp.ClientSession(
+        connector=create_connector(limit, limit_per_host),
+        cookie_jar=jar,
+        headers=headers,
+        timeout=DEFAULT_TIMEOUT,
+    )
@@ -0,0 +1,196 @@
+# src/image_index.py
+import os
+import json
+import time
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# 디렉토리 mtime이 스캔 시각과 이만큼 가까우면 같은 틱에 바뀌었을 수 있으므로 캐시를 믿지 않음
+RACY_WINDOW_NS = 2_000_000_000
+
+# 사용자 폴더 바로 아래 이미지(날짜 섹션 없이 저장된 경우)의 날짜 키
+NO_DATE = ""
+
+
+@dataclass
+class IndexSummary:
+    """스캔 결과 집계"""
+    users: Dict[str, Dict[str, int]] = field(default_factory=dict)              # 사용자 → {'count', 'bytes'}
+    dates: Dict[str, Dict[str, Dict[str, int]]] = field(default_factory=dict)   # 사용자 → 날짜 → {'count', 'bytes'}
+    scanned_dirs: int = 0   # 다시 읽은 디렉토리 수
+    reused_dirs: int = 0    # 색인을 그대로 쓴 디렉토리 수
+    elapsed: float = 0.0
+
+    @property
+    def total_count(self) -> int:
+        return sum(user["count"] for user in self.users.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(user["bytes"] for user in self.users.values())
+
+
+class ImageIndex:
+    """
+    이미지 폴더(사용자/날짜/img_N.jpg) 증분 색인
+
+    디렉토리별로 (mtime, 이미지 수, 바이트, 하위 폴더)를 저장해 두고,
+    mtime이 그대로인 디렉토리는 파일을 다시 나열하지 않는다.
+    (다운로더는 임시 파일 → os.replace로 저장하므로 파일이 생기거나 바뀌면 디렉토리 mtime이 바뀜)
+    사용자 폴더 단위로 스레드 풀에 나눠 스캔한다.
+    """
+
+    def __init__(
+        self,
+        root: str = "src/test/image",
+        index_path: str = "data/image_index.json",
+        workers: int = 8
+    ):
+        """
+        Args:
+            root: 이미지 루트 폴더
+            index_path: 색인 파일 경로
+            workers: 스캔 스레드 수
+        """
+        self.root = Path(root)
+        self.index_path = Path(index_path)
+        self.workers = workers
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------
+    # 색인 파일
+    # ------------------------------------------------------------------
+
+    def load(self) -> None:
+        if not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"이미지 색인 로드 실패 (전체 다시 스캔): {e}")
+            return
+        if data.get("root") == str(self.root.resolve()):
+            self._entries = data.get("dirs", {})
+
+    def save(self) -> None:
+        """색인 파일 원자적 저장"""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"root": str(self.root.resolve()), "dirs": self._entries}
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    # ------------------------------------------------------------------
+    # 스캔
+    # ------------------------------------------------------------------
+
+    def _read_dir(self, path: str, mtime_ns: int) -> Dict[str, Any]:
+        count = size = 0
+        dirs: List[str] = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif not entry.name.startswith(".") and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    count += 1
+                    size += entry.stat(follow_symlinks=False).st_size
+        return {"mtime_ns": mtime_ns, "scanned_ns": time.time_ns(), "count": count, "bytes": size, "dirs": dirs}
+
+    def _walk(self, user: str) -> Tuple[Dict[str, Dict[str, Any]], int, int]:
+        """사용자 폴더 하나를 스캔 (스레드에서 실행)"""
+        entries: Dict[str, Dict[str, Any]] = {}
+        scanned = reused = 0
+        stack = [user]
+
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(self.root, rel)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                cached = self._entries.get(rel)
+                if cached and cached["mtime_ns"] == mtime_ns and mtime_ns + RACY_WINDOW_NS < cached["scanned_ns"]:
+                    entry = cached
+                    reused += 1
+                else:
+                    entry = self._read_dir(path, mtime_ns)
+                    scanned += 1
+            except FileNotFoundError:
+                # 스캔 도중 삭제됨
+                continue
+
+            entries[rel] = entry
+            stack.extend(f"{rel}/{name}" for name in entry["dirs"])
+
+        return entries, scanned, reused
+
+    def scan(self) -> IndexSummary:
+        """
+        루트 아래 전체를 (바뀐 디렉토리만 다시 읽으며) 스캔하고 색인 갱신
+
+        Returns:
+            사용자별/날짜별 이미지 수와 바이트 합계
+        """
+        started = time.perf_counter()
+        summary = IndexSummary()
+        if not self.root.is_dir():
+            logger.warning(f"이미지 폴더 없음: {self.root}")
+            return summary
+
+        with os.scandir(self.root) as it:
+            users = [entry.name for entry in it if entry.is_dir(follow_symlinks=False)]
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for user_entries, scanned, reused in pool.map(self._walk, users):
+                entries.update(user_entries)
+                summary.scanned_dirs += scanned
+                summary.reused_dirs += reused
+
+        # 없어진 디렉토리는 자연히 빠짐
+        self._entries = entries
+
+        for rel, entry in entries.items():
+            parts = rel.split("/")
+            user, date = parts[0], parts[1] if len(parts) > 1 else NO_DATE
+            totals = summary.users.setdefault(user, {"count": 0, "bytes": 0})
+            totals["count"] += entry["count"]
+            totals["bytes"] += entry["bytes"]
+            if entry["count"] or date != NO_DATE:
+                by_date = summary.dates.setdefault(user, {}).setdefault(date, {"count": 0, "bytes": 0})
+                by_date["count"] += entry["count"]
+                by_date["bytes"] += entry["bytes"]
+
+        summary.elapsed = time.perf_counter() - started
+        logger.info(
+            f"이미지 색인: {summary.total_count}장 / {summary.total_bytes / 1024 / 1024:.1f}MB "
+            f"(다시 읽은 폴더 {summary.scanned_dirs}, 재사용 {summary.reused_dirs}, {summary.elapsed:.2f}초)"
+        )
+        return summary
+
+
+def build_index(
+    root: str = "src/test/image",
+    index_path: Optional[str] = "data/image_index.json",
+    workers: int = 8
+) -> IndexSummary:
+    """색인 로드 → 스캔 → 저장 (index_path가 None이면 저장하지 않음)"""
+    index = ImageIndex(root, index_path or "data/image_index.json", workers)
+    if index_path:
+        index.load()
+    summary = index.scan()
+    if index_path:
+        index.save()
+    return summary
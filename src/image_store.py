@@ -0,0 +1,170 @@
+# src/image_store.py
+import os
+import json
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ImageStore:
+    """
+    SHA-256 기반 콘텐츠 주소 이미지 저장소
+
+    - 실제 파일은 objects/<앞 2자리>/<digest>.jpg 에 한 번만 저장
+    - base_dir/사용자/날짜/img_N.jpg 는 객체 파일에 대한 하드링크
+      (하드링크가 안 되는 파일시스템이면 복사)
+    - URL → (ETag, Last-Modified, digest) 캐시로 조건부 요청을 보내
+      바뀌지 않은 이미지는 다시 받지 않음
+    """
+
+    CACHE_FILE = "http_cache.json"
+
+    def __init__(self, root: str = "src/test/store"):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.cache_path = self.root / self.CACHE_FILE
+        self._cache: Dict[str, Dict[str, Optional[str]]] = {}
+        self._inodes: Dict[Tuple[int, int], str] = {}   # 객체 파일 (장치, inode) → digest
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'deduplicated': 0}
+        self.load()
+
+    # ------------------------------------------------------------------
+    # HTTP 캐시
+    # ------------------------------------------------------------------
+
+    def load(self) -> None:
+        """디스크의 URL 캐시 로드"""
+        if not self.cache_path.exists():
+            return
+        try:
+            self._cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            logger.info(f"이미지 캐시 로드: {len(self._cache)}개 URL")
+        except (OSError, ValueError) as e:
+            logger.warning(f"이미지 캐시 로드 실패, 새로 시작: {e}")
+            self._cache = {}
+
+    def save(self) -> None:
+        """URL 캐시를 원자적으로 저장"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(self._cache, ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        logger.info(
+            f"이미지 캐시 저장: {len(self._cache)}개 URL "
+            f"(다운로드 {self.stats['downloaded']}, 변경없음 {self.stats['not_modified']}, "
+            f"중복제거 {self.stats['deduplicated']})"
+        )
+
+    def lookup(self, url: str) -> Optional[Dict[str, Optional[str]]]:
+        """URL 캐시 항목 (객체 파일이 남아있는 경우만)"""
+        entry = self._cache.get(url)
+        if entry and self.object_path(entry["digest"]).exists():
+            return entry
+        return None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """조건부 GET 헤더 (If-None-Match / If-Modified-Since)"""
+        entry = self.lookup(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def remember(self, url: str, digest: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """응답 검증자와 digest 기록"""
+        self._cache[url] = {"digest": digest, "etag": etag, "last_modified": last_modified}
+
+    # ------------------------------------------------------------------
+    # 객체 저장 (블로킹 - 스레드에서 호출)
+    # ------------------------------------------------------------------
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.jpg"
+
+    def adopt(self, file_path: str, digest: str) -> bool:
+        """
+        방금 받은 파일을 저장소에 등록
+
+        같은 digest 객체가 이미 있으면 file_path를 그 객체의 링크로 바꿔 중복 제거,
+        없으면 file_path를 객체로 링크.
+
+        Returns:
+            기존 객체와 중복이었는지 여부
+        """
+        obj = self.object_path(digest)
+        if obj.exists():
+            self.link(digest, file_path)
+            return True
+
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(file_path, obj)
+        except FileExistsError:
+            # 다른 다운로드가 같은 내용을 먼저 등록함
+            self.link(digest, file_path)
+            return True
+        except OSError:
+            shutil.copyfile(file_path, obj)
+        return False
+
+    def digest_of(self, file_path: str) -> Optional[str]:
+        """
+        file_path가 연결된 객체의 digest (파일을 다시 읽지 않음)
+
+        하드링크는 객체 파일과 inode가 같으므로 객체 폴더의 inode 목록에서 찾는다.
+        복사본이거나 저장소에 없는 파일이면 None.
+        """
+        stat = os.stat(file_path)
+        if stat.st_nlink < 2:
+            return None
+        key = (stat.st_dev, stat.st_ino)
+        if key not in self._inodes:
+            # 마지막으로 읽은 뒤에 새 객체가 생겼을 수 있음
+            self._index_objects()
+        return self._inodes.get(key)
+
+    def _index_objects(self) -> None:
+        self._inodes = {}
+        if not self.objects_dir.is_dir():
+            return
+        device = self.objects_dir.stat().st_dev
+        with os.scandir(self.objects_dir) as prefixes:
+            for prefix in prefixes:
+                if not prefix.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(prefix.path) as it:
+                    for entry in it:
+                        if entry.name.endswith(".jpg"):
+                            self._inodes[(device, entry.inode())] = entry.name[:-len(".jpg")]
+
+    def link(self, digest: str, file_path: str) -> None:
+        """객체 파일을 file_path 위치에 원자적으로 연결"""
+        target = Path(file_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        obj = self.object_path(digest)
+
+        if target.exists() and os.path.samefile(obj, target):
+            return
+
+        tmp_path = target.with_name(f".{target.name}.link")
+        tmp_path.unlink(missing_ok=True)
+        try:
+            os.link(obj, tmp_path)
+        except OSError:
+            shutil.copyfile(obj, tmp_path)
+        os.replace(tmp_path, target)
@@ -0,0 +1,156 @@
+# src/journal.py
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal_runs (
+    run_id      TEXT PRIMARY KEY,
+    started_at  TEXT NOT NULL,
+    finished_at TEXT,
+    status      TEXT NOT NULL DEFAULT 'running'
+);
+CREATE TABLE IF NOT EXISTS journal_users (
+    run_id     TEXT NOT NULL,
+    fb_uid     TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    saved      INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, fb_uid)
+);
+CREATE TABLE IF NOT EXISTS journal_images (
+    run_id    TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    src       TEXT,
+    PRIMARY KEY (run_id, file_path)
+);
+"""
+
+
+class RunJournal:
+    """
+    중단된 실행을 이어서 진행하기 위한 SQLite 진행 기록
+
+    - 사용자 단위: 완료(done)/실패(failed) 상태
+    - 이미지 단위: 저장 완료된 파일 경로
+    - run_id를 지정하지 않으면 마지막으로 끝나지 않은 실행을 이어받고,
+      없으면 새 실행을 시작함
+    """
+
+    def __init__(self, db_path: str = "logs/journal.db", run_id: Optional[str] = None):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # 파이프라인 writer 단계는 스레드에서 기록하고 다른 단계는 이벤트 루프에서 조회하므로
+        # 연결과 완료 집합은 _lock으로 보호
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.executescript(SCHEMA)
+
+        # 이어받는 건 RUN_ID로 지정한 실행이나 끝나지 않은 실행뿐 (끝난 실행을 우연히 다시 열지 않도록)
+        resumed = run_id or self._last_unfinished_run()
+        if resumed:
+            self.run_id = resumed
+            self.conn.execute(
+                "INSERT OR IGNORE INTO journal_runs (run_id, started_at) VALUES (?, ?)",
+                (self.run_id, datetime.now().isoformat())
+            )
+            self.conn.execute(
+                "UPDATE journal_runs SET status = 'running', finished_at = NULL WHERE run_id = ?",
+                (self.run_id,)
+            )
+        else:
+            # 같은 초에 시작한 실행과 겹치지 않도록 마이크로초까지
+            self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            self.conn.execute(
+                "INSERT INTO journal_runs (run_id, started_at) VALUES (?, ?)",
+                (self.run_id, datetime.now().isoformat())
+            )
+        self.conn.commit()
+
+        # 조회는 메모리에서 (실행 중 매번 DB를 읽지 않도록)
+        self._done_users: Set[str] = {
+            uid for (uid,) in self.conn.execute(
+                "SELECT fb_uid FROM journal_users WHERE run_id = ? AND status = 'done'", (self.run_id,)
+            )
+        }
+        self._done_images: Set[str] = {
+            path for (path,) in self.conn.execute(
+                "SELECT file_path FROM journal_images WHERE run_id = ?", (self.run_id,)
+            )
+        }
+
+        if self._done_users or self._done_images:
+            logger.info(
+                f"실행 재개: {self.run_id} "
+                f"(완료 사용자 {len(self._done_users)}명, 완료 이미지 {len(self._done_images)}장)"
+            )
+        else:
+            logger.info(f"새 실행 시작: {self.run_id}")
+
+    def _last_unfinished_run(self) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT run_id FROM journal_runs WHERE status != 'finished' ORDER BY started_at DESC LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    # ------------------------------------------------------------------
+    # 사용자
+    # ------------------------------------------------------------------
+
+    def is_user_done(self, fb_uid: str) -> bool:
+        with self._lock:
+            return fb_uid in self._done_users
+
+    def mark_user(self, fb_uid: str, ok: bool, saved: int = 0) -> None:
+        """사용자 처리 결과 기록"""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO journal_users (run_id, fb_uid, status, saved, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.run_id, fb_uid, "done" if ok else "failed", saved, datetime.now().isoformat())
+            )
+            self.conn.commit()
+            if ok:
+                self._done_users.add(fb_uid)
+
+    # ------------------------------------------------------------------
+    # 이미지
+    # ------------------------------------------------------------------
+
+    def is_image_done(self, file_path: str) -> bool:
+        with self._lock:
+            return file_path in self._done_images
+
+    def mark_images(self, items: Iterable[tuple]) -> None:
+        """저장 완료된 이미지 일괄 기록 ((src, file_path) 목록)"""
+        rows = [(self.run_id, path, src) for src, path in items]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO journal_images (run_id, file_path, src) VALUES (?, ?, ?)", rows
+            )
+            self.conn.commit()
+            self._done_images.update(path for _, path, _ in rows)
+
+    # ------------------------------------------------------------------
+    # 실행 종료
+    # ------------------------------------------------------------------
+
+    def finish(self) -> None:
+        """실행 완료 표시 (다음 실행은 새 run_id로 시작)"""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE journal_runs SET status = 'finished', finished_at = ? WHERE run_id = ?",
+                (datetime.now().isoformat(), self.run_id)
+            )
+            self.conn.commit()
+        logger.info(f"실행 완료 기록: {self.run_id}")
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
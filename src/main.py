@@ -1,13 +1,29 @@
 # src/main.py
 import os
+import time
 import logging
 import asyncio
 from datetime import datetime
+from typing import Dict
 from playwright.async_api import async_playwright
 from dotenv import load_dotenv
 
-from scraper import login, close_all_popups, navigate_to_police_page, wait_for_table_loaded, get_filtered_data
+from scraper import (
+    login, close_all_popups, enable_popup_auto_dismiss,
+    navigate_to_police_page, wait_for_table_loaded, get_table_data, filter_table_data,
+)
 from downloader import process_all_captures
+from image_store import ImageStore
+from journal import RunJournal
+from user_state import UserStateStore
+from storage import Storage
+from report import RunAggregates, generate_weekly_report
+from weeks import this_week
+from retry import RetryPolicy
+from http_client import create_http_session
+from profiles import get_profile, install_resource_blocking, StageTimer
+from metrics import RunMetrics
+from table_api import TableInterceptor
 
 load_dotenv()
 
@@ -38,49 +54,131 @@ async def main() -> None:
         logger.error("환경변수가 제대로 설정되지 않았습니다.")
         return
     
+    started = time.perf_counter()
+    
+    # 실행 프로필 (RUN_PROFILE=debug|production)
+    profile = get_profile()
+    # 단계/캡처/다운로드 계측 (실행 끝에 logs/metrics_*.json, logs/metrics.prom)
+    metrics = RunMetrics()
+    timer = StageTimer(profile.name, metrics=metrics)
+    logger.info(f"실행 프로필: {profile.name}")
+    
+    # 이미지 저장소 (주차 간 중복 다운로드 방지)
+    store = ImageStore(os.getenv("IMAGE_STORE_DIR", "src/test/store"))
+    
+    # 실행 기록 (RUN_ID를 지정하면 해당 실행을 이어서 진행)
+    journal = RunJournal(run_id=os.getenv("RUN_ID"))
+    
+    # 증분 실행 (INCREMENTAL=1) - 마지막 캡처 이후 다시 로그인한 사용자와 새 날짜 섹션만 처리
+    user_state = UserStateStore() if os.getenv("INCREMENTAL") == "1" else None
+    
+    # 실행/사용자/캡처/이미지 기록 (쓰기는 별도 스레드에서)
+    storage = Storage(os.getenv("DB_PATH", "data/scraper.db"))
+    run_id = storage.start_run()
+    aggregates = RunAggregates(storage, run_id)
+    # scraping_runs에 남길 실행 결과 (실패한 실행은 진행한 단계까지만)
+    run_results: Dict[str, int] = {}
+    
     # 브라우저 실행
     async with async_playwright() as pw:
         browser = await pw.chromium.launch(
-            headless=False,
-            slow_mo=500,
+            headless=profile.headless,
+            slow_mo=profile.slow_mo,
         )
         
+        session = None
         try:
             page = await browser.new_page()
             
             # 1. 로그인
-            if not await login(page, url, username, password):
+            with timer.stage("login"):
+                logged_in = await login(page, url, username, password)
+            if not logged_in:
                 logger.error("로그인에 실패하여 프로그램을 종료합니다.")
                 return
             
+            # 팝업 자동 닫기 (POPUP_AUTO_DISMISS=1) - 로그인 이후 문서(목록 페이지, 캡처 탭)에 적용
+            if os.getenv("POPUP_AUTO_DISMISS") == "1":
+                await enable_popup_auto_dismiss(page)
+            
+            # 로그인 쿠키를 복사한 실행 단위 HTTP 세션
+            session = await create_http_session(page)
+            
             # 2. 팝업 제거
-            await close_all_popups(page)
+            with timer.stage("popups"):
+                await close_all_popups(page)
+            
+            # 팝업을 닫은 뒤부터 폰트/스타일시트/분석 요청 차단
+            # (스타일시트 없이는 숨겨진 모달도 보이는 것으로 판정되므로 팝업 처리 이후에 설치)
+            blocked = await install_resource_blocking(page.context, profile)
+            
+            # 테이블 API 가로채기 모드 (TABLE_MODE=api, TABLE_API_PATTERN 필수) - 네비게이션 전에 등록
+            interceptor = None
+            if os.getenv("TABLE_MODE") == "api" and not os.getenv("TABLE_API_PATTERN"):
+                logger.warning("TABLE_MODE=api에는 TABLE_API_PATTERN이 필요합니다 → DOM 추출 사용")
+            elif os.getenv("TABLE_MODE") == "api":
+                interceptor = TableInterceptor(
+                    page,
+                    url_pattern=os.getenv("TABLE_API_PATTERN"),
+                    capture_link_template=os.getenv("CAPTURE_LINK_TEMPLATE"),
+                )
+                interceptor.start()
             
             # 3. Police 페이지로 이동
-            if not await navigate_to_police_page(page):
+            with timer.stage("navigate"):
+                navigated = await navigate_to_police_page(page)
+            if not navigated:
                 logger.error("Police 페이지 이동 실패")
                 return
             
-            # 4. 테이블 로딩 대기
-            if not await wait_for_table_loaded(page):
+            # 4. 테이블 로딩 대기 (API 응답을 잡았으면 렌더링을 기다리지 않음)
+            with timer.stage("table_load"):
+                table_loaded = bool(interceptor) and await interceptor.wait()
+                if not table_loaded:
+                    table_loaded = await wait_for_table_loaded(
+                        page, data_url_pattern=os.getenv("TABLE_API_PATTERN")
+                    )
+            if not table_loaded:
                 logger.error("테이블 로딩 실패")
                 return
             
-            # 5. 데이터 추출 및 필터링
-            ## TODO : male조건 추가하기
-            filtered_data = await get_filtered_data(page)
+            # 5. 데이터 추출 및 필터링 (MALE_ONLY=1이면 남성만)
+            with timer.stage("extract_filter"):
+                table_data = await get_table_data(page, interceptor)
+                filtered_data = filter_table_data(table_data, male_only=os.getenv("MALE_ONLY") == "1")
+            if interceptor:
+                interceptor.stop()
             logger.info(f"최종 필터링된 데이터: {len(filtered_data)}건")
+            storage.upsert_users(filtered_data)
+            run_results.update(total_rows=len(table_data), filtered_count=len(filtered_data))
             
             # 6. 캡처 페이지 다운로드
             ## TODO : 다운로더 날짜 인식 로직 고도화. 예를들어 날짜가 화요일 이렇게 해서 최종적인 날짜가 다 없으면 다음 페이지로가서 화면 확인해야함.
-            stats = await process_all_captures(page, filtered_data, limit=10)
+            with timer.stage("captures"):
+                stats = await process_all_captures(
+                    page, filtered_data, limit=10,
+                    store=store, journal=journal, retry=RetryPolicy(), session=session,
+                    user_state=user_state, storage=storage, aggregates=aggregates,
+                    metrics=metrics
+                )
             
             logger.info(f"=== 최종 결과 ===")
             logger.info(f"처리 대상: {len(filtered_data)}건")
             logger.info(f"성공: {stats['success']}건")
             logger.info(f"실패: {stats['failed']}건")
-            # 7. 캡처한 유저 관리하는 로직.
-            ## TODO : 이거는 sqlite로 데이터를 저장하는게 나을듯.
+            for key, value in stats.items():
+                if key.startswith("download_"):
+                    logger.info(f"{key}: {value}")
+            if blocked:
+                logger.info(f"차단된 요청: {dict(blocked)}")
+            journal.finish()
+            run_results.update(
+                success_count=stats['success'],
+                failed_count=stats['failed'],
+                total_images=stats['images_saved'],
+            )
+            
+            # 7. 캡처한 유저 관리 → storage.Storage (data/scraper.db)
             # 8. 머신러닝을 위한 로직 : 나이 예측, 클래스파이어 모듈. <- 프리트레인으로
             # 9. 캡처한 데이터 프로세싱하는 로직. 알맞게 저장하는 용도.
             # 10. 대시보드 로직.
@@ -91,7 +189,32 @@ async def main() -> None:
             logger.error(f"실행 중 오류 발생: {e}")
             
         finally:
-            await asyncio.to_thread(input, "종료하려면 Enter를 누르세요... ")
+            store.save()
+            journal.close()
+            if user_state:
+                user_state.close()
+            # 실패한 실행도 소요 시간은 남김
+            duration = time.perf_counter() - started
+            metrics.set("run_duration_seconds", duration)
+            storage.finish_run(run_id, duration_seconds=round(duration, 1), **run_results)
+            
+            # 리포트 (WEEKLY_REPORT=1) - 캡처까지 끝난 실행만, 이번 실행의 소요 시간을 기록한 뒤
+            # 이번 주 누적 집계로 reports/weekly_*.md / .xlsx 갱신
+            if os.getenv("WEEKLY_REPORT") == "1" and "success_count" in run_results:
+                try:
+                    await asyncio.to_thread(generate_weekly_report, storage, this_week(), xlsx=True)
+                except Exception as e:
+                    logger.error(f"주간 리포트 생성 실패: {e}")
+            
+            await asyncio.to_thread(storage.close)
+            if session:
+                await session.close()
+            timer.report()
+            timer.save()
+            metrics.report()
+            metrics.save()
+            if profile.wait_for_input:
+                await asyncio.to_thread(input, "종료하려면 Enter를 누르세요... ")
             await browser.close()
 
 
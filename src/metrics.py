@@ -0,0 +1,242 @@
+# src/metrics.py
+"""
+실행 계측 (단계/캡처/다운로드별 히스토그램과 카운터)
+
+실행이 끝나면 JSON 요약(logs/metrics_<시각>.json)과
+Prometheus 텍스트 형식 파일(logs/metrics.prom, node_exporter textfile collector용)을 남긴다.
+느린 실행이 브라우저(stage_seconds, capture_page_seconds),
+네트워크(download_ttfb_seconds, download_attempts_total), 디스크(download_commit_seconds) 중
+어디서 느려졌는지 비교하기 위한 용도.
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "scraper_"
+
+# 초 단위
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# 바이트 단위 (1KB ~ 16MB)
+SIZE_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(8))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (값은 버킷별 개수만 저장하므로 관측 수와 관계없이 메모리 일정)"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """버킷 안에서 선형 보간한 분위수 추정값"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6),
+            "min": round(self.min, 6),
+            "max": round(self.max, 6),
+            "p50": round(self.quantile(0.5), 6),
+            "p90": round(self.quantile(0.9), 6),
+            "p99": round(self.quantile(0.99), 6),
+        }
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Prometheus 형식 (le, 누적 개수)"""
+        total = 0
+        rows = []
+        for upper, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            rows.append((upper, total))
+        return rows
+
+
+class RunMetrics:
+    """
+    실행 하나의 계측값 모음
+
+    이벤트 루프 한 스레드에서만 갱신하므로 잠금 없음.
+    이름은 Prometheus 규칙대로 카운터는 _total, 시간은 _seconds, 크기는 _bytes로 끝냄.
+    """
+
+    def __init__(self, log_dir: str = "logs"):
+        self.log_dir = log_dir
+        self.started_at = datetime.now()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._buckets: Dict[str, Sequence[float]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        series = self.counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None, **labels: Any) -> None:
+        """
+        히스토그램에 값 추가
+
+        Args:
+            buckets: 처음 관측할 때 정한 버킷이 이름 전체에 쓰임 (기본: LATENCY_BUCKETS)
+        """
+        buckets = self._buckets.setdefault(name, buckets or LATENCY_BUCKETS)
+        series = self.histograms.setdefault(name, {})
+        key = _labels(labels)
+        if key not in series:
+            series[key] = Histogram(buckets)
+        series[key].observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+        """
+        블록 소요 시간을 name 히스토그램에 기록
+
+        넘겨받은 dict에 라벨을 넣으면 함께 기록됨 (예: 결과에 따라 status).
+        예외로 빠져나가면 status='error'.
+        """
+        labels = dict(labels)
+        started = time.perf_counter()
+        try:
+            yield labels
+        except BaseException:
+            labels.setdefault("status", "error")
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    # ------------------------------------------------------------------
+    # 출력
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON 요약 ({'counters': {이름: [{labels, value}]}, 'histograms': ...})"""
+        def rows(series: Dict[Labels, Any], render) -> List[Dict[str, Any]]:
+            return [{"labels": dict(labels), **render(value)} for labels, value in sorted(series.items())]
+
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "counters": {name: rows(s, lambda v: {"value": v}) for name, s in sorted(self.counters.items())},
+            "gauges": {name: rows(s, lambda v: {"value": v}) for name, s in sorted(self.gauges.items())},
+            "histograms": {name: rows(s, Histogram.summary) for name, s in sorted(self.histograms.items())},
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        lines = []
+        for kind, metrics in (("counter", self.counters), ("gauge", self.gauges)):
+            for name, series in sorted(metrics.items()):
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for name, series in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for labels, hist in sorted(series.items()):
+                for upper, total in hist.cumulative():
+                    le = ("le", _format_value(upper))
+                    lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, le)} {total}")
+                lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {_format_value(hist.sum)}")
+                lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _write(path: Path, text: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def save(self) -> Tuple[Path, Path]:
+        """
+        JSON 요약과 Prometheus 파일 저장
+
+        Returns:
+            (JSON 경로, .prom 경로) - .prom은 매 실행 덮어씀
+        """
+        json_path = Path(self.log_dir) / f"metrics_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        prom_path = Path(self.log_dir) / "metrics.prom"
+        self._write(json_path, json.dumps(self.summary(), ensure_ascii=False, indent=2))
+        self._write(prom_path, self.to_prometheus())
+        logger.info(f"계측 저장: {json_path}, {prom_path}")
+        return json_path, prom_path
+
+    def report(self) -> None:
+        """히스토그램별 건수와 p50/p90 로그"""
+        def series_name(name: str, labels: Labels) -> str:
+            return f"{name}{{{','.join(f'{k}={v}' for k, v in labels)}}}" if labels else name
+
+        logger.info("=== 계측 요약 ===")
+        for name, series in sorted(self.histograms.items()):
+            for labels, hist in sorted(series.items()):
+                logger.info(
+                    f"{series_name(name, labels)}: {hist.count}건, "
+                    f"p50 {hist.quantile(0.5):.3f}, p90 {hist.quantile(0.9):.3f}, 최대 {hist.max:.3f}"
+                )
+        for name, series in sorted(self.counters.items()):
+            for labels, value in sorted(series.items()):
+                logger.info(f"{series_name(name, labels)}: {value:g}")
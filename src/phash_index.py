@@ -0,0 +1,272 @@
+# src/phash_index.py
+import os
+import sqlite3
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS phashes (
+    image_path TEXT PRIMARY KEY,
+    fb_uid     TEXT NOT NULL,
+    hash       INTEGER NOT NULL,    -- 64비트 dHash (SQLite 정수 범위에 맞춰 부호 있는 값으로 저장)
+    size       INTEGER,             -- 해시를 계산할 때의 파일 크기/mtime (바뀌면 다시 계산)
+    mtime_ns   INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_phashes_fb_uid ON phashes(fb_uid);
+"""
+
+# 이전 스키마로 만든 DB에 없는 컬럼 (컬럼, 정의)
+ADDED_COLUMNS = [
+    ("size", "INTEGER"),
+    ("mtime_ns", "INTEGER"),
+]
+
+
+# ============================================================================
+# 해시 계산
+# ============================================================================
+
+def dhash(path: str, size: int = 8) -> int:
+    """
+    difference hash (size × size 비트)
+
+    흑백 (size+1) × size로 줄인 뒤 가로로 이웃한 픽셀의 밝기 비교.
+    재압축, 크기 변경, 약간의 밝기 변화에는 거의 같은 값이 나옴.
+    """
+    with Image.open(path) as img:
+        img.draft("L", (size * 4, size * 4))
+        # 8비트 흑백이라 한 바이트가 한 픽셀 (행 우선)
+        pixels = img.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS).tobytes()
+
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def _hash_one(path: str) -> Tuple[str, Optional[int]]:
+    try:
+        return path, dhash(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"해시 계산 실패: {path}, {e}")
+        return path, None
+
+
+def compute_hashes(paths: List[str], workers: Optional[int] = None) -> Dict[str, int]:
+    """이미지 경로들의 dHash를 프로세스 풀에서 계산 (실패한 이미지는 제외)"""
+    if not paths:
+        return {}
+    chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return {path: value for path, value in pool.map(_hash_one, paths, chunksize=chunksize) if value is not None}
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value & ((1 << HASH_BITS) - 1)
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """재계산 판단용 (크기, mtime_ns) - 파일이 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def fb_uid_from_path(image_path: str, root: str = "src/test/image") -> str:
+    """root/<fbUid_nick_country_gender>/... 경로에서 fbUid"""
+    user_dir = Path(os.path.relpath(image_path, root)).parts[0]
+    return user_dir.split("_", 1)[0]
+
+
+# ============================================================================
+# 색인
+# ============================================================================
+
+@dataclass
+class HashMatch:
+    image_path: str
+    fb_uid: str
+    distance: int
+
+
+class PHashIndex:
+    """
+    해밍 거리 검색용 multi-index hashing 색인
+
+    64비트 해시를 chunks개 조각으로 나눠 조각별 해시 테이블에 넣는다.
+    거리 r 이내 해시는 적어도 한 조각이 r // chunks 이내로 같으므로(비둘기집 원리)
+    각 조각 테이블에서 그 반경의 이웃 버킷만 보면 되고, 후보만 전체 거리를 계산한다.
+    """
+
+    def __init__(self, db_path: str = "data/phash.db", chunks: int = 4):
+        """
+        Args:
+            db_path: 해시 저장 SQLite 경로
+            chunks: 해시를 나눌 조각 수 (64의 약수)
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(phashes)")}
+        for column, definition in ADDED_COLUMNS:
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE phashes ADD COLUMN {column} {definition}")
+                logger.info(f"DB 컬럼 추가: phashes.{column}")
+
+        self.chunks = chunks
+        self.chunk_bits = HASH_BITS // chunks
+        self._mask = (1 << self.chunk_bits) - 1
+        self._flip_cache: Dict[int, List[int]] = {}
+
+        self.paths: List[str] = []
+        self.uids: List[str] = []
+        self.hashes: List[int] = []
+        self._ids: Dict[str, int] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(chunks)]
+
+        for image_path, fb_uid, value, size, mtime_ns in self.conn.execute(
+            "SELECT image_path, fb_uid, hash, size, mtime_ns FROM phashes"
+        ):
+            self._insert(image_path, fb_uid, _to_unsigned(value))
+            if size is not None and mtime_ns is not None:
+                self._stamps[image_path] = (size, mtime_ns)
+        logger.info(f"해시 색인 로드: {len(self.hashes)}개")
+
+    def __len__(self) -> int:
+        # 교체된 예전 항목은 세지 않음
+        return len(self._ids)
+
+    def _split(self, value: int) -> List[int]:
+        return [(value >> (i * self.chunk_bits)) & self._mask for i in range(self.chunks)]
+
+    def _insert(self, image_path: str, fb_uid: str, value: int) -> None:
+        # 같은 경로가 다시 들어오면 새 항목이 대신하고, 예전 항목은 검색에서 걸러짐
+        item_id = len(self.hashes)
+        self._ids[image_path] = item_id
+        self.paths.append(image_path)
+        self.uids.append(fb_uid)
+        self.hashes.append(value)
+        for table, part in zip(self._tables, self._split(value)):
+            table.setdefault(part, []).append(item_id)
+
+    def _flips(self, radius: int) -> List[int]:
+        """조각 안에서 radius개 이하 비트를 뒤집는 XOR 마스크 목록"""
+        if radius not in self._flip_cache:
+            masks = [0]
+            for r in range(1, radius + 1):
+                for bits in combinations(range(self.chunk_bits), r):
+                    mask = 0
+                    for bit in bits:
+                        mask |= 1 << bit
+                    masks.append(mask)
+            self._flip_cache[radius] = masks
+        return self._flip_cache[radius]
+
+    # ------------------------------------------------------------------
+    # 추가
+    # ------------------------------------------------------------------
+
+    def add_many(self, items: Iterable[Tuple[str, str, int, Tuple[int, int]]]) -> None:
+        """(image_path, fb_uid, hash, (size, mtime_ns)) 일괄 추가"""
+        items = list(items)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO phashes (image_path, fb_uid, hash, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+            [(path, uid, _to_signed(value), *stamp) for path, uid, value, stamp in items]
+        )
+        self.conn.commit()
+        for path, uid, value, stamp in items:
+            self._insert(path, uid, value)
+            self._stamps[path] = stamp
+
+    def index_images(
+        self,
+        paths: Iterable[str],
+        root: str = "src/test/image",
+        workers: Optional[int] = None
+    ) -> int:
+        """
+        색인에 없거나 해시 계산 이후 바뀐(크기/mtime이 다른) 이미지의 해시를 계산해 추가
+
+        같은 경로에 다른 이미지를 다시 저장해도 새 해시로 교체된다.
+
+        Returns:
+            새로 계산한 이미지 수
+        """
+        stamps = {}
+        for path in paths:
+            stamp = file_stamp(path)
+            if stamp is not None and self._stamps.get(path) != stamp:
+                stamps[path] = stamp
+        hashes = compute_hashes(list(stamps), workers)
+        self.add_many((path, fb_uid_from_path(path, root), value, stamps[path]) for path, value in hashes.items())
+        logger.info(f"해시 색인 추가: {len(hashes)}개 (전체 {len(self)}개)")
+        return len(hashes)
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+
+    def query(self, value: int, radius: int = 6, exclude_uid: Optional[str] = None) -> List[HashMatch]:
+        """
+        해밍 거리 radius 이내 이미지 (가까운 순)
+
+        Args:
+            value: 찾을 해시
+            radius: 최대 해밍 거리
+            exclude_uid: 이 사용자의 이미지는 제외
+        """
+        flips = self._flips(radius // self.chunks)
+        candidates: Set[int] = set()
+        for table, part in zip(self._tables, self._split(value)):
+            for mask in flips:
+                bucket = table.get(part ^ mask)
+                if bucket:
+                    candidates.update(bucket)
+
+        matches = []
+        for item_id in candidates:
+            path = self.paths[item_id]
+            if self._ids.get(path) != item_id or self.uids[item_id] == exclude_uid:
+                continue
+            distance = (self.hashes[item_id] ^ value).bit_count()
+            if distance <= radius:
+                matches.append(HashMatch(path, self.uids[item_id], distance))
+        return sorted(matches, key=lambda m: m.distance)
+
+    def matches_for_user(self, fb_uid: str, radius: int = 6) -> Dict[str, List[HashMatch]]:
+        """
+        사용자의 이미지마다 다른 사용자의 비슷한 이미지
+
+        Returns:
+            {사용자 이미지 경로: [HashMatch, ...]} (일치가 있는 이미지만)
+        """
+        results = {}
+        for image_path, value in self.conn.execute(
+            "SELECT image_path, hash FROM phashes WHERE fb_uid = ?", (fb_uid,)
+        ).fetchall():
+            matches = self.query(_to_unsigned(value), radius, exclude_uid=fb_uid)
+            if matches:
+                results[image_path] = matches
+        return results
+
+    def close(self) -> None:
+        self.conn.close()
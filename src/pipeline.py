@@ -0,0 +1,448 @@
+# src/pipeline.py
+import os
+import time
+import asyncio
+import logging
+import aiohttp
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from playwright.async_api import Page
+
+from downloader import (
+    MAX_CONCURRENT_DOWNLOADS,
+    download_image,
+    extract_image_sources,
+    get_folder_name,
+    parse_date_folder,
+    plan_flat_jobs,
+    plan_section_jobs,
+    session_scope,
+)
+from image_store import ImageStore
+from journal import RunJournal
+from metrics import RunMetrics
+from report import RunAggregates
+from retry import RetryPolicy
+from storage import Storage
+from tab_pool import TabPool
+from user_state import UserStateStore
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# 설정 및 단계 간 메시지
+# ============================================================================
+
+@dataclass
+class PipelineConfig:
+    """단계별 동시성과 큐 크기"""
+    harvesters: int = 3                           # 캡처 페이지를 여는 탭 수
+    downloaders: int = MAX_CONCURRENT_DOWNLOADS   # 동시 이미지 다운로드 수
+    row_queue_size: int = 16
+    image_queue_size: int = 256
+    result_queue_size: int = 512
+    recycle_after: int = 20                       # 탭 하나가 처리할 최대 사용자 수
+    writer_batch: int = 50                        # 한 번에 기록할 이미지 결과 수
+    monitor_interval: float = 10.0                # 큐 깊이 로그 간격(초), 0이면 끔
+    base_dir: str = "src/test/image"
+
+
+@dataclass
+class CaptureTask:
+    """사용자 한 명의 진행 상태 (writer 단계에서만 갱신)"""
+    row: Dict[str, Any]
+    total: int = 0          # 투입한 이미지 수
+    finished: int = 0       # 결과가 돌아온 이미지 수
+    saved: int = 0
+    harvested: bool = False # 이미지 투입 완료 여부
+    ok: bool = True         # 캡처 페이지 처리 성공 여부
+    completed: bool = False
+    latest_date: Optional[str] = None  # 추출한 날짜 섹션 중 가장 최근 (증분 상태 갱신용)
+    started: float = 0.0               # 캡처 시작 시각 (perf_counter)
+
+
+@dataclass
+class ImageJob:
+    task: CaptureTask
+    date_id: Optional[str]
+    src: str
+    file_path: str
+
+
+@dataclass
+class StageResult:
+    """writer로 가는 메시지 (job이 None이면 사용자의 이미지 투입이 끝났다는 신호)"""
+    task: CaptureTask
+    job: Optional[ImageJob] = None
+    ok: bool = True
+
+
+# ============================================================================
+# 파이프라인
+# ============================================================================
+
+class CapturePipeline:
+    """
+    행 → 캡처 페이지 → 이미지 다운로드 → 기록으로 이어지는 비동기 파이프라인
+
+    단계 사이를 크기 제한 큐로 연결해, 다운로드가 밀리면 페이지 수집도 자동으로 늦춰짐(backpressure).
+    브라우저(페이지 로딩)와 네트워크(이미지 다운로드)가 동시에 일함.
+
+        rows ─▶ [producer] ─▶ rows_q ─▶ [harvester × N] ─▶ images_q ─▶ [downloader × M]
+                                               │                                 │
+                                               └────────────▶ results_q ◀────────┘
+                                                                  │
+                                                              [writer]
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        config: Optional[PipelineConfig] = None,
+        store: Optional[ImageStore] = None,
+        journal: Optional[RunJournal] = None,
+        retry: Optional[RetryPolicy] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        user_state: Optional[UserStateStore] = None,
+        storage: Optional[Storage] = None,
+        aggregates: Optional[RunAggregates] = None,
+        metrics: Optional[RunMetrics] = None
+    ):
+        """
+        Args:
+            page: 목록 페이지 (탭을 열 컨텍스트, captureLink 없는 행의 팝업 처리에 사용)
+            config: 단계별 설정
+            store: 콘텐츠 주소 저장소
+            journal: 실행 기록
+            retry: 다운로드 재시도 정책
+            session: 실행 전체에서 공유할 HTTP 세션 (None이면 파이프라인 동안만 쓸 세션 생성)
+            user_state: 사용자별 마지막 캡처 상태 (주면 하이워터마크 이후 날짜 섹션만 받음)
+            storage: captures/images 테이블 저장소 (쓰기는 큐에 넣기만 함)
+            aggregates: 리포트용 누적 집계 (사용자 완료마다 갱신)
+            metrics: 실행 계측 (캡처/다운로드 소요 시간)
+        """
+        self.page = page
+        self.config = config or PipelineConfig()
+        self.store = store
+        self.journal = journal
+        self.retry = retry
+        self.session = session
+        self.user_state = user_state
+        self.storage = storage
+        self.aggregates = aggregates
+        self.metrics = metrics
+        # 날짜 섹션이 없는 캡처는 실행 날짜로 기록
+        self._run_date = datetime.now().strftime("%Y-%m-%d")
+
+        self.rows_q: asyncio.Queue = asyncio.Queue(self.config.row_queue_size)
+        self.images_q: asyncio.Queue = asyncio.Queue(self.config.image_queue_size)
+        self.results_q: asyncio.Queue = asyncio.Queue(self.config.result_queue_size)
+        self._queues: Dict[str, asyncio.Queue] = {
+            "rows": self.rows_q, "images": self.images_q, "results": self.results_q,
+        }
+        self.peak_depths: Dict[str, int] = {name: 0 for name in self._queues}
+
+        # 목록 페이지는 하나뿐이므로 팝업 방식은 한 번에 하나만
+        self._list_page_lock = asyncio.Lock()
+        self.stats: Dict[str, int] = {'success': 0, 'failed': 0, 'images_saved': 0, 'images_failed': 0}
+        self._total = 0
+
+    # ------------------------------------------------------------------
+    # 관측
+    # ------------------------------------------------------------------
+
+    def queue_depths(self) -> Dict[str, int]:
+        """현재 단계별 큐 깊이"""
+        return {name: queue.qsize() for name, queue in self._queues.items()}
+
+    async def _put(self, name: str, item: Any) -> None:
+        """큐에 넣고 최대 깊이 갱신 (깊이는 넣은 직후에 가장 큼)"""
+        queue = self._queues[name]
+        await queue.put(item)
+        self.peak_depths[name] = max(self.peak_depths[name], queue.qsize())
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.monitor_interval)
+            depths = self.queue_depths()
+            logger.info(
+                f"큐 깊이 - 행: {depths['rows']}/{self.config.row_queue_size}, "
+                f"이미지: {depths['images']}/{self.config.image_queue_size}, "
+                f"결과: {depths['results']}/{self.config.result_queue_size}"
+            )
+
+    # ------------------------------------------------------------------
+    # 1단계: 행 투입
+    # ------------------------------------------------------------------
+
+    async def _produce(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            await self._put("rows", row)
+        for _ in range(self.config.harvesters):
+            await self.rows_q.put(None)
+
+    # ------------------------------------------------------------------
+    # 2단계: 캡처 페이지에서 이미지 URL 수집
+    # ------------------------------------------------------------------
+
+    def _plan(self, task: CaptureTask, sources: Dict[str, Any]) -> List[Tuple[Optional[str], str, str]]:
+        """추출한 src → (date_id, src, file_path) 목록"""
+        row = task.row
+        user_dir = Path(self.config.base_dir) / get_folder_name(row)
+
+        if not sources["sections"]:
+            # 날짜 정보 없음 - 전체 저장
+            return [(None, src, path) for src, path in plan_flat_jobs(sources["flat"], user_dir)]
+
+        sections = sources["sections"]
+        dated = [date_id for date_id in sections if date_id.isdigit()]
+        task.latest_date = max(dated) if dated else None
+
+        if self.user_state:
+            # 이전 실행에서 받은 날짜 섹션은 건너뜀 (plan_section_jobs의 순번이 섹션별이라 경로는 그대로)
+            fresh = {
+                date_id: srcs for date_id, srcs in sections.items()
+                if self.user_state.is_new_section(row["fbUid"], date_id)
+            }
+            if len(fresh) < len(sections):
+                logger.info(f"[{row['fbUid']}] 이전 날짜 섹션 {len(sections) - len(fresh)}개 건너뜀")
+            sections = fresh
+
+        return [
+            (date_id, src, path)
+            for date_id, jobs in plan_section_jobs(sections, user_dir).items()
+            for src, path in jobs
+        ]
+
+    def _capture_date(self, date_id: Optional[str]) -> str:
+        return parse_date_folder(date_id) if date_id else self._run_date
+
+    def _register_captures(self, task: CaptureTask, jobs: List[Tuple[Optional[str], str, str]]) -> None:
+        """이미지를 투입하기 전에 captures 행 등록 (쓰기 스레드가 순서대로 처리)"""
+        folders = {}
+        for date_id, _, path in jobs:
+            folders.setdefault(self._capture_date(date_id), str(Path(path).parent))
+        fb_uid = task.row["fbUid"]
+        self.storage.add_captures([(fb_uid, date, folder) for date, folder in folders.items()])
+
+    async def _open_and_extract(self, pool: TabPool, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """캡처 페이지를 열어 이미지 src 추출 (탭 크래시 시 새 탭으로 1회 재시도)"""
+        fb_uid = row["fbUid"]
+
+        if not row.get("captureLink"):
+            async with self._list_page_lock:
+                try:
+                    async with self.page.context.expect_page() as popup:
+                        await self.page.click(f"a[href*='{fb_uid}']")
+                    new_page = await popup.value
+                    try:
+                        await new_page.wait_for_load_state("networkidle")
+                        return await extract_image_sources(new_page)
+                    finally:
+                        await new_page.close()
+                except Exception as e:
+                    logger.error(f"[{fb_uid}] 처리 실패: {e}")
+                    return None
+
+        for attempt in range(2):
+            async with pool.acquire() as tab:
+                try:
+                    await tab.goto(row["captureLink"])
+                    await tab.wait_for_load_state("networkidle")
+                    return await extract_image_sources(tab)
+                except Exception as e:
+                    logger.error(f"[{fb_uid}] 처리 실패: {e}")
+                    crashed = not pool.is_healthy(tab)
+
+            if not crashed or attempt > 0:
+                return None
+            logger.warning(f"[{fb_uid}] 탭 크래시 → 새 탭에서 재시도")
+
+        return None
+
+    async def _harvest(self, pool: TabPool) -> None:
+        while True:
+            row = await self.rows_q.get()
+            if row is None:
+                return
+
+            logger.info(f"=== [{row['fbUid']}] {row['nick']} 캡처 시작 ===")
+            task = CaptureTask(row, started=time.perf_counter())
+
+            sources = await self._open_and_extract(pool, row)
+            if self.metrics:
+                # 탭에서 페이지를 열고 src를 추출하기까지 (브라우저)
+                self.metrics.observe(
+                    "capture_page_seconds", time.perf_counter() - task.started,
+                    status="ok" if sources is not None else "failed"
+                )
+            if sources is None:
+                task.ok = False
+            else:
+                jobs = self._plan(task, sources)
+                task.total = len(jobs)
+                if self.storage:
+                    self._register_captures(task, jobs)
+                for date_id, src, path in jobs:
+                    await self._put("images", ImageJob(task, date_id, src, path))
+
+            await self._put("results", StageResult(task, None, task.ok))
+
+    # ------------------------------------------------------------------
+    # 3단계: 이미지 다운로드
+    # ------------------------------------------------------------------
+
+    async def _download(self, session: aiohttp.ClientSession) -> None:
+        while True:
+            job = await self.images_q.get()
+            if job is None:
+                return
+
+            if self.journal and self.journal.is_image_done(job.file_path) and os.path.exists(job.file_path):
+                ok = True
+            else:
+                ok = await download_image(session, job.src, job.file_path, self.store, self.retry, self.metrics)
+
+            await self._put("results", StageResult(job.task, job, ok))
+
+    # ------------------------------------------------------------------
+    # 4단계: 결과 기록
+    # ------------------------------------------------------------------
+
+    async def _flush(self, batch: List[Tuple[str, str]]) -> None:
+        if self.journal and batch:
+            try:
+                await asyncio.to_thread(self.journal.mark_images, list(batch))
+            except Exception as e:
+                logger.error(f"이미지 기록 실패: {e}")
+        batch.clear()
+
+    async def _complete(self, task: CaptureTask) -> None:
+        task.completed = True
+        fb_uid = task.row["fbUid"]
+
+        if self.journal:
+            try:
+                await asyncio.to_thread(self.journal.mark_user, fb_uid, task.ok, task.saved)
+            except Exception as e:
+                logger.error(f"[{fb_uid}] 사용자 기록 실패: {e}")
+
+        if self.user_state and task.ok and task.saved == task.total:
+            # 실패한 이미지가 있으면 상태를 올리지 않음 (다음 실행에서 다시 처리)
+            last_login = task.row.get("lastLogin")
+            try:
+                await asyncio.to_thread(
+                    self.user_state.record,
+                    fb_uid,
+                    last_login if isinstance(last_login, datetime) else None,
+                    self.journal.run_id if self.journal else None,
+                    task.latest_date,
+                    task.saved,
+                )
+            except Exception as e:
+                logger.error(f"[{fb_uid}] 사용자 상태 기록 실패: {e}")
+
+        if self.storage and task.ok:
+            self.storage.refresh_capture_counts(fb_uid)
+
+        if self.aggregates:
+            self.aggregates.record(task.row, task.ok, task.saved, task.finished - task.saved)
+
+        if self.metrics:
+            # 페이지 열기부터 마지막 이미지 기록까지 (사용자 한 명)
+            status = "ok" if task.ok else "failed"
+            self.metrics.observe("capture_seconds", time.perf_counter() - task.started, status=status)
+            self.metrics.inc("capture_images_total", task.saved, status="saved")
+            self.metrics.inc("capture_images_total", task.finished - task.saved, status="failed")
+
+        self.stats['success' if task.ok else 'failed'] += 1
+        if task.ok:
+            logger.info(f"=== [{fb_uid}] 완료: {task.saved}장 저장 ===")
+
+        done = self.stats['success'] + self.stats['failed']
+        logger.info(f"진행: {done}/{self._total} - 성공: {self.stats['success']}, 실패: {self.stats['failed']}")
+
+    async def _write(self) -> None:
+        batch: List[Tuple[str, str]] = []
+
+        while True:
+            result = await self.results_q.get()
+            if result is None:
+                await self._flush(batch)
+                return
+
+            task = result.task
+            if result.job is None:
+                task.harvested = True
+            else:
+                task.finished += 1
+                if result.ok:
+                    task.saved += 1
+                    self.stats['images_saved'] += 1
+                    batch.append((result.job.src, result.job.file_path))
+                    if self.storage:
+                        job = result.job
+                        self.storage.add_images([(
+                            task.row["fbUid"], self._capture_date(job.date_id), job.file_path,
+                            parse_date_folder(job.date_id) if job.date_id else None,
+                        )])
+                else:
+                    self.stats['images_failed'] += 1
+
+            if len(batch) >= self.config.writer_batch:
+                await self._flush(batch)
+
+            if task.harvested and task.finished == task.total and not task.completed:
+                # 사용자 완료 전에 해당 이미지 기록을 먼저 남김
+                await self._flush(batch)
+                await self._complete(task)
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _close_after(workers: List[asyncio.Task], queue: asyncio.Queue, count: int) -> None:
+        """앞 단계 워커가 모두 끝나면 다음 단계에 종료 신호 전달"""
+        await asyncio.wait(workers)
+        for _ in range(count):
+            await queue.put(None)
+
+    async def run(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        파이프라인 실행
+
+        Returns:
+            {'success', 'failed', 'images_saved', 'images_failed', 'queue_peak_*'} 집계
+        """
+        self._total = len(rows)
+        if not rows:
+            return self.stats
+
+        cfg = self.config
+        monitor = asyncio.create_task(self._monitor()) if cfg.monitor_interval > 0 else None
+
+        try:
+            async with (
+                session_scope(self.session) as session,
+                TabPool(self.page.context, min(cfg.harvesters, len(rows)), cfg.recycle_after) as pool,
+            ):
+                async with asyncio.TaskGroup() as tg:
+                    harvesters = [tg.create_task(self._harvest(pool)) for _ in range(cfg.harvesters)]
+                    downloaders = [tg.create_task(self._download(session)) for _ in range(cfg.downloaders)]
+                    tg.create_task(self._write())
+                    tg.create_task(self._produce(rows))
+                    tg.create_task(self._close_after(harvesters, self.images_q, cfg.downloaders))
+                    tg.create_task(self._close_after(downloaders, self.results_q, 1))
+        finally:
+            if monitor:
+                monitor.cancel()
+
+        for name, depth in self.peak_depths.items():
+            self.stats[f"queue_peak_{name}"] = depth
+            if self.metrics:
+                self.metrics.set("pipeline_queue_peak", depth, queue=name)
+        return self.stats
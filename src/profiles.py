@@ -0,0 +1,161 @@
+# src/profiles.py
+import os
+import re
+import json
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from playwright.async_api import BrowserContext, Route
+
+from metrics import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+# 차단할 분석/광고 도메인
+ANALYTICS_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+)
+
+
+# ============================================================================
+# 실행 프로필
+# ============================================================================
+
+@dataclass(frozen=True)
+class RunProfile:
+    """브라우저 실행 방식과 리소스 차단 규칙 묶음"""
+    name: str
+    headless: bool
+    slow_mo: int
+    wait_for_input: bool                      # 종료 전 Enter 입력 대기
+    blocked_extensions: Tuple[str, ...] = ()  # 폰트/스타일시트/미디어 확장자
+    blocked_hosts: Tuple[str, ...] = ()
+
+    @property
+    def blocks_resources(self) -> bool:
+        return bool(self.blocked_extensions or self.blocked_hosts)
+
+    def block_pattern(self) -> re.Pattern:
+        """차단 대상 URL 정규식 (context.route용)"""
+        parts = []
+        if self.blocked_extensions:
+            parts.append(r"\.(?:" + "|".join(self.blocked_extensions) + r")(?:[?#]|$)")
+        if self.blocked_hosts:
+            parts.append(r"^https?://(?:[^/]*\.)?(?:" + "|".join(map(re.escape, self.blocked_hosts)) + r")/")
+        return re.compile("|".join(parts), re.IGNORECASE)
+
+
+PROFILES: Dict[str, RunProfile] = {
+    # 화면을 보면서 디버깅
+    "debug": RunProfile(
+        name="debug",
+        headless=False,
+        slow_mo=500,
+        wait_for_input=True,
+    ),
+    # 정기 실행용 (이미지는 차단하지 않음 - src 수집과 다운로드에 필요)
+    "production": RunProfile(
+        name="production",
+        headless=True,
+        slow_mo=0,
+        wait_for_input=False,
+        blocked_extensions=("woff2?", "ttf", "otf", "eot", "css", "mp4", "webm", "mp3"),
+        blocked_hosts=ANALYTICS_HOSTS,
+    ),
+}
+
+
+def get_profile(name: Optional[str] = None) -> RunProfile:
+    """
+    실행 프로필 선택
+
+    Args:
+        name: 프로필 이름 (None이면 RUN_PROFILE 환경변수, 기본값 debug)
+    """
+    name = (name or os.getenv("RUN_PROFILE") or "debug").lower()
+    if name not in PROFILES:
+        logger.warning(f"알 수 없는 프로필 '{name}' → debug 사용")
+        name = "debug"
+    return PROFILES[name]
+
+
+async def install_resource_blocking(context: BrowserContext, profile: RunProfile) -> Counter:
+    """
+    컨텍스트 전체(목록 페이지, 캡처 탭 포함)에 리소스 차단 규칙 설치
+
+    정규식에 걸리는 요청만 라우팅되므로 이미지 등 나머지 요청에는 오버헤드가 없음.
+
+    Returns:
+        차단된 요청 수 (리소스 종류별, 실행 중 계속 갱신됨)
+    """
+    blocked: Counter = Counter()
+    if not profile.blocks_resources:
+        return blocked
+
+    async def _abort(route: Route) -> None:
+        blocked[route.request.resource_type] += 1
+        await route.abort()
+
+    await context.route(profile.block_pattern(), _abort)
+    logger.info(f"리소스 차단 설치 ({profile.name})")
+    return blocked
+
+
+# ============================================================================
+# 단계별 소요 시간
+# ============================================================================
+
+@dataclass
+class StageTimer:
+    """단계별 소요 시간을 기록하고, 다른 프로필의 지난 실행과 비교"""
+    profile: str
+    log_dir: str = "logs"
+    durations: Dict[str, float] = field(default_factory=dict)
+    metrics: Optional[RunMetrics] = None     # 주면 stage_seconds 히스토그램에도 기록
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.durations[name] = self.durations.get(name, 0.0) + elapsed
+            if self.metrics:
+                self.metrics.observe("stage_seconds", elapsed, stage=name)
+
+    def _path(self, profile: str) -> Path:
+        return Path(self.log_dir) / f"stage_timings_{profile}.json"
+
+    def save(self) -> None:
+        """이번 실행의 단계별 시간 저장 (프로필별 마지막 실행 1건)"""
+        path = self._path(self.profile)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.durations, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def report(self, baseline: str = "debug") -> None:
+        """단계별 시간과 기준 프로필 대비 절약 시간 로그"""
+        previous: Dict[str, float] = {}
+        path = self._path(baseline)
+        if baseline != self.profile and path.exists():
+            try:
+                previous = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError:
+                previous = {}
+
+        logger.info(f"=== 단계별 소요 시간 ({self.profile}) ===")
+        for name, seconds in self.durations.items():
+            if name in previous:
+                saved = previous[name] - seconds
+                logger.info(f"{name}: {seconds:.1f}초 ({baseline} {previous[name]:.1f}초 대비 {saved:+.1f}초 절약)")
+            else:
+                logger.info(f"{name}: {seconds:.1f}초")
@@ -0,0 +1,320 @@
+# src/report.py
+"""
+실행 집계와 주간 리포트
+
+    python src/report.py                      # 지난주 리포트 (reports/weekly_2026-W41.md)
+    python src/report.py --week 2026-W41 --xlsx --details
+
+캡처가 끝날 때마다 RunAggregates가 실행/사용자/국가/날짜별 누적값을
+report_aggregates 테이블에 더해 두고, 리포트는 이 테이블만 읽어서 만든다
+(이미지 폴더나 images 테이블 전체를 다시 읽지 않음).
+엑셀은 openpyxl write_only 모드로 한 행씩 써서 행 수와 관계없이 메모리가 일정.
+"""
+import os
+import logging
+import argparse
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from storage import Storage
+from weeks import last_week, week_range
+
+logger = logging.getLogger(__name__)
+
+# report_aggregates 테이블은 storage.SCHEMA에 있음
+ADD_AGGREGATE_SQL = (
+    "INSERT INTO report_aggregates "
+    "(scope, key, day, users_ok, users_failed, images_saved, images_failed, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(scope, key, day) DO UPDATE SET "
+    "users_ok = users_ok + excluded.users_ok, users_failed = users_failed + excluded.users_failed, "
+    "images_saved = images_saved + excluded.images_saved, "
+    "images_failed = images_failed + excluded.images_failed, updated_at = excluded.updated_at"
+)
+
+COUNTERS = ("users_ok", "users_failed", "images_saved", "images_failed")
+
+
+# ============================================================================
+# 누적 집계 (파이프라인에서 갱신)
+# ============================================================================
+
+class RunAggregates:
+    """
+    실행 하나의 누적 집계기
+
+    record()는 Storage 쓰기 큐에 UPSERT 4행(run/user/country/day)을 넣기만 하므로
+    이벤트 루프에서 바로 호출해도 됨.
+    """
+
+    def __init__(self, storage: Storage, run_id: int):
+        self.storage = storage
+        self.run_id = run_id
+
+    def record(
+        self,
+        row: Dict[str, Any],
+        ok: bool,
+        images_saved: int,
+        images_failed: int,
+        day: Optional[str] = None
+    ) -> None:
+        """
+        사용자 한 명의 캡처 결과 반영
+
+        Args:
+            row: 필터링된 행 (fbUid, country)
+            ok: 캡처 페이지 처리 성공 여부
+            images_saved: 저장한 이미지 수
+            images_failed: 실패한 이미지 수
+            day: 집계 날짜 (YYYY-MM-DD, 기본: 오늘)
+        """
+        now = datetime.now()
+        day = day or now.strftime("%Y-%m-%d")
+        values = (int(ok), int(not ok), images_saved, images_failed, now.isoformat())
+        self.storage.execute_many(ADD_AGGREGATE_SQL, [
+            ("run", str(self.run_id), day, *values),
+            ("user", row["fbUid"], day, *values),
+            ("country", row.get("country") or "", day, *values),
+            ("day", "", day, *values),
+        ])
+
+
+# ============================================================================
+# 주간 리포트
+# ============================================================================
+
+@dataclass
+class WeeklyReport:
+    week: str
+    start: str
+    end: str
+    totals: Dict[str, int] = field(default_factory=dict)
+    days: List[Tuple[str, Dict[str, int]]] = field(default_factory=list)
+    runs: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+    countries: List[Tuple[str, Dict[str, int]]] = field(default_factory=list)
+    users: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)   # 이미지 수 상위
+
+
+def build_weekly_report(storage: Storage, week: str, top_users: int = 20) -> WeeklyReport:
+    """report_aggregates에서 week 기간 행만 읽어 리포트 구성"""
+    start, end = week_range(week)
+    storage.flush()
+
+    grouped: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(dict)
+    for scope, key, *counts in storage.query(
+        f"SELECT scope, key, {', '.join(f'SUM({c})' for c in COUNTERS)} FROM report_aggregates "
+        "WHERE day BETWEEN ? AND ? AND scope != 'day' GROUP BY scope, key",
+        (start, end)
+    ):
+        grouped[scope][key] = dict(zip(COUNTERS, counts))
+
+    days = [
+        (day, dict(zip(COUNTERS, counts)))
+        for day, *counts in storage.query(
+            f"SELECT day, {', '.join(COUNTERS)} FROM report_aggregates "
+            "WHERE day BETWEEN ? AND ? AND scope = 'day' ORDER BY day",
+            (start, end)
+        )
+    ]
+    totals = {c: sum(counts[c] for _, counts in days) for c in COUNTERS}
+
+    def by_images(items: Dict[str, Dict[str, int]]) -> List[Tuple[str, Dict[str, int]]]:
+        return sorted(items.items(), key=lambda item: (-item[1]["images_saved"], item[0]))
+
+    # 실행/사용자 표시용 정보는 해당 행만 조회
+    runs = []
+    for run_id, counts in sorted(grouped["run"].items(), key=lambda item: int(item[0])):
+        found = storage.query("SELECT run_date, duration_seconds FROM scraping_runs WHERE id = ?", (int(run_id),))
+        run_date, duration = found[0] if found else (None, None)
+        runs.append((run_id, {**counts, "run_date": run_date, "duration_seconds": duration}))
+
+    users = []
+    for fb_uid, counts in by_images(grouped["user"])[:top_users]:
+        found = storage.query("SELECT nick, country FROM users WHERE fb_uid = ?", (fb_uid,))
+        nick, country = found[0] if found else (None, None)
+        users.append((fb_uid, {**counts, "nick": nick, "country": country}))
+
+    return WeeklyReport(week, start, end, totals, days, runs, by_images(grouped["country"]), users)
+
+
+def render_markdown(report: WeeklyReport) -> str:
+    """리포트를 마크다운 문자열로"""
+    header = "| 사용자 성공 | 사용자 실패 | 이미지 저장 | 이미지 실패 |"
+
+    def cells(counts: Dict[str, Any]) -> str:
+        return " | ".join(str(counts[c]) for c in COUNTERS)
+
+    t = report.totals
+    lines = [
+        f"# 주간 리포트 {report.week} ({report.start} ~ {report.end})",
+        "",
+        f"- 실행: {len(report.runs)}회",
+        f"- 사용자: 성공 {t['users_ok']}명, 실패 {t['users_failed']}명",
+        f"- 이미지: 저장 {t['images_saved']}장, 실패 {t['images_failed']}장",
+        "",
+        "## 날짜별",
+        "",
+        f"| 날짜 {header}",
+        "|---|---|---|---|---|",
+        *(f"| {day} | {cells(counts)} |" for day, counts in report.days),
+        "",
+        "## 실행별",
+        "",
+        f"| 실행 | 시작 | 소요(초) {header}",
+        "|---|---|---|---|---|---|---|",
+        *(
+            f"| {run_id} | {info['run_date'] or '-'} | "
+            f"{'-' if info['duration_seconds'] is None else round(info['duration_seconds'], 1)} | {cells(info)} |"
+            for run_id, info in report.runs
+        ),
+        "",
+        "## 국가별",
+        "",
+        f"| 국가 {header}",
+        "|---|---|---|---|---|",
+        *(f"| {country or '-'} | {cells(counts)} |" for country, counts in report.countries),
+        "",
+        f"## 이미지 상위 사용자 {len(report.users)}명",
+        "",
+        f"| fbUid | 닉네임 | 국가 {header}",
+        "|---|---|---|---|---|---|---|",
+        *(
+            f"| {fb_uid} | {info['nick'] or '-'} | {info['country'] or '-'} | {cells(info)} |"
+            for fb_uid, info in report.users
+        ),
+        "",
+    ]
+    return "\n".join(lines)
+
+
+# ============================================================================
+# 엑셀
+# ============================================================================
+
+def iter_week_captures(storage: Storage, report: WeeklyReport, batch: int = 1000) -> Iterator[tuple]:
+    """캡처 날짜가 해당 주인 캡처 행을 batch개씩 읽어서 하나씩 (상세 시트용, 전체를 메모리에 올리지 않음)"""
+    conn = storage.read_connection()
+    cursor = conn.execute(
+        "SELECT c.fb_uid, u.nick, u.country, u.gender, c.capture_date, c.image_count, c.folder_path "
+        "FROM captures c LEFT JOIN users u ON u.fb_uid = c.fb_uid "
+        "WHERE c.capture_date BETWEEN ? AND ? ORDER BY c.capture_date, c.fb_uid",
+        (report.start, report.end)
+    )
+    try:
+        while rows := cursor.fetchmany(batch):
+            yield from rows
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def write_excel(report: WeeklyReport, out_path: str, details: Optional[Iterator[tuple]] = None) -> Path:
+    """
+    리포트를 xlsx로 저장 (write_only 모드, 행을 바로 파일로 흘려보냄)
+
+    Args:
+        report: build_weekly_report 결과
+        out_path: 저장 경로
+        details: 상세 시트에 쓸 캡처 행 (iter_week_captures)
+    """
+    # 엑셀 내보내기에서만 필요
+    from openpyxl import Workbook
+
+    headers = ["사용자 성공", "사용자 실패", "이미지 저장", "이미지 실패"]
+    wb = Workbook(write_only=True)
+
+    ws = wb.create_sheet("요약")
+    ws.append(["주차", report.week])
+    ws.append(["기간", f"{report.start} ~ {report.end}"])
+    ws.append(["실행 수", len(report.runs)])
+    for name, c in zip(headers, COUNTERS):
+        ws.append([name, report.totals[c]])
+
+    ws = wb.create_sheet("날짜별")
+    ws.append(["날짜", *headers])
+    for day, counts in report.days:
+        ws.append([day, *(counts[c] for c in COUNTERS)])
+
+    ws = wb.create_sheet("실행별")
+    ws.append(["실행", "시작", "소요(초)", *headers])
+    for run_id, info in report.runs:
+        ws.append([int(run_id), info["run_date"], info["duration_seconds"], *(info[c] for c in COUNTERS)])
+
+    ws = wb.create_sheet("국가별")
+    ws.append(["국가", *headers])
+    for country, counts in report.countries:
+        ws.append([country, *(counts[c] for c in COUNTERS)])
+
+    ws = wb.create_sheet("사용자")
+    ws.append(["fbUid", "닉네임", "국가", *headers])
+    for fb_uid, info in report.users:
+        ws.append([fb_uid, info["nick"], info["country"], *(info[c] for c in COUNTERS)])
+
+    if details is not None:
+        ws = wb.create_sheet("캡처 상세")
+        ws.append(["fbUid", "닉네임", "국가", "성별", "캡처 날짜", "이미지 수", "폴더"])
+        count = 0
+        for row in details:
+            ws.append(list(row))
+            count += 1
+        logger.info(f"상세 시트: {count}행")
+
+    path = Path(out_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    wb.save(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def generate_weekly_report(
+    storage: Storage,
+    week: Optional[str] = None,
+    out_dir: str = "reports",
+    xlsx: bool = False,
+    details: bool = False
+) -> Dict[str, str]:
+    """
+    주간 리포트 파일 생성
+
+    Returns:
+        {'markdown': 경로, 'xlsx': 경로(xlsx=True일 때)}
+    """
+    week = week or last_week()
+    report = build_weekly_report(storage, week)
+
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    md_path = Path(out_dir) / f"weekly_{week}.md"
+    tmp_path = md_path.with_name(f".{md_path.name}.tmp")
+    tmp_path.write_text(render_markdown(report), encoding="utf-8")
+    os.replace(tmp_path, md_path)
+    outputs = {"markdown": str(md_path)}
+
+    if xlsx:
+        rows = iter_week_captures(storage, report) if details else None
+        outputs["xlsx"] = str(write_excel(report, str(Path(out_dir) / f"weekly_{week}.xlsx"), rows))
+
+    logger.info(f"주간 리포트 생성: {outputs}")
+    return outputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="주간 리포트 생성")
+    parser.add_argument("--db", default=os.getenv("DB_PATH", "data/scraper.db"), help="SQLite 경로")
+    parser.add_argument("--week", help="ISO 주차 (예: 2026-W41, 기본: 지난주)")
+    parser.add_argument("--out", default="reports", help="리포트 저장 폴더")
+    parser.add_argument("--xlsx", action="store_true", help="엑셀 파일도 생성")
+    parser.add_argument("--details", action="store_true", help="엑셀에 캡처 상세 시트 추가")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with Storage(args.db) as storage:
+        generate_weekly_report(storage, args.week, args.out, args.xlsx, args.details)
+
+
+if __name__ == "__main__":
+    main()
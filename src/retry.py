@@ -0,0 +1,169 @@
+# src/retry.py
+import time
+import random
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 재시도하면 성공할 수 있는 상태 코드 (그 외 4xx 등은 즉시 실패)
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After 헤더를 대기 시간(초)으로 변환
+
+    Args:
+        value: 초 단위 숫자 또는 HTTP 날짜 문자열
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """
+    호스트별 서킷 브레이커
+
+    연속 실패가 failure_threshold번 쌓이면 cooldown초 동안 회로를 열어
+    해당 호스트로 가는 모든 워커를 멈춰 세움.
+    쿨다운이 끝나면 half-open: 요청 하나만 탐색으로 보내고 나머지는 그 결과를 기다림.
+    탐색이 성공하면 닫히고, 실패하면 다시 cooldown초 동안 열림.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0, probe_timeout: float = 60.0):
+        """
+        Args:
+            failure_threshold: 회로를 열 연속 실패 수
+            cooldown: 열려 있는 시간(초)
+            probe_timeout: 탐색 요청이 결과를 알리지 않으면 이 시간 뒤 다른 요청이 탐색
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+        self._probing: Dict[str, float] = {}          # 호스트 → 탐색 요청 마감 시각
+        self._probe_done: Dict[str, asyncio.Event] = {}
+        self.trips = 0
+
+    def is_open(self, host: str) -> bool:
+        return self._open_until.get(host, 0.0) > time.monotonic()
+
+    def is_half_open(self, host: str) -> bool:
+        return host in self._open_until and not self.is_open(host)
+
+    async def wait(self, host: str) -> None:
+        """회로가 열려 있으면 대기 (half-open이면 한 요청만 통과)"""
+        while host in self._open_until:
+            now = time.monotonic()
+            if self._open_until[host] > now:
+                await asyncio.sleep(self._open_until[host] - now)
+                continue
+
+            deadline = self._probing.get(host)
+            if deadline is None or deadline <= now:
+                # 이 요청이 탐색 요청 - 결과는 record_success/record_failure로
+                self._probing[host] = now + self.probe_timeout
+                self._probe_done[host] = asyncio.Event()
+                return
+
+            try:
+                await asyncio.wait_for(self._probe_done[host].wait(), deadline - now)
+            except asyncio.TimeoutError:
+                pass
+
+    def _end_probe(self, host: str) -> None:
+        self._probing.pop(host, None)
+        event = self._probe_done.pop(host, None)
+        if event:
+            event.set()
+
+    def record_success(self, host: str) -> None:
+        self._failures.pop(host, None)
+        if self._open_until.pop(host, None) is not None:
+            logger.info(f"서킷 닫힘: {host}")
+        self._end_probe(host)
+
+    def record_failure(self, host: str) -> None:
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        if host in self._probing:
+            # half-open 탐색 실패 → 다시 열림
+            self._open_until[host] = time.monotonic() + self.cooldown
+            self.trips += 1
+            self._end_probe(host)
+            logger.warning(f"서킷 다시 열림: {host} (탐색 실패, {self.cooldown:.0f}초 대기)")
+        elif failures >= self.failure_threshold and host not in self._open_until:
+            self._open_until[host] = time.monotonic() + self.cooldown
+            self.trips += 1
+            logger.warning(f"서킷 열림: {host} (연속 실패 {failures}회, {self.cooldown:.0f}초 대기)")
+
+
+class RetryPolicy:
+    """
+    다운로드 재시도 정책
+
+    - 지수 백오프 + full jitter
+    - Retry-After 헤더가 있으면 그 시간을 우선 (max_retry_after로 상한)
+    - 재시도 가능한 상태 코드/네트워크 오류만 재시도
+    - 호스트별 서킷 브레이커 공유
+    - 시도 횟수/결과 집계 (stats)
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        max_retry_after: float = 120.0,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.breaker = breaker or CircuitBreaker()
+        self.stats: Counter = Counter()
+
+    @staticmethod
+    def is_retryable(status: int) -> bool:
+        return status in RETRYABLE_STATUSES
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        다음 시도까지 대기 시간(초)
+
+        Args:
+            attempt: 방금 실패한 시도 번호 (1부터)
+            retry_after: 응답의 Retry-After 헤더 값
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is not None:
+            return min(delay, self.max_retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def record(self, outcome: str, attempts: int) -> None:
+        """이미지 한 장의 최종 결과 기록 (ok / fatal / exhausted)"""
+        self.stats[outcome] += 1
+        self.stats[f"attempts_{attempts}"] += 1
+
+    def summary(self) -> Dict[str, int]:
+        """실행 통계에 합칠 집계 (download_ 접두사)"""
+        result = {f"download_{key}": value for key, value in sorted(self.stats.items())}
+        result["download_circuit_trips"] = self.breaker.trips
+        return result
@@ -1,15 +1,21 @@
 # src/scraper.py
 import logging
-import re
 from datetime import datetime, timezone, timedelta
 from playwright.async_api import Page
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Optional, Dict, Any
+
+from table_api import TableInterceptor
+from crawler.popup_handler import scan_close_buttons, sweep_popups, install_popup_auto_dismiss
+from crawler.row_filter import DEFAULT_RULES, MALE_RULE, LoginDateParser, compile_filter, week_start
 
 logger = logging.getLogger(__name__)
 
 # 한국 시간대
 KST = timezone(timedelta(hours=9))
 
+# 실행 전체에서 공유하는 lastLogin 파서 (같은 문자열은 한 번만 파싱)
+_date_parser = LoginDateParser(KST)
+
 # 팝업 패턴
 POPUP_PATTERNS = [
     {
@@ -53,76 +59,25 @@ def parse_last_login(raw: str) -> Optional[datetime]:
     Returns:
         파싱된 datetime 객체 (KST) 또는 None
     """
-    if not raw:
-        return None
-    
-    # 지원하는 날짜 형식들
-    formats = [
-        "%Y. %m. %d. %p %I:%M:%S",     # 2024. 12. 17. 오후 3:45:30
-        "%m/%d/%Y, %I:%M:%S %p",       # 12/17/2025, 1:08:03 PM
-    ]
-    
-    try:
-        # 오전/오후를 AM/PM으로 변환
-        processed = raw.replace("오전", "AM").replace("오후", "PM")
-        processed = re.sub(r"\s+", " ", processed.strip())
-        
-        # 각 형식으로 시도
-        for fmt in formats:
-            try:
-                parsed = datetime.strptime(processed, fmt)
-                return parsed.replace(tzinfo=KST)
-            except ValueError:
-                continue
-        
-        # 모든 형식 실패
-        logger.warning(f"날짜 파싱 실패 (지원하지 않는 형식): {raw}")
-        return None
-        
-    except Exception as e:
-        logger.warning(f"날짜 파싱 실패: {raw}, 에러: {e}")
-        return None
+    return _date_parser.parse(raw)
 
 
 # ============================================================================
 # 팝업 처리
 # ============================================================================
 
-async def get_element_z_index(page: Page, element) -> int:
-    """요소의 z-index를 가져옴"""
-    try:
-        z = await page.evaluate('(el) => getComputedStyle(el).zIndex', element)
-        return int(z) if z != 'auto' else 0
-    except (ValueError, TypeError):
-        return 0
-
-
 async def get_sorted_close_buttons(page: Page) -> List[str]:
-    """화면의 모든 닫기 버튼을 z-index 순으로 정렬하여 반환"""
-    found: List[Tuple[int, str]] = []
-
-    for popup in POPUP_PATTERNS:
-        for btn_selector in popup["selectors"]:
-            try:
-                btn_element = await page.query_selector(btn_selector)
-                if btn_element and await btn_element.is_visible():
-                    z_index = await get_element_z_index(page, btn_element)
-                    found.append((z_index, btn_selector))
-            except Exception as e:
-                logger.debug(f"버튼 조회 중 에러: {btn_selector}, {e}")
-                continue
-
-    if not found:
-        return []
-
-    found.sort(key=lambda x: x[0], reverse=True)
-    return [selector for _, selector in found]
+    """화면의 모든 닫기 버튼을 z-index 순으로 정렬하여 반환 (evaluate 1회)"""
+    found = await scan_close_buttons(page, POPUP_PATTERNS)
+    return [button["selector"] for button in found]
 
 
 async def close_all_popups(page: Page, max_attempts: int = 10) -> int:
     """
     화면의 모든 팝업을 순차적으로 닫음
     
+    팝업 하나당 페이지 안에서 스캔·클릭·사라짐 대기를 한 번에 처리함.
+    
     Args:
         page: Playwright Page 객체
         max_attempts: 최대 시도 횟수 (무한루프 방지)
@@ -130,36 +85,17 @@ async def close_all_popups(page: Page, max_attempts: int = 10) -> int:
     Returns:
         닫은 팝업의 개수
     """
-    closed_count = 0
-    
-    for attempt in range(max_attempts):
-        close_buttons = await get_sorted_close_buttons(page)
-        
-        if not close_buttons:
-            logger.info("더 이상 닫을 팝업이 없습니다.")
-            break
-        
-        first_button = close_buttons[0]
-        
-        try:
-            button_element = await page.query_selector(first_button)
-            if not button_element:
-                logger.warning(f"버튼을 찾을 수 없음: {first_button}")
-                break
-            
-            await button_element.click()
-            closed_count += 1
-            logger.info(f"팝업 닫기 성공 ({closed_count}): {first_button}")
-            await page.wait_for_timeout(500)
-                
-        except Exception as e:
-            logger.warning(f"팝업 닫기 실패: {first_button}, 에러: {e}")
-            break
+    closed_count = await sweep_popups(page, POPUP_PATTERNS, max_attempts)
     
     logger.info(f"총 {closed_count}개의 팝업을 닫았습니다.")
     return closed_count
 
 
+async def enable_popup_auto_dismiss(page: Page) -> None:
+    """이후 열리는 모든 페이지/탭에서 팝업이 뜨는 즉시 닫도록 설정"""
+    await install_popup_auto_dismiss(page.context, POPUP_PATTERNS)
+
+
 # ============================================================================
 # 로그인 및 네비게이션
 # ============================================================================
@@ -208,30 +144,115 @@ async def navigate_to_police_page(page: Page) -> bool:
         return False
 
 
-async def wait_for_table_loaded(page: Page, min_rows: int = 10, max_wait: int = 120) -> bool:
+# 테이블 준비 감지 (MutationObserver + PerformanceObserver, 폴링 없음)
+# - 행 수가 minRows 이상이 된 뒤 quietMs 동안 행 수가 변하지 않으면 완료
+#   (행이 아닌 DOM 변화 - 시계, 스피너 등 - 는 대기 시간을 늘리지 않음)
+# - expected가 있으면 그 수에 도달하는 즉시 완료
+# - urlPattern이 있으면 해당 데이터 요청의 응답이 끝난 뒤부터 판단
+#   (스크립트 주입 전에 끝난 요청도 보이도록 buffered, 리소스 타이밍 버퍼 확장.
+#    graceMs 안에 요청이 보이지 않으면 행 수만으로 판단)
+TABLE_READY_JS = """
+({ minRows, expected, quietMs, timeoutMs, urlPattern, graceMs }) => new Promise(resolve => {
+    const started = performance.now();
+    const count = () => document.querySelectorAll('.police-table-row').length;
+    const matcher = urlPattern ? new RegExp(urlPattern) : null;
+    let requestSeen = !matcher;
+    const requestDone = () => requestSeen || (requestSeen = performance.getEntriesByType('resource')
+        .some(e => matcher.test(e.name) && e.responseEnd > 0));
+
+    let quietTimer = null;
+    let graceTimer = null;
+    let lastRows = -1;
+    let finished = false;
+    const observers = [];
+
+    const finish = (ok) => {
+        if (finished) return;
+        finished = true;
+        observers.forEach(o => o.disconnect());
+        clearTimeout(quietTimer);
+        clearTimeout(graceTimer);
+        clearTimeout(deadline);
+        resolve({ ok, rows: count(), elapsed: (performance.now() - started) / 1000 });
+    };
+
+    const check = () => {
+        if (!requestDone()) return;
+        const rows = count();
+        if (expected && rows >= expected) return finish(true);
+        // 행 수가 그대로면 진행 중인 조용한 구간을 유지
+        if (rows === lastRows) return;
+        lastRows = rows;
+        clearTimeout(quietTimer);
+        quietTimer = rows >= minRows ? setTimeout(() => finish(true), quietMs) : null;
+    };
+
+    const deadline = setTimeout(() => finish(false), timeoutMs);
+
+    const mutations = new MutationObserver(check);
+    mutations.observe(document.body, { childList: true, subtree: true });
+    observers.push(mutations);
+
+    if (matcher) {
+        performance.setResourceTimingBufferSize(Math.max(1000, performance.getEntriesByType('resource').length * 2));
+        const network = new PerformanceObserver(check);
+        network.observe({ type: 'resource', buffered: true });
+        observers.push(network);
+        graceTimer = setTimeout(() => { requestSeen = true; check(); }, graceMs);
+    }
+
+    check();
+})
+"""
+
+
+async def wait_for_table_loaded(
+    page: Page,
+    min_rows: int = 10,
+    max_wait: int = 120,
+    expected_rows: Optional[int] = None,
+    quiet_ms: int = 500,
+    data_url_pattern: Optional[str] = None,
+    request_grace: float = 10.0
+) -> bool:
     """
     테이블 로딩 완료 대기
     
+    DOM 변경과 네트워크 응답 이벤트로 판단하므로 폴링 지연이 없고,
+    행이 계속 추가되는 중에는 완료로 보지 않음. 행 수가 바뀔 때만 조용한 구간을 다시 잼.
+    
     Args:
         page: Page 객체
         min_rows: 최소 행 개수
         max_wait: 최대 대기 시간(초)
+        expected_rows: 기대 행 개수 (도달하면 대기 없이 즉시 완료)
+        quiet_ms: 행 수가 이 시간(ms) 동안 변하지 않으면 완료
+        data_url_pattern: 테이블 데이터 요청 URL 정규식 (응답 완료 후부터 판단)
+        request_grace: 이 시간(초) 안에 데이터 요청이 보이지 않으면 행 수만으로 판단
     
     Returns:
         로딩 성공 여부
     """
-    logger.info(f"테이블 로딩 대기 시작 ({min_rows}행 인식시)")
+    logger.info(f"테이블 로딩 대기 시작 ({min_rows}행 이상, {quiet_ms}ms 변화 없음)")
     
-    for i in range(max_wait):
-        row_count = await page.locator('.police-table-row').count()
-        
-        if row_count >= min_rows:
-            logger.info(f"{i}초 로딩. 테이블 로딩 완료: {row_count}개 행")
-            return True
-        
-        await page.wait_for_timeout(1000)
+    try:
+        result = await page.evaluate(TABLE_READY_JS, {
+            "minRows": min_rows,
+            "expected": expected_rows,
+            "quietMs": quiet_ms,
+            "timeoutMs": max_wait * 1000,
+            "urlPattern": data_url_pattern,
+            "graceMs": int(request_grace * 1000),
+        })
+    except Exception as e:
+        logger.error(f"테이블 로딩 대기 실패: {e}")
+        return False
+
+    if result["ok"]:
+        logger.info(f"{result['elapsed']:.1f}초 로딩. 테이블 로딩 완료: {result['rows']}개 행")
+        return True
     
-    logger.warning("⚠️ 테이블 로딩 타임아웃")
+    logger.warning(f"⚠️ 테이블 로딩 타임아웃 ({result['rows']}개 행)")
     return False
 
 
@@ -239,13 +260,24 @@ async def wait_for_table_loaded(page: Page, min_rows: int = 10, max_wait: int =
 # 데이터 추출 및 필터링
 # ============================================================================
 
-async def get_table_data(page: Page) -> List[Dict[str, Any]]:
+async def get_table_data(page: Page, interceptor: Optional[TableInterceptor] = None) -> List[Dict[str, Any]]:
     """
     테이블에서 모든 데이터 추출
     
+    Args:
+        page: Page 객체
+        interceptor: 테이블 API 응답 가로채기 (잡은 행이 있으면 DOM을 읽지 않음)
+    
     Returns:
         테이블 행 데이터 리스트
     """
+    if interceptor:
+        table_data = interceptor.rows()
+        if table_data:
+            logger.info(f"테이블 데이터 추출 완료 (API 응답): {len(table_data)}개 행")
+            return table_data
+        logger.info("가로챈 테이블 응답 없음 → DOM에서 추출")
+
     try:
         await page.wait_for_selector('.police-table-row', state='visible')
         
@@ -273,56 +305,48 @@ async def get_table_data(page: Page) -> List[Dict[str, Any]]:
         return []
 
 
-async def get_filtered_data(page: Page) -> List[Dict[str, Any]]:
+async def get_filtered_data(
+    page: Page,
+    interceptor: Optional[TableInterceptor] = None,
+    male_only: bool = False
+) -> List[Dict[str, Any]]:
     """
-    필터링된 데이터 반환
+    필터링된 데이터 반환 (get_table_data + filter_table_data)
+    
+    Args:
+        page: Page 객체
+        interceptor: 테이블 API 응답 가로채기 (None이면 DOM에서 추출)
+        male_only: 남성만 남길지 여부
+    
+    Returns:
+        필터링된 데이터 리스트
+    """
+    table_data = await get_table_data(page, interceptor)
+    return filter_table_data(table_data, male_only)
+
+
+def filter_table_data(table_data: List[Dict[str, Any]], male_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    테이블 행 필터링
     - 지난 주 월요일 이후 로그인
     - 필리핀(PH) 제외
     - 헤더 행 제외
+    - male_only면 남성만
+    
+    Args:
+        table_data: get_table_data 결과
+        male_only: 남성만 남길지 여부
     
     Returns:
         필터링된 데이터 리스트
     """
-    table_data = await get_table_data(page)
-    
     if not table_data:
         return []
     
-    # 현재 시간 (KST)
-    now = datetime.now(timezone.utc).astimezone(KST)
-    
-    # 이번 주 월요일 00:00:00
-    this_week_monday = now - timedelta(days=now.weekday())
-    this_week_monday = this_week_monday.replace(hour=0, minute=0, second=0, microsecond=0)
+    logger.info(f"필터링 기준일: {week_start().strftime('%Y-%m-%d %H:%M:%S')} (KST)")
     
-    # 지난 주 월요일 00:00:00
-    start_of_week = this_week_monday - timedelta(days=7)
-    
-    logger.info(f"필터링 기준일: {start_of_week.strftime('%Y-%m-%d %H:%M:%S')} (KST)")
-    
-    filtered_data = []
-    
-    for row in table_data:
-        # 헤더 행 제외
-        if row["id"].lower() == "id":
-            continue
-        
-        # 날짜 파싱
-        parsed_date = parse_last_login(row["lastLogin"])
-        if not parsed_date:
-            continue
-        
-        # 필리핀 제외
-        if row["country"] == "PH":
-            continue
-        
-        # 지난 주 월요일 이전 제외
-        if parsed_date < start_of_week:
-            continue
-        
-        # lastLogin을 datetime 객체로 교체
-        row["lastLogin"] = parsed_date
-        filtered_data.append(row)
+    rules = DEFAULT_RULES + [MALE_RULE] if male_only else DEFAULT_RULES
+    filtered_data = compile_filter(rules, parser=_date_parser)(table_data)
     
     logger.info(f"필터링 완료: {len(filtered_data)}개 행")
     return filtered_data
\ No newline at end of file
@@ -0,0 +1,381 @@
+# src/storage.py
+import queue
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# docs/table_modelings.md 스키마
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scraping_runs (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_date         TEXT NOT NULL,
+    total_rows       INTEGER,
+    filtered_count   INTEGER,
+    success_count    INTEGER,
+    failed_count     INTEGER,
+    total_images     INTEGER,
+    duration_seconds REAL,
+    created_at       TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    fb_uid     TEXT PRIMARY KEY,
+    nick       TEXT,
+    country    TEXT,
+    gender     TEXT,
+    last_login TEXT,
+    first_seen TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS captures (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    fb_uid       TEXT NOT NULL REFERENCES users(fb_uid),
+    capture_date TEXT NOT NULL,
+    image_count  INTEGER NOT NULL DEFAULT 0,
+    folder_path  TEXT,
+    created_at   TEXT NOT NULL,
+    UNIQUE (fb_uid, capture_date)
+);
+
+CREATE TABLE IF NOT EXISTS images (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    capture_id INTEGER NOT NULL REFERENCES captures(id),
+    image_path TEXT NOT NULL,
+    date_taken TEXT,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS classifications (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    image_id      INTEGER NOT NULL REFERENCES images(id),
+    source        TEXT NOT NULL CHECK (source IN ('manual', 'ml')),
+    category      TEXT,
+    risk_level    INTEGER,
+    confidence    REAL,
+    notes         TEXT,
+    classified_at TEXT NOT NULL,
+    model_version TEXT              -- source='ml'일 때 모델 이름@버전
+);
+
+-- 리포트용 누적 집계 (report.RunAggregates가 캡처 완료 때마다 더함)
+-- scope: 'run'(key=실행 id) / 'user'(fb_uid) / 'country' / 'day'(key='')
+CREATE TABLE IF NOT EXISTS report_aggregates (
+    scope         TEXT NOT NULL,
+    key           TEXT NOT NULL,
+    day           TEXT NOT NULL,
+    users_ok      INTEGER NOT NULL DEFAULT 0,
+    users_failed  INTEGER NOT NULL DEFAULT 0,
+    images_saved  INTEGER NOT NULL DEFAULT 0,
+    images_failed INTEGER NOT NULL DEFAULT 0,
+    updated_at    TEXT NOT NULL,
+    PRIMARY KEY (scope, key, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_captures_fb_uid ON captures(fb_uid);
+CREATE INDEX IF NOT EXISTS idx_captures_capture_date ON captures(capture_date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_images_image_path ON images(image_path);
+CREATE INDEX IF NOT EXISTS idx_images_capture_id ON images(capture_id);
+CREATE INDEX IF NOT EXISTS idx_classifications_image_id ON classifications(image_id);
+CREATE INDEX IF NOT EXISTS idx_report_aggregates_day ON report_aggregates(day, scope);
+"""
+
+UPSERT_USER_SQL = (
+    "INSERT INTO users (fb_uid, nick, country, gender, last_login, first_seen, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(fb_uid) DO UPDATE SET nick = excluded.nick, country = excluded.country, "
+    "gender = excluded.gender, last_login = excluded.last_login"
+)
+
+INSERT_CAPTURE_SQL = (
+    "INSERT INTO captures (fb_uid, capture_date, folder_path, created_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(fb_uid, capture_date) DO UPDATE SET folder_path = excluded.folder_path"
+)
+
+# capture_id는 (fb_uid, capture_date)로 찾음 - 쓰기 스레드가 순서대로 처리하므로 캡처 행이 먼저 들어가 있음
+# 같은 경로에 다시 저장하면 새 이미지이므로 기존 행을 갱신
+INSERT_IMAGE_SQL = (
+    "INSERT INTO images (capture_id, image_path, date_taken, created_at) "
+    "SELECT id, ?, ?, ? FROM captures WHERE fb_uid = ? AND capture_date = ? "
+    "ON CONFLICT(image_path) DO UPDATE SET capture_id = excluded.capture_id, "
+    "date_taken = excluded.date_taken, created_at = excluded.created_at"
+)
+
+REFRESH_COUNT_SQL = (
+    "UPDATE captures SET image_count = "
+    "(SELECT COUNT(*) FROM images WHERE images.capture_id = captures.id) WHERE fb_uid = ?"
+)
+
+# 이전 스키마로 만든 DB에 없는 컬럼 (테이블, 컬럼, 정의)
+ADDED_COLUMNS = [
+    ("classifications", "model_version", "TEXT"),
+]
+
+POST_MIGRATION_SQL = """
+CREATE INDEX IF NOT EXISTS idx_classifications_model ON classifications(model_version, image_id);
+"""
+
+_STOP = object()
+
+
+class Storage:
+    """
+    docs/table_modelings.md 스키마의 SQLite 저장소
+
+    모든 쓰기는 전용 쓰기 스레드가 큐에서 꺼내 처리한다.
+    호출하는 쪽(이벤트 루프)은 큐에 넣기만 하므로 디스크를 기다리지 않음.
+    쓰기 스레드는 큐에 쌓인 작업을 최대 batch_size개씩 모아 트랜잭션 하나로,
+    같은 SQL이 연속되면 executemany 한 번으로 실행한다.
+    묶음이 실패하면 작업별 트랜잭션으로 다시 실행해 실패한 작업만 버린다.
+    """
+
+    def __init__(self, db_path: str = "data/scraper.db", batch_size: int = 1000):
+        """
+        Args:
+            db_path: SQLite 파일 경로
+            batch_size: 트랜잭션 하나에 모을 최대 작업 수
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue()
+        self._read_lock = threading.Lock()
+        self._reader: Optional[sqlite3.Connection] = None
+
+        # 스키마는 쓰기 스레드가 시작 전에 만들어 둠 (읽기 연결이 바로 쓸 수 있도록)
+        ready: Future = Future()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="storage-writer", daemon=True)
+        self._thread.start()
+        ready.result()
+
+    # ------------------------------------------------------------------
+    # 쓰기 스레드
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _run(self, ready: Future) -> None:
+        try:
+            conn = self._connect()
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+
+        try:
+            while True:
+                ops = [self._queue.get()]
+                while len(ops) < self.batch_size:
+                    try:
+                        ops.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = any(op is _STOP for op in ops)
+                self._apply(conn, [op for op in ops if op is not _STOP])
+                for _ in ops:
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        for table, column, definition in ADDED_COLUMNS:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                logger.info(f"DB 컬럼 추가: {table}.{column}")
+        conn.executescript(POST_MIGRATION_SQL)
+
+    @staticmethod
+    def _execute(conn: sqlite3.Connection, ops: List[tuple]) -> List[Tuple[Future, Any]]:
+        """작업 묶음을 트랜잭션 하나로 실행 (연속된 같은 SQL은 합침, 실패하면 전체 롤백)"""
+        futures: List[Tuple[Future, Any]] = []
+        with conn:
+            index = 0
+            while index < len(ops):
+                kind, target, payload = ops[index]
+                if kind == "call":
+                    futures.append((payload, target(conn)))
+                    index += 1
+                    continue
+
+                rows = list(payload)
+                index += 1
+                while index < len(ops) and ops[index][0] == "sql" and ops[index][1] == target:
+                    rows.extend(ops[index][2])
+                    index += 1
+                conn.executemany(target, rows)
+        return futures
+
+    def _apply(self, conn: sqlite3.Connection, ops: List[tuple]) -> None:
+        """작업 묶음 실행 (실패하면 작업별로 다시 실행해 실패한 작업만 버림)"""
+        if not ops:
+            return
+
+        try:
+            futures = self._execute(conn, ops)
+        except Exception as e:
+            if len(ops) > 1:
+                logger.warning(f"DB 일괄 쓰기 실패 ({len(ops)}건 롤백) → 작업별로 다시 실행: {e}")
+                for op in ops:
+                    self._apply(conn, [op])
+                return
+            kind, target, payload = ops[0]
+            logger.error(f"DB 쓰기 실패 (작업 버림): {e} - {target if kind == 'sql' else 'call'}")
+            if kind == "call" and not payload.done():
+                payload.set_exception(e)
+            return
+
+        for future, result in futures:
+            future.set_result(result)
+
+    # ------------------------------------------------------------------
+    # 큐 투입 (논블로킹)
+    # ------------------------------------------------------------------
+
+    def execute_many(self, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        """쓰기 스레드에서 executemany로 실행 (기다리지 않음)"""
+        rows = list(rows)
+        if rows:
+            self._queue.put(("sql", sql, rows))
+
+    def call(self, fn: Callable[[sqlite3.Connection], Any]) -> Future:
+        """쓰기 스레드의 연결로 fn(conn) 실행 (결과가 필요할 때 Future.result())"""
+        future: Future = Future()
+        self._queue.put(("call", fn, future))
+        return future
+
+    def flush(self) -> None:
+        """지금까지 넣은 작업이 모두 기록될 때까지 대기 (이벤트 루프에서는 to_thread로)"""
+        self._queue.join()
+
+    def close(self) -> None:
+        """남은 작업을 모두 기록하고 쓰기 스레드 종료"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._reader:
+            self._reader.close()
+            self._reader = None
+
+    def __enter__(self) -> "Storage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # 실행 기록
+    # ------------------------------------------------------------------
+
+    def start_run(self, run_date: Optional[datetime] = None) -> int:
+        """scraping_runs 행을 만들고 id 반환 (실행 시작 시 한 번, 짧게 대기)"""
+        run_date = run_date or datetime.now()
+
+        def insert(conn: sqlite3.Connection) -> int:
+            cursor = conn.execute(
+                "INSERT INTO scraping_runs (run_date, created_at) VALUES (?, ?)",
+                (run_date.isoformat(), datetime.now().isoformat())
+            )
+            return cursor.lastrowid
+
+        return self.call(insert).result()
+
+    def finish_run(
+        self,
+        run_id: int,
+        total_rows: Optional[int] = None,
+        filtered_count: Optional[int] = None,
+        success_count: Optional[int] = None,
+        failed_count: Optional[int] = None,
+        total_images: Optional[int] = None,
+        duration_seconds: Optional[float] = None
+    ) -> None:
+        """실행 결과 기록 (값이 None인 항목은 그대로 둠)"""
+        self.execute_many(
+            "UPDATE scraping_runs SET "
+            "total_rows = COALESCE(?, total_rows), filtered_count = COALESCE(?, filtered_count), "
+            "success_count = COALESCE(?, success_count), failed_count = COALESCE(?, failed_count), "
+            "total_images = COALESCE(?, total_images), duration_seconds = COALESCE(?, duration_seconds) "
+            "WHERE id = ?",
+            [(total_rows, filtered_count, success_count, failed_count, total_images, duration_seconds, run_id)]
+        )
+
+    # ------------------------------------------------------------------
+    # 사용자 / 캡처 / 이미지
+    # ------------------------------------------------------------------
+
+    def upsert_users(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        필터링된 행으로 users 갱신 (first_seen은 처음 본 시각 유지)
+
+        Args:
+            rows: get_filtered_data 결과 (lastLogin은 datetime 또는 문자열)
+        """
+        now = datetime.now().isoformat()
+        params = []
+        for row in rows:
+            last_login = row.get("lastLogin")
+            if isinstance(last_login, datetime):
+                last_login = last_login.isoformat()
+            params.append((
+                row["fbUid"], row.get("nick"), row.get("country"), row.get("gender"),
+                last_login, now, now,
+            ))
+        self.execute_many(UPSERT_USER_SQL, params)
+
+    def add_captures(self, items: Iterable[Tuple[str, str, str]]) -> None:
+        """캡처(사용자 × 날짜) 등록 ((fb_uid, capture_date, folder_path) 목록)"""
+        now = datetime.now().isoformat()
+        self.execute_many(INSERT_CAPTURE_SQL, [(uid, date, folder, now) for uid, date, folder in items])
+
+    def add_images(self, items: Iterable[Tuple[str, str, str, Optional[str]]]) -> None:
+        """
+        저장된 이미지 등록 (다운로드 경로에서 호출해도 큐에 넣기만 함)
+
+        Args:
+            items: (fb_uid, capture_date, image_path, date_taken) 목록
+        """
+        now = datetime.now().isoformat()
+        self.execute_many(
+            INSERT_IMAGE_SQL,
+            [(path, taken, now, uid, date) for uid, date, path, taken in items]
+        )
+
+    def refresh_capture_counts(self, fb_uid: str) -> None:
+        """사용자의 캡처별 image_count를 images 테이블 기준으로 다시 계산"""
+        self.execute_many(REFRESH_COUNT_SQL, [(fb_uid,)])
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """
+        읽기 전용 연결로 조회 (WAL이라 쓰기 스레드와 동시에 읽을 수 있음)
+
+        아직 큐에 남은 쓰기는 보이지 않으므로 필요하면 flush() 후 호출.
+        """
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._reader.execute(sql, params).fetchall()
+
+    def read_connection(self) -> sqlite3.Connection:
+        """커서를 오래 열어 둘 조회용 새 연결 (fetchmany로 나눠 읽을 때, 호출한 쪽이 닫음)"""
+        return sqlite3.connect(self.db_path, check_same_thread=False)
@@ -0,0 +1,107 @@
+# src/tab_pool.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Set
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+
+class TabPool:
+    """
+    캡처 페이지 처리를 위한 재사용 탭 풀
+
+    - size개의 탭을 미리 열어두고 워커가 빌려 쓰고 반납
+    - 탭이 크래시되거나 닫히면 새 탭으로 교체
+    - 한 탭이 recycle_after명을 처리하면 닫고 새로 열어 브라우저 메모리 누적 방지
+    """
+
+    def __init__(self, context: BrowserContext, size: int = 3, recycle_after: int = 20):
+        """
+        Args:
+            context: 탭을 열 브라우저 컨텍스트 (로그인 쿠키 공유)
+            size: 동시에 유지할 탭 수
+            recycle_after: 탭 하나당 최대 처리 횟수 (0 이하이면 재활용 안 함)
+        """
+        self.context = context
+        self.size = max(1, size)
+        self.recycle_after = recycle_after
+        self._idle: asyncio.Queue[Page] = asyncio.Queue()
+        self._uses: Dict[Page, int] = {}
+        self._crashed: Set[Page] = set()
+        self.recycled = 0
+        self.crashes = 0
+
+    async def _open_tab(self) -> Page:
+        tab = await self.context.new_page()
+        self._uses[tab] = 0
+        tab.on("crash", lambda _: self._mark_crashed(tab))
+        return tab
+
+    def _mark_crashed(self, tab: Page) -> None:
+        logger.warning("탭 크래시 감지")
+        self._crashed.add(tab)
+        self.crashes += 1
+
+    async def _discard(self, tab: Page) -> None:
+        self._uses.pop(tab, None)
+        self._crashed.discard(tab)
+        try:
+            if not tab.is_closed():
+                await tab.close()
+        except Exception as e:
+            logger.debug(f"탭 닫기 실패 (무시): {e}")
+
+    def is_healthy(self, tab: Page) -> bool:
+        """탭이 아직 사용 가능한 상태인지"""
+        return tab not in self._crashed and not tab.is_closed()
+
+    async def start(self) -> None:
+        """탭 미리 열기"""
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._open_tab())
+        logger.info(f"탭 풀 준비 완료: {self.size}개")
+
+    async def close(self) -> None:
+        """열린 탭 모두 닫기"""
+        for tab in list(self._uses):
+            await self._discard(tab)
+        logger.info(f"탭 풀 종료 (재활용 {self.recycled}회, 크래시 {self.crashes}회)")
+
+    async def __aenter__(self) -> "TabPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Page]:
+        """
+        탭 하나를 빌려옴. 블록을 빠져나가면 상태에 따라 반납하거나 교체함.
+        """
+        tab = await self._idle.get()
+        replacement = None
+        try:
+            if not self.is_healthy(tab):
+                await self._discard(tab)
+                tab = await self._open_tab()
+            yield tab
+        finally:
+            self._uses[tab] = self._uses.get(tab, 0) + 1
+            worn_out = 0 < self.recycle_after <= self._uses[tab]
+
+            if not self.is_healthy(tab) or worn_out:
+                if worn_out:
+                    self.recycled += 1
+                await self._discard(tab)
+                try:
+                    replacement = await self._open_tab()
+                except Exception as e:
+                    logger.error(f"새 탭 열기 실패: {e}")
+            else:
+                replacement = tab
+
+            # 교체 실패 시에도 다음 acquire에서 다시 열 수 있도록 닫힌 탭을 반납
+            self._idle.put_nowait(replacement if replacement is not None else tab)
@@ -0,0 +1,225 @@
+# src/table_api.py
+import re
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Set
+from playwright.async_api import Page, Response
+
+logger = logging.getLogger(__name__)
+
+# 한국 시간대
+KST = timezone(timedelta(hours=9))
+
+# 행 dict 키 → API 응답에서 찾아볼 필드 이름 후보 (앞쪽 우선)
+FIELD_ALIASES = {
+    "id": ("id", "no", "idx", "seq"),
+    "type": ("type", "reportType", "report_type"),
+    "fbUid": ("fbUid", "fb_uid", "fbuid", "uid", "firebaseUid"),
+    "nick": ("nick", "nickname", "nickName", "name"),
+    "country": ("country", "countryCode", "country_code"),
+    "gender": ("gender", "sex"),
+    "lastLogin": ("lastLogin", "last_login", "lastLoginAt", "loginAt"),
+    "captureLink": ("captureLink", "capture_link", "clink", "captureUrl", "capture_url"),
+}
+
+# 테이블 레코드로 인정하려면 모든 레코드에 있어야 하는 필드 (captureLink는 템플릿이 없을 때만)
+REQUIRED_FIELDS = ("fbUid", "lastLogin", "captureLink")
+
+# 화면 표시 형식에 맞춤 (2024. 12. 17. PM 03:45:30) - scraper/Tubular 파서 모두 지원
+LAST_LOGIN_FORMAT = "%Y. %m. %d. %p %I:%M:%S"
+
+
+# ============================================================================
+# 응답 → 행 변환
+# ============================================================================
+
+def _pick(record: Dict[str, Any], names: tuple) -> Any:
+    for name in names:
+        if name in record and record[name] is not None:
+            return record[name]
+    return None
+
+
+def _format_last_login(value: Any) -> str:
+    """API의 lastLogin 값(epoch/ISO/표시 문자열)을 DOM 표시 형식 문자열로 변환"""
+    if value is None:
+        return ""
+    text = str(value).strip()
+    if isinstance(value, str) and re.fullmatch(r"\d+(?:\.\d+)?", text):
+        # 숫자 문자열 epoch ("1734417930000")
+        value = float(text)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # 밀리초 epoch 구분
+        seconds = value / 1000 if value > 1e11 else value
+        return datetime.fromtimestamp(seconds, KST).strftime(LAST_LOGIN_FORMAT)
+
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        # 이미 화면 표시 형식인 경우 그대로
+        return text
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=KST)
+    return parsed.astimezone(KST).strftime(LAST_LOGIN_FORMAT)
+
+
+def map_record(record: Dict[str, Any], capture_link_template: Optional[str] = None) -> Dict[str, Any]:
+    """
+    API 레코드 하나를 get_table_data와 같은 행 dict로 변환
+
+    Args:
+        record: API 응답의 레코드
+        capture_link_template: captureLink가 없을 때 쓸 URL 템플릿 (예: ".../capture?uid={fbUid}")
+    """
+    row = {}
+    for key, names in FIELD_ALIASES.items():
+        value = _pick(record, names)
+        if key == "lastLogin":
+            row[key] = _format_last_login(value)
+        elif key == "captureLink":
+            row[key] = str(value) if value else None
+        else:
+            row[key] = "" if value is None else str(value).strip()
+
+    if not row["captureLink"] and capture_link_template and row["fbUid"]:
+        try:
+            row["captureLink"] = capture_link_template.format(**row)
+        except (KeyError, IndexError, ValueError) as e:
+            # 템플릿 필드가 잘못됨 → captureLink 없이 (목록 페이지에서 팝업으로 여는 방식으로 처리됨)
+            logger.warning(f"captureLink 템플릿 적용 실패 ({e!r}): {record}")
+    return row
+
+
+def _has_fields(record: Dict[str, Any], fields: tuple) -> bool:
+    return all(_pick(record, FIELD_ALIASES[field]) is not None for field in fields)
+
+
+def find_records(payload: Any, required: tuple = REQUIRED_FIELDS) -> List[Dict[str, Any]]:
+    """
+    응답 JSON에서 테이블 레코드 목록을 찾음
+
+    모든 레코드가 required 필드를 가진 dict 리스트 중 가장 긴 것을 반환
+    ({"data": {"list": [...]}} 같은 중첩 대응). 메뉴/알림 같은 다른 JSON 목록은 걸러짐.
+    """
+    best: List[Dict[str, Any]] = []
+    stack = [payload]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            records = [item for item in node if isinstance(item, dict)]
+            if (
+                records and len(records) == len(node) and len(records) > len(best)
+                and all(_has_fields(record, required) for record in records)
+            ):
+                best = records
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+
+    return best
+
+
+# ============================================================================
+# 응답 가로채기
+# ============================================================================
+
+class TableInterceptor:
+    """
+    Police 테이블을 채우는 XHR/fetch JSON 응답을 가로채 행 데이터로 변환
+
+    네비게이션 전에 start()로 등록해야 하며,
+    아무 응답도 잡지 못하면 rows가 비어 있으므로 DOM 추출로 대체하면 된다.
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        url_pattern: str,
+        capture_link_template: Optional[str] = None
+    ):
+        """
+        Args:
+            page: 목록 페이지
+            url_pattern: 테이블 데이터 요청 URL 정규식 (필수 - 다른 JSON 응답이 행으로 섞이지 않도록)
+            capture_link_template: captureLink 필드가 없을 때 쓸 URL 템플릿
+        """
+        if not url_pattern:
+            raise ValueError("url_pattern이 필요합니다 (TABLE_API_PATTERN)")
+        self.page = page
+        self.url_pattern = re.compile(url_pattern)
+        self.capture_link_template = capture_link_template
+        # 템플릿으로 captureLink를 만들 수 있으면 응답에 없어도 됨
+        self.required = tuple(
+            field for field in REQUIRED_FIELDS
+            if not (field == "captureLink" and capture_link_template)
+        )
+        self._records: List[Dict[str, Any]] = []
+        self._pending: Set[asyncio.Task] = set()
+        self._captured = asyncio.Event()
+
+    def start(self) -> None:
+        self.page.on("response", self._on_response)
+
+    def stop(self) -> None:
+        self.page.remove_listener("response", self._on_response)
+
+    def _on_response(self, response: Response) -> None:
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        if not self.url_pattern.search(response.url):
+            return
+        task = asyncio.create_task(self._read(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response: Response) -> None:
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        try:
+            payload = await response.json()
+        except Exception as e:
+            logger.debug(f"응답 JSON 파싱 실패: {response.url}, {e}")
+            return
+
+        records = find_records(payload, self.required)
+        if records:
+            self._records.extend(records)
+            self._captured.set()
+            logger.info(f"테이블 응답 가로챔: {len(records)}건 ({response.url})")
+
+    async def wait(self, timeout: float = 10.0) -> bool:
+        """
+        테이블 응답을 잡을 때까지 대기
+
+        Returns:
+            레코드를 하나 이상 잡았는지 여부
+        """
+        try:
+            await asyncio.wait_for(self._captured.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("테이블 응답을 가로채지 못함 → DOM 추출 사용")
+            return False
+        # 같은 시점에 도착한 나머지 응답(페이지네이션 등)까지 처리
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        return True
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        가로챈 레코드를 행 dict로 변환
+
+        DOM 추출과 같게 같은 fbUid의 다른 행(신고 건)은 모두 남기고,
+        같은 응답을 다시 받아 완전히 똑같은 행만 한 번으로 줄임.
+        """
+        rows: List[Dict[str, Any]] = []
+        seen: Set[tuple] = set()
+        for record in self._records:
+            row = map_record(record, self.capture_link_template)
+            key = tuple(row.items())
+            if key in seen:
+                continue
+            seen.add(key)
+            rows.append(row)
+        return rows
@@ -0,0 +1,131 @@
+# src/user_state.py
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_state (
+    fb_uid        TEXT PRIMARY KEY,
+    last_login    TEXT,              -- 마지막으로 캡처했을 때의 lastLogin (ISO)
+    last_run_id   TEXT,
+    last_date_id  TEXT,              -- 저장한 날짜 섹션 중 가장 최근 (YYYYMMDD, 하이워터마크)
+    image_count   INTEGER NOT NULL DEFAULT 0,
+    updated_at    TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class UserState:
+    fb_uid: str
+    last_login: Optional[datetime]
+    last_run_id: Optional[str]
+    last_date_id: Optional[str]
+    image_count: int
+
+
+class UserStateStore:
+    """
+    사용자별 마지막 캡처 상태 (증분 실행용)
+
+    - delta(): lastLogin이 마지막 캡처 이후 바뀐 사용자(또는 처음 보는 사용자)만 남김
+    - is_new_section(): 하이워터마크 이후 날짜 섹션만 다시 받도록 판단
+      (같은 날짜 섹션은 이미지가 추가됐을 수 있으므로 다시 받음)
+    """
+
+    def __init__(self, db_path: str = "data/user_state.db"):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # 파이프라인 writer 단계는 스레드에서 기록하고 harvester는 이벤트 루프에서 조회하므로
+        # 연결과 _states는 _lock으로 보호
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.executescript(SCHEMA)
+
+        self._states: Dict[str, UserState] = {}
+        for fb_uid, last_login, last_run_id, last_date_id, image_count in self.conn.execute(
+            "SELECT fb_uid, last_login, last_run_id, last_date_id, image_count FROM user_state"
+        ):
+            self._states[fb_uid] = UserState(
+                fb_uid,
+                datetime.fromisoformat(last_login) if last_login else None,
+                last_run_id,
+                last_date_id,
+                image_count,
+            )
+        logger.info(f"사용자 상태 로드: {len(self._states)}명")
+
+    def get(self, fb_uid: str) -> Optional[UserState]:
+        with self._lock:
+            return self._states.get(fb_uid)
+
+    def delta(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        새 사용자 또는 lastLogin이 바뀐 사용자만 반환
+
+        Args:
+            rows: get_filtered_data 결과 (lastLogin은 datetime)
+        """
+        changed = []
+        for row in rows:
+            state = self.get(row["fbUid"])
+            if state is None or state.last_login is None:
+                changed.append(row)
+            elif isinstance(row["lastLogin"], datetime) and row["lastLogin"] > state.last_login:
+                changed.append(row)
+
+        logger.info(f"증분 필터: {len(rows)}명 중 {len(changed)}명 변경 (신규 포함)")
+        return changed
+
+    def is_new_section(self, fb_uid: str, date_id: str) -> bool:
+        """하이워터마크 날짜 이후(같은 날 포함) 섹션인지"""
+        state = self.get(fb_uid)
+        if state is None or not state.last_date_id:
+            return True
+        # YYYYMMDD가 아닌 섹션 ID는 비교할 수 없으므로 항상 받음
+        if not (date_id.isdigit() and state.last_date_id.isdigit()):
+            return True
+        return date_id >= state.last_date_id
+
+    def record(
+        self,
+        fb_uid: str,
+        last_login: Optional[datetime],
+        run_id: Optional[str],
+        last_date_id: Optional[str],
+        saved: int
+    ) -> None:
+        """캡처 완료 후 상태 갱신 (하이워터마크는 뒤로 가지 않음)"""
+        with self._lock:
+            previous = self._states.get(fb_uid)
+            if previous and previous.last_date_id and (not last_date_id or previous.last_date_id > last_date_id):
+                last_date_id = previous.last_date_id
+            image_count = (previous.image_count if previous else 0) + saved
+
+            state = UserState(fb_uid, last_login, run_id, last_date_id, image_count)
+            self.conn.execute(
+                "INSERT INTO user_state (fb_uid, last_login, last_run_id, last_date_id, image_count, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(fb_uid) DO UPDATE SET last_login = excluded.last_login, "
+                "last_run_id = excluded.last_run_id, last_date_id = excluded.last_date_id, "
+                "image_count = excluded.image_count, updated_at = excluded.updated_at",
+                (
+                    fb_uid,
+                    last_login.isoformat() if last_login else None,
+                    run_id,
+                    last_date_id,
+                    image_count,
+                    datetime.now().isoformat(),
+                )
+            )
+            self.conn.commit()
+            self._states[fb_uid] = state
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,34 @@
+# src/weeks.py
+"""
+ISO 주차 도우미 (exporter / report / main 공용)
+
+날짜 폴더(YYYY-MM-DD)와 ISO 주차 문자열(2026-W41) 사이 변환.
+"""
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+
+def week_key(date_folder: str) -> Optional[str]:
+    """'2026-10-07' → '2026-W41' (날짜 폴더가 아니면 None)"""
+    try:
+        year, week, _ = date.fromisoformat(date_folder).isocalendar()
+    except ValueError:
+        return None
+    return f"{year}-W{week:02d}"
+
+
+def week_range(week: str) -> Tuple[str, str]:
+    """'2026-W41' → ('2026-10-05', '2026-10-11')"""
+    year, number = week.split("-W")
+    monday = date.fromisocalendar(int(year), int(number), 1)
+    return monday.isoformat(), (monday + timedelta(days=6)).isoformat()
+
+
+def this_week(today: Optional[date] = None) -> str:
+    """이번 주 ISO 주차"""
+    return week_key((today or date.today()).isoformat())
+
+
+def last_week(today: Optional[date] = None) -> str:
+    """지난주 ISO 주차"""
+    return week_key(((today or date.today()) - timedelta(days=7)).isoformat())
@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+from PIL import Image
+
+from classifier import ClassifierConfig, ClassifierPipeline, DummyModel
+from storage import Storage
+
+
+class DummyModelV2(DummyModel):
+    version = "2"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    store = Storage(str(tmp_path / "scraper.db"))
+    store.add_captures([("u1", "2026-10-06", str(tmp_path))])
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"img_{i}.jpg"
+        Image.new("RGB", (32, 32), (i * 60, 0, 0)).save(path)
+        paths.append(str(path))
+    store.add_images([("u1", "2026-10-06", path, None) for path in paths])
+    yield store
+    store.close()
+
+
+def _pipeline(model, storage):
+    return ClassifierPipeline(model, storage, ClassifierConfig(min_batch=1, max_batch=2, workers=1))
+
+
+def _score_all(pipeline):
+    """프로세스 풀 없이 모든 이미지를 분류한 것처럼 기록"""
+    image_ids = [image_id for image_id, _ in pipeline.pending_images()]
+    batch = np.zeros((len(image_ids), 16, 16, 3), dtype=np.float32)
+    pipeline._write(image_ids, pipeline.model.predict(batch))
+    pipeline.storage.flush()
+    return image_ids
+
+
+def test_rerun_skips_images_scored_with_same_version(storage):
+    assert len(_score_all(_pipeline(DummyModel(input_size=(16, 16)), storage))) == 3
+
+    rerun = _pipeline(DummyModel(input_size=(16, 16)), storage)
+    assert rerun.pending_images() == []
+    assert rerun.stats["skipped"] == 3
+
+    rows = storage.query("SELECT COUNT(*) FROM classifications WHERE model_version = 'dummy@1'")
+    assert rows == [(3 * len(DummyModel.heads),)]
+
+
+def test_new_model_version_rescores_everything(storage):
+    _score_all(_pipeline(DummyModel(input_size=(16, 16)), storage))
+
+    upgraded = _pipeline(DummyModelV2(input_size=(16, 16)), storage)
+    assert len(upgraded.pending_images()) == 3
+    assert upgraded.stats["skipped"] == 0
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image
+
+import contact_sheet
+from contact_sheet import UNDATED, ContactSheetRenderer
+from derived_cache import file_digest
+from image_store import ImageStore
+
+
+@pytest.fixture
+def root(tmp_path):
+    base = tmp_path / "image"
+    day = base / "u1_a" / "2026-10-06"
+    day.mkdir(parents=True)
+    for i in range(2):
+        Image.new("RGB", (32, 32), (i * 100, 0, 0)).save(day / f"img_{i + 1}.jpg")
+    Image.new("RGB", (32, 32), (0, 0, 200)).save(base / "u1_a" / "img_1.jpg")
+    return base
+
+
+@pytest.fixture
+def renderer(root, tmp_path):
+    return ContactSheetRenderer(str(root), str(tmp_path / "sheets"), workers=1)
+
+
+def test_loose_images_get_undated_sheet(renderer):
+    assert renderer.list_dates("u1_a") == ["2026-10-06", UNDATED]
+
+    sheets = renderer.render("u1_a")
+
+    assert sorted(sheets) == ["2026-10-06", UNDATED]
+    assert all(path.exists() for path in sheets.values())
+
+
+def test_cache_hit_on_same_content_miss_replaces_old_sheet(renderer, root):
+    image = root / "u1_a" / "2026-10-06" / "img_1.jpg"
+    first = renderer.render("u1_a", ["2026-10-06"])["2026-10-06"]
+    rendered_ns = first.stat().st_mtime_ns
+
+    # 내용이 같으면 mtime이 바뀌어도 캐시 적중
+    os.utime(image, ns=(0, 0))
+    hit = renderer.render("u1_a", ["2026-10-06"])["2026-10-06"]
+    assert hit == first and hit.stat().st_mtime_ns == rendered_ns
+
+    # 내용이 바뀌면 새 키로 다시 렌더링하고 이전 시트는 삭제
+    Image.new("RGB", (32, 32), (0, 255, 0)).save(image)
+    miss = renderer.render("u1_a", ["2026-10-06"])["2026-10-06"]
+    assert miss != first
+    assert not first.exists()
+    assert [p.name for p in miss.parent.iterdir()] == [miss.name]
+
+
+def test_digest_reuses_image_store_objects(root, tmp_path, monkeypatch):
+    store = ImageStore(str(tmp_path / "store"))
+    day = root / "u1_a" / "2026-10-06"
+    digests = {}
+    for name in ("img_1.jpg", "img_2.jpg"):
+        digests[name] = file_digest(str(day / name))
+        store.adopt(str(day / name), digests[name])
+
+    renderer = ContactSheetRenderer(str(root), str(tmp_path / "sheets"), store=store)
+    monkeypatch.setattr(contact_sheet, "file_digest", lambda path: pytest.fail(f"다시 읽음: {path}"))
+
+    entries = renderer.day_inputs("u1_a", "2026-10-06")
+    assert [renderer.digest(e) for e in entries] == [digests["img_1.jpg"], digests["img_2.jpg"]]
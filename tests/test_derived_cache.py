@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image
+
+import derived_cache
+from derived_cache import DerivedCache, Transform
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(derived_cache.time, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = DerivedCache(str(tmp_path / "derived"))
+    yield c
+    c.close()
+
+
+def _image(path, seed):
+    img = Image.effect_noise((64, 64), 40 + seed).convert("RGB")
+    img.save(path)
+    return str(path)
+
+
+def test_get_caches_per_transform(cache, tmp_path, clock):
+    source = _image(tmp_path / "a.png", 0)
+
+    first = cache.get(source, Transform(size=(32, 32)))
+    second = cache.get(source, Transform(size=(32, 32)))
+    other = cache.get(source, Transform(size=(16, 16)))
+
+    assert first == second != other
+    assert cache.stats == {"hits": 1, "misses": 2, "evicted": 0}
+    assert cache.total_bytes() == first.stat().st_size + other.stat().st_size
+
+
+def test_over_budget_evicts_least_recently_used(cache, tmp_path, clock):
+    transform = Transform(size=(64, 64), quality=95)
+    paths = {}
+    for seed, name in enumerate("abc"):
+        clock.now += 1
+        paths[name] = cache.get(_image(tmp_path / f"{name}.png", seed), transform)
+
+    # a를 다시 조회 (TOUCH_INTERVAL이 지나야 조회 시각이 갱신됨)
+    clock.now += derived_cache.TOUCH_INTERVAL + 1
+    cache.get(str(tmp_path / "a.png"), transform)
+
+    cache.budget_bytes = cache.total_bytes()
+    clock.now += 1
+    paths["d"] = cache.get(_image(tmp_path / "d.png", 3), transform)
+
+    assert not paths["b"].exists()
+    assert paths["a"].exists() and paths["d"].exists()
+    assert cache.stats["evicted"] >= 1
+    remaining = sum(path.stat().st_size for path in paths.values() if path.exists())
+    assert cache.total_bytes() == remaining <= cache.budget_bytes * 0.9
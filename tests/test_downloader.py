@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+import downloader
+from downloader import AtomicFileWriter, download_image
+from metrics import RunMetrics
+from retry import CircuitBreaker, RetryPolicy
+
+
+async def test_download_metrics_by_final_status(monkeypatch):
+    results = iter([(False, 503, "0", 0), (True, 200, None, 2048)])
+
+    async def fake_fetch(session, src, file_path, store, metrics):
+        return next(results)
+
+    monkeypatch.setattr(downloader, "_fetch_image", fake_fetch)
+    metrics = RunMetrics()
+    retry = RetryPolicy(max_attempts=3, breaker=CircuitBreaker(failure_threshold=10))
+
+    assert await download_image(None, "https://img.example/a.jpg", "unused", retry=retry, metrics=metrics)
+
+    assert metrics.counters["download_attempts_total"] == {(("status", "503"),): 1.0, (("status", "ok"),): 1.0}
+    assert list(metrics.histograms["download_seconds"]) == [(("status", "ok"),)]
+    assert metrics.counters["download_bytes_total"] == {(): 2048.0}
+
+
+async def test_download_metrics_on_fatal_error(monkeypatch):
+    async def fake_fetch(session, src, file_path, store, metrics):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(downloader, "_fetch_image", fake_fetch)
+    metrics = RunMetrics()
+
+    assert not await download_image(None, "https://img.example/a.jpg", "unused", metrics=metrics)
+    assert list(metrics.histograms["download_seconds"]) == [(("status", "error"),)]
+
+
+async def test_atomic_writer_commit_replaces_target(tmp_path):
+    target = tmp_path / "user" / "img_1.jpg"
+    target.parent.mkdir()
+    target.write_bytes(b"old")
+
+    async with AtomicFileWriter(str(target)) as writer:
+        await writer.write(b"ne")
+        await writer.write(b"w")
+        assert target.read_bytes() == b"old"
+        await writer.commit()
+
+    assert target.read_bytes() == b"new"
+    assert [p.name for p in target.parent.iterdir()] == ["img_1.jpg"]
+
+
+async def test_atomic_writer_discards_on_error(tmp_path):
+    target = tmp_path / "user" / "img_1.jpg"
+
+    with pytest.raises(RuntimeError):
+        async with AtomicFileWriter(str(target)) as writer:
+            await writer.write(b"partial")
+            raise RuntimeError
+
+    assert not target.exists()
+    assert list(target.parent.iterdir()) == []
+
+
+async def test_download_images_results_follow_input_order(monkeypatch):
+    # 앞쪽 작업일수록 늦게 끝나도 결과는 입력 순서
+    delays = {"a": 0.03, "b": 0.0, "c": 0.01, "d": 0.02}
+    finished = []
+
+    async def fake_download(session, src, file_path, store=None, retry=None, metrics=None):
+        await asyncio.sleep(delays[src])
+        finished.append(src)
+        return src != "c"
+
+    monkeypatch.setattr(downloader, "download_image", fake_download)
+    jobs = [(src, f"{src}.jpg") for src in delays]
+
+    results = await downloader.download_images(None, jobs, concurrency=4)
+
+    assert finished != list(delays)
+    assert results == [True, True, False, True]
+
+
+async def test_save_images_by_date_section_plans_from_sources(monkeypatch, tmp_path):
+    seen = []
+
+    async def fake_download(session, src, file_path, store=None, retry=None, metrics=None):
+        seen.append((src, file_path))
+        return True
+
+    monkeypatch.setattr(downloader, "download_image", fake_download)
+    sources = {"sections": {"20261006": ["s1", None, "s3"], "20261007": []}, "flat": ["s1", None, "s3"]}
+
+    saved = await downloader.save_images_by_date_section(
+        None, "u1_nick", str(tmp_path), sources=sources, session=object()
+    )
+
+    assert saved == 2
+    assert sorted(seen) == [
+        ("s1", str(tmp_path / "u1_nick" / "2026-10-06" / "img_1.jpg")),
+        ("s3", str(tmp_path / "u1_nick" / "2026-10-06" / "img_3.jpg")),
+    ]
@@ -0,0 +1,47 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from embedding_store import EmbeddingStore
+
+
+def _store(tmp_path):
+    rng = np.random.default_rng(0)
+    dim = 8
+    big = np.eye(dim)[0] + 0.05 * rng.standard_normal((40, dim))
+    small = np.eye(dim)[1] + 0.05 * rng.standard_normal((3, dim))
+    store = EmbeddingStore(str(tmp_path), dim)
+    store.add([f"a{i}" for i in range(40)], [f"a{i}/1" for i in range(40)], big)
+    store.add([f"b{i}" for i in range(3)], [f"b{i}/1" for i in range(3)], small)
+    return store
+
+
+def test_exact_search_sorted(tmp_path):
+    store = _store(tmp_path)
+
+    idx, score = store.search(np.eye(8)[1], k=3)
+
+    assert sorted(idx[0]) == [40, 41, 42]
+    assert np.all(np.diff(score[0]) <= 0)
+
+
+def test_ivf_pads_short_queries_instead_of_truncating(tmp_path):
+    store = _store(tmp_path)
+    store.build_ivf(nlist=2, iters=5)
+
+    idx, score = store.search(np.stack([np.eye(8)[0], np.eye(8)[1]]), k=5, nprobe=1)
+
+    assert idx.shape == score.shape == (2, 5)
+    assert np.all(idx[0] >= 0)
+    assert sorted(idx[1][:3]) == [40, 41, 42]
+    assert list(idx[1][3:]) == [-1, -1]
+    assert np.all(np.isneginf(score[1][3:]))
+
+
+def test_nearest_users_skips_padding(tmp_path):
+    store = _store(tmp_path)
+    store.build_ivf(nlist=2, iters=5)
+
+    users = [uid for uid, _ in store.nearest_users("b0", k=5, nprobe=1)]
+
+    assert set(users) == {"b1", "b2"}
@@ -0,0 +1,52 @@
+import zipfile
+
+import pytest
+
+from exporter import build_archive, export, plan_archives
+
+
+@pytest.fixture
+def root(tmp_path):
+    base = tmp_path / "image"
+    for user, folder in [("u1_a", "2026-10-06"), ("u1_a", "2026-10-13"), ("u2_b", "2026-10-07")]:
+        path = base / user / folder
+        path.mkdir(parents=True)
+        (path / "img_1.jpg").write_bytes(b"jpeg" + folder.encode())
+    (base / "u2_b" / "img_1.jpg").write_bytes(b"flat")
+    return base
+
+
+def test_plan_by_week(root):
+    archives = plan_archives(str(root), by="week")
+
+    assert sorted(archives) == ["2026-W41", "2026-W42", "undated"]
+    assert [arc for _, arc in archives["2026-W41"]] == ["u1_a/2026-10-06/img_1.jpg", "u2_b/2026-10-07/img_1.jpg"]
+
+
+def test_build_archive_refuses_to_overwrite(root, tmp_path):
+    files = [(str(root / "u2_b" / "img_1.jpg"), "u2_b/img_1.jpg")]
+    out = tmp_path / "out" / "u2_b.zip"
+
+    result = build_archive(str(out), files)
+    with zipfile.ZipFile(out) as zf:
+        assert sorted(zf.namelist()) == ["manifest.json", "u2_b/img_1.jpg"]
+    assert result["files"] == 1
+
+    with pytest.raises(FileExistsError):
+        build_archive(str(out), files)
+
+
+def test_export_stamps_archive_names(root, tmp_path):
+    manifest = export(str(root), str(tmp_path / "out"), by="user", workers=1)
+
+    names = sorted(a["archive"].rsplit("/", 1)[-1] for a in manifest["archives"])
+    assert len(names) == 2
+    assert all(name.startswith(("u1_a_", "u2_b_")) and name.endswith(".zip") for name in names)
+
+
+def test_export_missing_root(tmp_path, caplog):
+    manifest = export(str(tmp_path / "missing"), str(tmp_path / "out"))
+
+    assert manifest["archives"] == []
+    assert "이미지 루트 폴더가 없음" in caplog.text
+    assert not (tmp_path / "out").exists()
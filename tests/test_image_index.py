@@ -0,0 +1,55 @@
+import os
+import time
+
+import pytest
+
+from image_index import NO_DATE, ImageIndex, build_index
+
+HOUR_NS = 3600 * 10 ** 9
+
+
+@pytest.fixture
+def root(tmp_path):
+    base = tmp_path / "image"
+    for user, folder in [("u1_a", "2026-10-06"), ("u1_a", "2026-10-13"), ("u2_b", "2026-10-07")]:
+        path = base / user / folder
+        path.mkdir(parents=True)
+        (path / "img_1.jpg").write_bytes(b"jpeg")
+    (base / "u2_b" / "img_1.jpg").write_bytes(b"flat")
+    _age(base)
+    return base
+
+
+def _age(base):
+    """디렉토리 mtime을 한 시간 전으로 (방금 바뀐 디렉토리는 캐시를 믿지 않으므로)"""
+    past = time.time_ns() - HOUR_NS
+    for dirpath, _, _ in os.walk(base):
+        os.utime(dirpath, ns=(past, past))
+
+
+def test_rescan_reuses_unchanged_dirs(root, tmp_path):
+    index = ImageIndex(str(root), str(tmp_path / "index.json"), workers=2)
+
+    first = index.scan()
+    assert (first.scanned_dirs, first.reused_dirs) == (5, 0)
+    assert first.users == {"u1_a": {"count": 2, "bytes": 8}, "u2_b": {"count": 2, "bytes": 8}}
+    assert sorted(first.dates["u2_b"]) == [NO_DATE, "2026-10-07"]
+
+    second = index.scan()
+    assert (second.scanned_dirs, second.reused_dirs) == (0, 5)
+    assert second.users == first.users
+
+    (root / "u1_a" / "2026-10-13" / "img_2.jpg").write_bytes(b"jpeg2")
+    third = index.scan()
+    assert (third.scanned_dirs, third.reused_dirs) == (1, 4)
+    assert third.dates["u1_a"]["2026-10-13"] == {"count": 2, "bytes": 9}
+
+
+def test_build_index_persists_between_runs(root, tmp_path):
+    index_path = str(tmp_path / "index.json")
+
+    assert build_index(str(root), index_path, workers=2).scanned_dirs == 5
+    summary = build_index(str(root), index_path, workers=2)
+
+    assert (summary.scanned_dirs, summary.reused_dirs) == (0, 5)
+    assert summary.total_count == 4
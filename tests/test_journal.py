@@ -0,0 +1,49 @@
+# tests/test_journal.py
+from journal import RunJournal
+
+
+def test_finished_run_is_not_reopened(tmp_path):
+    db = str(tmp_path / "journal.db")
+    first = RunJournal(db)
+    first.mark_user("u1", True)
+    first.finish()
+    first.close()
+
+    # 같은 초에 시작해도 새 실행이어야 함
+    second = RunJournal(db)
+    assert second.run_id != first.run_id
+    assert not second.is_user_done("u1")
+    second.close()
+
+
+def test_unfinished_run_is_resumed(tmp_path):
+    db = str(tmp_path / "journal.db")
+    first = RunJournal(db)
+    first.mark_user("u1", True)
+    first.mark_images([("http://x/a.jpg", "a.jpg")])
+    first.close()
+
+    resumed = RunJournal(db)
+    assert resumed.run_id == first.run_id
+    assert resumed.is_user_done("u1")
+    assert resumed.is_image_done("a.jpg")
+    resumed.close()
+
+
+def test_explicit_run_id_reopens_finished_run(tmp_path):
+    db = str(tmp_path / "journal.db")
+    first = RunJournal(db)
+    first.mark_user("u1", True)
+    first.finish()
+    first.close()
+
+    again = RunJournal(db, run_id=first.run_id)
+    assert again.is_user_done("u1")
+    again.close()
+
+
+def test_failed_user_is_not_done(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.db"))
+    journal.mark_user("u1", False)
+    assert not journal.is_user_done("u1")
+    journal.close()
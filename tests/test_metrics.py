@@ -0,0 +1,61 @@
+import pytest
+
+from metrics import Histogram, RunMetrics
+
+
+def test_histogram_buckets_and_quantile():
+    hist = Histogram(buckets=(1.0, 2.0, 4.0))
+    for value in (0.5, 1.0, 1.5, 3.0, 10.0):
+        hist.observe(value)
+
+    assert hist.cumulative() == [(1.0, 2), (2.0, 3), (4.0, 4), (float("inf"), 5)]
+    assert hist.quantile(0.0) == pytest.approx(0.5)
+    assert 1.0 <= hist.quantile(0.5) <= 2.0
+    assert hist.quantile(1.0) == pytest.approx(10.0)
+
+
+def test_prometheus_rendering():
+    metrics = RunMetrics()
+    metrics.inc("download_attempts_total", status="ok")
+    metrics.inc("download_attempts_total", 2, status="503")
+    metrics.set("run_duration_seconds", 12.5)
+    metrics.observe("download_seconds", 0.2, buckets=(0.1, 0.5), status='a"b')
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert lines == [
+        "# TYPE scraper_download_attempts_total counter",
+        'scraper_download_attempts_total{status="503"} 2.0',
+        'scraper_download_attempts_total{status="ok"} 1.0',
+        "# TYPE scraper_run_duration_seconds gauge",
+        "scraper_run_duration_seconds 12.5",
+        "# TYPE scraper_download_seconds histogram",
+        'scraper_download_seconds_bucket{status="a\\"b",le="0.1"} 0',
+        'scraper_download_seconds_bucket{status="a\\"b",le="0.5"} 1',
+        'scraper_download_seconds_bucket{status="a\\"b",le="+Inf"} 1',
+        'scraper_download_seconds_sum{status="a\\"b"} 0.2',
+        'scraper_download_seconds_count{status="a\\"b"} 1',
+    ]
+
+
+def test_time_records_labels_and_errors():
+    metrics = RunMetrics()
+
+    with metrics.time("capture_seconds") as labels:
+        labels["status"] = "ok"
+    with pytest.raises(ValueError):
+        with metrics.time("capture_seconds"):
+            raise ValueError
+
+    series = metrics.histograms["capture_seconds"]
+    assert sorted(dict(labels)["status"] for labels in series) == ["error", "ok"]
+
+
+def test_save_writes_json_and_prom(tmp_path):
+    metrics = RunMetrics(log_dir=str(tmp_path))
+    metrics.inc("capture_images_total", 3, status="saved")
+
+    json_path, prom_path = metrics.save()
+
+    assert json_path.exists()
+    assert 'scraper_capture_images_total{status="saved"} 3.0' in prom_path.read_text()
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image
+
+from phash_index import PHashIndex, dhash
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = PHashIndex(str(tmp_path / "phash.db"))
+    yield idx
+    idx.close()
+
+
+def _gradient(path, reverse=False):
+    img = Image.new("L", (64, 64))
+    img.putdata([(255 - x * 4 if reverse else x * 4) for _ in range(64) for x in range(64)])
+    img.save(path)
+    return str(path)
+
+
+def test_query_finds_hashes_within_radius(index):
+    base = 0x0F0F_0F0F_0F0F_0F0F
+    index.add_many([
+        ("a/1.jpg", "a", base, (1, 1)),
+        ("b/1.jpg", "b", base ^ 0b111, (1, 1)),           # 거리 3
+        ("c/1.jpg", "c", base ^ ((1 << 20) - 1), (1, 1)), # 거리 20
+    ])
+
+    matches = index.query(base, radius=6)
+
+    assert [(m.fb_uid, m.distance) for m in matches] == [("a", 0), ("b", 3)]
+    assert [m.fb_uid for m in index.query(base, radius=6, exclude_uid="a")] == ["b"]
+
+
+def test_query_matches_bruteforce(index):
+    import random
+
+    rng = random.Random(0)
+    values = [rng.getrandbits(64) for _ in range(300)]
+    index.add_many((f"u{i}/1.jpg", f"u{i}", value, (1, 1)) for i, value in enumerate(values))
+
+    probe = values[0] ^ 0b1011
+    expected = sorted(i for i, value in enumerate(values) if (value ^ probe).bit_count() <= 8)
+    found = sorted(int(m.fb_uid[1:]) for m in index.query(probe, radius=8))
+
+    assert found == expected
+
+
+def test_index_images_rehashes_changed_file(index, tmp_path):
+    path = _gradient(tmp_path / "img_1.png")
+
+    assert index.index_images([path], root=str(tmp_path), workers=1) == 1
+    assert index.index_images([path], root=str(tmp_path), workers=1) == 0
+
+    _gradient(path, reverse=True)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert index.index_images([path], root=str(tmp_path), workers=1) == 1
+    assert len(index) == 1
+    assert index.query(dhash(path), radius=0)[0].image_path == path
@@ -0,0 +1,13 @@
+from pipeline import CapturePipeline, PipelineConfig
+
+
+async def test_queue_peaks_sampled_on_put():
+    pipeline = CapturePipeline(page=None, config=PipelineConfig(monitor_interval=0))
+
+    await pipeline._put("rows", {"fbUid": "a"})
+    await pipeline._put("rows", {"fbUid": "b"})
+    await pipeline.rows_q.get()
+    await pipeline._put("images", object())
+
+    assert pipeline.peak_depths == {"rows": 2, "images": 1, "results": 0}
+    assert pipeline.queue_depths() == {"rows": 1, "images": 1, "results": 0}
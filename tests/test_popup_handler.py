@@ -0,0 +1,19 @@
+from crawler.popup_handler import build_button_specs, build_dismiss_specs
+from scraper import POPUP_PATTERNS
+
+
+def test_has_text_split_into_css_and_lowercase_text():
+    specs = build_button_specs([{"selectors": ["button:has-text('Close')", ".modal .close"]}])
+
+    assert specs == [
+        {"selector": "button:has-text('Close')", "css": "button", "text": "close"},
+        {"selector": ".modal .close", "css": ".modal .close", "text": None},
+    ]
+
+
+def test_dismiss_specs_skip_confirm_buttons():
+    selectors = [spec["selector"] for spec in build_dismiss_specs(POPUP_PATTERNS)]
+
+    assert "button.swal2-confirm" not in selectors
+    assert "button.swal2-cancel" in selectors
+    assert ".modal .btn-close" in selectors
@@ -0,0 +1,28 @@
+import pytest
+
+from report import RunAggregates, build_weekly_report, render_markdown
+from storage import Storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    store = Storage(str(tmp_path / "scraper.db"))
+    yield store
+    store.close()
+
+
+def test_weekly_report_includes_run_duration(storage):
+    run_id = storage.start_run()
+    aggregates = RunAggregates(storage, run_id)
+    aggregates.record({"fbUid": "a", "country": "KR"}, True, 3, 1, day="2026-10-06")
+    aggregates.record({"fbUid": "b", "country": "US"}, False, 0, 2, day="2026-10-07")
+    aggregates.record({"fbUid": "c", "country": "KR"}, True, 9, 0, day="2026-10-13")  # 다음 주
+    storage.finish_run(run_id, success_count=1, failed_count=1, duration_seconds=12.5)
+
+    report = build_weekly_report(storage, "2026-W41")
+
+    assert report.totals == {"users_ok": 1, "users_failed": 1, "images_saved": 3, "images_failed": 3}
+    assert [day for day, _ in report.days] == ["2026-10-06", "2026-10-07"]
+    assert report.runs[0][1]["duration_seconds"] == 12.5
+    assert [country for country, _ in report.countries] == ["KR", "US"]
+    assert "12.5" in render_markdown(report)
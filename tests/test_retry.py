@@ -0,0 +1,120 @@
+# tests/test_retry.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from retry import CircuitBreaker, RetryPolicy, parse_retry_after
+
+
+# ============================================================================
+# Retry-After / 백오프
+# ============================================================================
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(" 12 ") == 12.0
+
+
+def test_parse_retry_after_http_date():
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+
+
+def test_parse_retry_after_past_date_is_zero():
+    earlier = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert parse_retry_after(format_datetime(earlier, usegmt=True)) == 0.0
+
+
+@pytest.mark.parametrize("value", [None, "", "soon", "-5"])
+def test_parse_retry_after_invalid(value):
+    assert parse_retry_after(value) is None
+
+
+def test_backoff_uses_retry_after_with_cap():
+    policy = RetryPolicy(max_retry_after=10.0)
+    assert policy.backoff(1, "3") == 3.0
+    assert policy.backoff(1, "600") == 10.0
+
+
+def test_backoff_full_jitter_bounds():
+    policy = RetryPolicy(base_delay=0.5, max_delay=4.0)
+    for attempt in range(1, 8):
+        limit = min(4.0, 0.5 * 2 ** (attempt - 1))
+        assert all(0 <= policy.backoff(attempt) <= limit for _ in range(50))
+
+
+def test_retryable_statuses():
+    assert RetryPolicy.is_retryable(503)
+    assert RetryPolicy.is_retryable(429)
+    assert not RetryPolicy.is_retryable(404)
+
+
+def test_summary_counts_outcomes():
+    policy = RetryPolicy()
+    policy.record("ok", 1)
+    policy.record("exhausted", 4)
+    summary = policy.summary()
+    assert summary["download_ok"] == 1
+    assert summary["download_attempts_4"] == 1
+    assert summary["download_circuit_trips"] == 0
+
+
+# ============================================================================
+# 서킷 브레이커
+# ============================================================================
+
+def _trip(breaker: CircuitBreaker, host: str = "h") -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(host)
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+    breaker.record_failure("h")
+    breaker.record_failure("h")
+    assert not breaker.is_open("h")
+    breaker.record_failure("h")
+    assert breaker.is_open("h")
+    assert breaker.trips == 1
+
+
+async def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    _trip(breaker)
+
+    passed = []
+
+    async def worker(i: int) -> None:
+        await breaker.wait("h")
+        passed.append(i)
+
+    tasks = [asyncio.create_task(worker(i)) for i in range(5)]
+    await asyncio.sleep(0.15)
+    # 쿨다운이 끝나도 탐색 요청 하나만 통과
+    assert len(passed) == 1
+    assert breaker.is_half_open("h")
+
+    breaker.record_success("h")
+    await asyncio.wait_for(asyncio.gather(*tasks), 1)
+    assert len(passed) == 5
+    assert "h" not in breaker._open_until
+
+
+async def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    _trip(breaker)
+    await asyncio.sleep(0.06)
+    await breaker.wait("h")          # 탐색 요청
+    breaker.record_failure("h")
+    assert breaker.is_open("h")
+    assert breaker.trips == 2
+
+
+async def test_probe_timeout_allows_new_probe():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.01, probe_timeout=0.05)
+    _trip(breaker)
+    await asyncio.sleep(0.02)
+    await breaker.wait("h")          # 탐색 요청이 결과를 알리지 않음
+    await asyncio.wait_for(breaker.wait("h"), 1)
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+
+from crawler.row_filter import (
+    DEFAULT_RULES, KST, MALE_RULE, LoginDateParser, compile_filter, week_start,
+)
+
+# 2026-10-15 (목) 기준: 지난주 월요일 = 2026-10-05
+NOW = datetime(2026, 10, 15, 12, 0, tzinfo=KST)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("2026. 10. 06. 오후 3:45:30", datetime(2026, 10, 6, 15, 45, 30, tzinfo=KST)),
+    ("2026. 10. 06. AM 12:05:00", datetime(2026, 10, 6, 0, 5, 0, tzinfo=KST)),
+    ("10/06/2026, 1:08:03 PM", datetime(2026, 10, 6, 13, 8, 3, tzinfo=KST)),
+    ("10/06/2026, 12:00:00 오전", datetime(2026, 10, 6, 0, 0, 0, tzinfo=KST)),
+    ("2026.  10.  06.  PM  03:45:30", datetime(2026, 10, 6, 15, 45, 30, tzinfo=KST)),
+    ("2026. 13. 06. PM 03:45:30", None),
+    ("yesterday", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_formats(raw, expected):
+    assert LoginDateParser(KST).parse(raw) == expected
+
+
+def test_parser_memoizes():
+    parser = LoginDateParser(KST, memo_size=2)
+    first = parser.parse("10/06/2026, 1:08:03 PM")
+
+    assert parser.parse("10/06/2026, 1:08:03 PM") is first
+    parser.parse("2026. 10. 06. PM 03:45:30")
+    parser.parse("2026. 10. 07. PM 03:45:30")
+    assert len(parser._memo) <= 2
+
+
+def test_week_start():
+    assert week_start(NOW) == datetime(2026, 10, 5, tzinfo=KST)
+    assert week_start(NOW, 0) == datetime(2026, 10, 12, tzinfo=KST)
+
+
+def _row(uid, country="KR", login="2026. 10. 06. PM 03:45:30", gender="Male", row_id="1"):
+    return {"id": row_id, "fbUid": uid, "country": country, "lastLogin": login, "gender": gender}
+
+
+def test_default_rules():
+    rows = [
+        _row("header", row_id="ID", login="LastLogin"),
+        _row("ph", country="PH"),
+        _row("old", login="2026. 10. 04. PM 11:59:59"),
+        _row("bad", login="not a date"),
+        _row("ok"),
+        _row("us", login="10/05/2026, 12:00:00 AM"),
+    ]
+
+    kept = compile_filter(DEFAULT_RULES, now=NOW)(rows)
+
+    assert [row["fbUid"] for row in kept] == ["ok", "us"]
+    assert kept[0]["lastLogin"] == datetime(2026, 10, 6, 15, 45, 30, tzinfo=KST)
+
+
+def test_male_rule_casefold():
+    rows = [_row("a", gender=" MALE "), _row("b", gender="남성"), _row("c", gender="Female")]
+
+    kept = compile_filter(DEFAULT_RULES + [MALE_RULE], now=NOW)(rows)
+
+    assert [row["fbUid"] for row in kept] == ["a", "b"]
+
+
+def test_since_and_before_window():
+    rules = [
+        {"field": "lastLogin", "op": "since", "value": "last_monday"},
+        {"field": "lastLogin", "op": "before", "value": "this_monday"},
+    ]
+    rows = [_row("last"), _row("this", login="2026. 10. 12. AM 12:00:00")]
+
+    assert [row["fbUid"] for row in compile_filter(rules, now=NOW)(rows)] == ["last"]
+
+
+def test_unknown_op_rejected():
+    with pytest.raises(ValueError):
+        compile_filter([{"field": "id", "op": "like", "value": "x"}])
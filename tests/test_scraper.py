@@ -0,0 +1,25 @@
+from scraper import wait_for_table_loaded
+
+
+class FakePage:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    async def evaluate(self, script, arg):
+        self.calls.append(arg)
+        return self.result
+
+
+async def test_wait_for_table_loaded_passes_pattern_and_grace():
+    page = FakePage({"ok": True, "rows": 12, "elapsed": 0.4})
+
+    assert await wait_for_table_loaded(page, data_url_pattern="api/police", request_grace=2.5)
+    assert page.calls[0]["urlPattern"] == "api/police"
+    assert page.calls[0]["graceMs"] == 2500
+
+
+async def test_wait_for_table_loaded_timeout():
+    page = FakePage({"ok": False, "rows": 3, "elapsed": 120.0})
+
+    assert not await wait_for_table_loaded(page)
@@ -0,0 +1,49 @@
+import pytest
+
+from storage import Storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    store = Storage(str(tmp_path / "scraper.db"))
+    yield store
+    store.close()
+
+
+def test_failing_op_dropped_alone(storage):
+    run_id = storage.start_run()
+    storage.upsert_users([{"fbUid": "a", "nick": "A"}])
+    storage.execute_many("INSERT INTO no_such_table VALUES (?)", [(1,)])
+    storage.upsert_users([{"fbUid": "b", "nick": "B"}])
+    storage.finish_run(run_id, total_rows=7)
+    storage.flush()
+
+    assert storage.query("SELECT fb_uid FROM users ORDER BY fb_uid") == [("a",), ("b",)]
+    assert storage.query("SELECT total_rows FROM scraping_runs WHERE id = ?", (run_id,)) == [(7,)]
+
+
+def test_failing_call_gets_exception(storage):
+    def broken(conn):
+        raise RuntimeError("boom")
+
+    future = storage.call(broken)
+    storage.upsert_users([{"fbUid": "a"}])
+    storage.flush()
+
+    with pytest.raises(RuntimeError):
+        future.result()
+    assert storage.query("SELECT COUNT(*) FROM users") == [(1,)]
+
+
+def test_reused_image_path_updates_row(storage):
+    storage.upsert_users([{"fbUid": "a"}])
+    storage.add_captures([("a", "2024-12-16", "img/a/2024-12-16"), ("a", "2024-12-17", "img/a/2024-12-17")])
+    storage.add_images([("a", "2024-12-16", "img/a/img_1.jpg", "2024-12-16")])
+    storage.add_images([("a", "2024-12-17", "img/a/img_1.jpg", "2024-12-17")])
+    storage.refresh_capture_counts("a")
+    storage.flush()
+
+    assert storage.query("SELECT date_taken FROM images WHERE image_path = 'img/a/img_1.jpg'") == [("2024-12-17",)]
+    assert storage.query("SELECT capture_date, image_count FROM captures ORDER BY capture_date") == [
+        ("2024-12-16", 0), ("2024-12-17", 1),
+    ]
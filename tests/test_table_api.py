@@ -0,0 +1,115 @@
+# tests/test_table_api.py
+from datetime import datetime
+
+import pytest
+
+from table_api import (
+    KST, LAST_LOGIN_FORMAT, TableInterceptor, _format_last_login, find_records, map_record,
+)
+
+EPOCH = 1734417930          # 2024-12-17 15:45:30 KST
+DISPLAY = "2024. 12. 17. PM 03:45:30"
+
+
+# ============================================================================
+# lastLogin 변환
+# ============================================================================
+
+@pytest.mark.parametrize("value", [
+    EPOCH,
+    EPOCH * 1000,
+    str(EPOCH),
+    str(EPOCH * 1000),
+    "2024-12-17T06:45:30Z",
+    "2024-12-17T15:45:30",
+    DISPLAY,
+])
+def test_format_last_login(value):
+    assert _format_last_login(value) == DISPLAY
+
+
+def test_format_last_login_empty():
+    assert _format_last_login(None) == ""
+
+
+def test_display_format_round_trips():
+    parsed = datetime.strptime(DISPLAY, LAST_LOGIN_FORMAT).replace(tzinfo=KST)
+    assert parsed.timestamp() == EPOCH
+
+
+# ============================================================================
+# 레코드 매핑
+# ============================================================================
+
+def test_map_record_aliases():
+    row = map_record({
+        "no": 3, "reportType": "A", "fb_uid": " abc ", "nickname": "nick",
+        "countryCode": "KR", "sex": "M", "lastLoginAt": EPOCH, "capture_url": "http://x/c/abc",
+    })
+    assert row == {
+        "id": "3", "type": "A", "fbUid": "abc", "nick": "nick", "country": "KR",
+        "gender": "M", "lastLogin": DISPLAY, "captureLink": "http://x/c/abc",
+    }
+
+
+def test_map_record_capture_link_template():
+    row = map_record({"fbUid": "abc", "lastLogin": EPOCH}, "http://x/capture?uid={fbUid}")
+    assert row["captureLink"] == "http://x/capture?uid=abc"
+
+
+@pytest.mark.parametrize("template", ["http://x/c/{userId}", "http://x/c/{0}", "http://x/c/{fbUid"])
+def test_map_record_bad_template_leaves_link_empty(template):
+    row = map_record({"fbUid": "abc", "lastLogin": EPOCH}, template)
+    assert row["fbUid"] == "abc" and row["captureLink"] is None
+
+
+def test_map_record_missing_fields_are_empty():
+    row = map_record({"fbUid": "abc"})
+    assert row["nick"] == "" and row["lastLogin"] == "" and row["captureLink"] is None
+
+
+# ============================================================================
+# 레코드 찾기
+# ============================================================================
+
+def _record(uid: str) -> dict:
+    return {"fbUid": uid, "lastLogin": EPOCH, "captureLink": f"http://x/c/{uid}"}
+
+
+def test_find_records_nested():
+    payload = {"data": {"list": [_record("a"), _record("b")], "total": 2}}
+    assert [r["fbUid"] for r in find_records(payload)] == ["a", "b"]
+
+
+def test_find_records_ignores_unrelated_lists():
+    # 메뉴/알림처럼 id/name만 있는 목록은 테이블로 보지 않음
+    payload = {
+        "menus": [{"id": i, "name": f"m{i}", "uid": i} for i in range(10)],
+        "notifications": [{"uid": "x", "name": "n"}],
+    }
+    assert find_records(payload) == []
+
+
+def test_find_records_requires_every_record_complete():
+    payload = [_record("a"), {"fbUid": "b", "lastLogin": EPOCH}]
+    assert find_records(payload) == []
+    assert len(find_records(payload, ("fbUid", "lastLogin"))) == 2
+
+
+def test_find_records_picks_longest():
+    payload = {"top": [_record("a")], "page": {"items": [_record("b"), _record("c")]}}
+    assert [r["fbUid"] for r in find_records(payload)] == ["b", "c"]
+
+
+# ============================================================================
+# 행 변환 (TableInterceptor.rows)
+# ============================================================================
+
+def test_rows_keeps_same_uid_rows_drops_repeated_responses():
+    interceptor = TableInterceptor(object(), r"/api/police")
+    first = dict(_record("abc"), id=1)
+    second = dict(_record("abc"), id=2)
+    # 같은 페이지 응답을 두 번 받은 경우
+    interceptor._records = [first, second, dict(first)]
+    rows = interceptor.rows()
+    assert [row["id"] for row in rows] == ["1", "2"]
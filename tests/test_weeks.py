@@ -0,0 +1,29 @@
+from datetime import date
+
+import pytest
+
+from weeks import last_week, this_week, week_key, week_range
+
+
+@pytest.mark.parametrize("folder, expected", [
+    ("2026-10-07", "2026-W41"),
+    ("2026-01-01", "2026-W01"),
+    ("2027-01-01", "2026-W53"),   # ISO 연도는 달력 연도와 다를 수 있음
+    ("undated", None),
+])
+def test_week_key(folder, expected):
+    assert week_key(folder) == expected
+
+
+def test_week_range_round_trip():
+    start, end = week_range("2026-W41")
+
+    assert (start, end) == ("2026-10-05", "2026-10-11")
+    assert week_key(start) == week_key(end) == "2026-W41"
+
+
+def test_this_and_last_week():
+    today = date(2026, 10, 5)
+
+    assert this_week(today) == "2026-W41"
+    assert last_week(today) == "2026-W40"